@@ -0,0 +1,256 @@
+import time
+from dataclasses import dataclass, field
+
+from selenium.webdriver.common.by import By
+
+from tracing import TRACER
+from utils import Utility
+
+
+def xpath_literal(value: str) -> str:
+    '''
+    Chuỗi XPath (kèm dấu nháy) có giá trị đúng bằng `value`, kể cả khi `value` chứa cả hai loại dấu nháy.
+
+    Ví dụ:
+        xpath_literal('Account 1')   # "Account 1"
+        xpath_literal('A"b\'c')      # concat("A", '"', "b'c")
+    '''
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    parts = value.split('"')
+    return 'concat(' + ', \'"\', '.join(f'"{part}"' for part in parts) + ')'
+
+
+def css_literal(value: str) -> str:
+    '''
+    Chuỗi CSS (kèm dấu nháy kép) có giá trị đúng bằng `value`.
+    '''
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\a ')
+    return f'"{escaped}"'
+
+
+# Cách chèn tham số vào `Step.value` có `template=True` theo kiểu định vị
+_LITERALS = {By.XPATH: xpath_literal, By.CSS_SELECTOR: css_literal}
+
+
+@dataclass
+class Step:
+    '''
+    Một bước trong kế hoạch hành động.
+
+    Args:
+        action (str): Loại hành động: 'click' | 'input' | 'find' | 'get_text' | 'go_to'.
+        by (str, option): Kiểu định vị phần tử (By.XPATH, By.CSS_SELECTOR, ...). Không dùng cho 'go_to'.
+        value (str): Giá trị định vị phần tử, hoặc URL với 'go_to'. Chỉ chứa placeholder khi `template=True`.
+        text (str, option): Văn bản cần nhập với 'input'. Có thể chứa placeholder `{ten}`, ví dụ '{pin}'.
+        timeout (int, option): Thời gian chờ tối đa của bước. Mặc định dùng `Node.timeout`.
+        wait (int, option): Thời gian chờ trước hành động. Mặc định dùng `Node.wait`.
+        retries (int): Số lần thử lại khi bước thất bại. Mặc định 0.
+        backoff (float): Thời gian chờ (giây) trước lần thử lại đầu tiên, nhân đôi sau mỗi lần.
+        required (bool): False nếu bước là tùy chọn - thất bại sẽ được bỏ qua.
+        name (str, option): Tên bước để hiển thị log/kết quả. Mặc định là `action` + `value`.
+        selector (str, option): Tên phần tử trong SelectorRegistry của Node, thay cho `by`/`value`.
+        template (bool): `value` là mẫu XPath/CSS có placeholder `{ten}` (không đặt trong dấu nháy, ví dụ
+            '//div[text()={recipient}]'). Tham số được chèn dưới dạng chuỗi XPath/CSS đã thoát dấu nháy;
+            dấu ngoặc nhọn thật trong mẫu viết là `{{`/`}}`. Mặc định False - `value` được dùng nguyên văn.
+    '''
+    action: str
+    by: str = None
+    value: str = None
+    text: str = None
+    timeout: int = None
+    wait: int = None
+    retries: int = 0
+    backoff: float = 1.0
+    required: bool = True
+    name: str = None
+    selector: str = None
+    template: bool = False
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = f'{self.action} {self.selector or self.value}'
+
+
+@dataclass
+class StepResult:
+    name: str
+    action: str
+    success: bool
+    attempts: int = 0
+    duration: float = 0.0
+    skipped: bool = False
+    output: object = None
+
+
+@dataclass
+class PlanResult:
+    '''
+    Kết quả một lần chạy kế hoạch.
+
+    Attributes:
+        plan (str): Tên kế hoạch.
+        steps (list[StepResult]): Kết quả từng bước đã chạy.
+        success (bool): True nếu mọi bước bắt buộc thành công.
+        failed_index (int | None): Vị trí bước bắt buộc bị lỗi, dùng để `ActionPlan.resume`.
+        duration (float): Tổng thời gian chạy (giây).
+    '''
+    plan: str
+    steps: list = field(default_factory=list)
+    success: bool = True
+    failed_index: int = None
+    duration: float = 0.0
+
+    def __bool__(self):
+        return self.success
+
+
+class ActionPlan:
+    # Ánh xạ loại hành động sang phương thức của Node
+    ACTIONS = {
+        'click': 'find_and_click',
+        'input': 'find_and_input',
+        'find': 'find',
+        'get_text': 'get_text',
+        'go_to': 'go_to',
+    }
+
+    def __init__(self, name: str, steps: list[Step]) -> None:
+        '''
+        Khởi tạo kế hoạch hành động khai báo. Kế hoạch được kiểm tra một lần khi tạo
+        và có thể dùng lại cho nhiều profile.
+
+        Args:
+            name (str): Tên kế hoạch, cũng là thông báo lỗi khi kế hoạch thất bại.
+            steps (list[Step]): Danh sách các bước.
+
+        Ví dụ:
+            plan = ActionPlan('unlock ví', [
+                Step('input', By.CSS_SELECTOR, "input[type='password']", text='{pin}'),
+                Step('click', By.XPATH, "//button[text()='Unlock']", retries=1),
+            ])
+            result = plan.run(node, pin='12345678')
+        '''
+        self.name = name
+        self.steps = list(steps)
+        self.validate()
+
+    def validate(self):
+        '''
+        Kiểm tra tính hợp lệ của các bước. Quăng `ValueError` nếu có bước sai cấu hình.
+        '''
+        if not self.steps:
+            raise ValueError(f'Kế hoạch "{self.name}" không có bước nào')
+
+        for index, step in enumerate(self.steps):
+            where = f'Kế hoạch "{self.name}" - bước {index} ({step.name})'
+            if step.action not in self.ACTIONS:
+                raise ValueError(f'{where}: hành động "{step.action}" không hợp lệ')
+            if step.selector and step.action == 'go_to':
+                raise ValueError(f'{where}: `go_to` không dùng `selector`')
+            if not step.selector and not step.value:
+                raise ValueError(f'{where}: thiếu `value`')
+            if not step.selector and step.action != 'go_to' and not step.by:
+                raise ValueError(f'{where}: thiếu `by`')
+            if step.action == 'input' and step.text is None:
+                raise ValueError(f'{where}: thiếu `text`')
+            if step.template and (step.selector or step.by not in _LITERALS):
+                raise ValueError(f'{where}: `template` chỉ dùng với `by` là XPath hoặc CSS selector')
+            if step.retries < 0 or step.backoff < 0:
+                raise ValueError(f'{where}: `retries` và `backoff` phải >= 0')
+
+    def _call(self, node, step: Step, params: dict):
+        method = getattr(node, self.ACTIONS[step.action])
+        if step.selector:
+            by, value = node.locate(step.selector, step.timeout)
+            if by is None:
+                return False
+        else:
+            by = step.by
+            value = step.value
+            if step.template:
+                literal = _LITERALS[by]
+                value = value.format(**{key: literal(str(param)) for key, param in params.items()})
+
+        if step.action == 'go_to':
+            return method(value, wait=step.wait, timeout=step.timeout)
+        if step.action == 'input':
+            text = step.text.format(**params) if params else step.text
+            return method(by, value, text, wait=step.wait, timeout=step.timeout)
+        return method(by, value, wait=step.wait, timeout=step.timeout)
+
+    def _run_step(self, node, step: Step, params: dict) -> StepResult:
+        result = StepResult(step.name, step.action, False)
+        start = time.perf_counter()
+        backoff = 0.0
+
+        for attempt in range(step.retries + 1):
+            if attempt:
+                begin = time.perf_counter()
+                Utility.wait_time(step.backoff * 2 ** (attempt - 1), True)
+                backoff += time.perf_counter() - begin
+            result.attempts += 1
+            output = self._call(node, step, params)
+            if output:
+                result.success = True
+                result.output = output
+                break
+
+        result.duration = time.perf_counter() - start
+        TRACER.emit('step', node.profile_name, step.name, self.name,
+                    'ok' if result.success else 'fail', backoff, result.duration)
+        return result
+
+    def run(self, node, start: int = 0, **params) -> PlanResult:
+        '''
+        Chạy kế hoạch trên một Node.
+
+        Args:
+            node (Node): Node của profile hiện tại.
+            start (int, option): Vị trí bước bắt đầu. Mặc định 0.
+            **params: Giá trị thay thế cho placeholder trong `value`/`text` của các bước.
+
+        Returns:
+            PlanResult: Kết quả từng bước, có thể dùng trực tiếp như bool.
+        '''
+        result = PlanResult(self.name)
+        begin = time.perf_counter()
+
+        for index in range(start, len(self.steps)):
+            step = self.steps[index]
+            step_result = self._run_step(node, step, params)
+            result.steps.append(step_result)
+
+            if step_result.success:
+                continue
+
+            if not step.required:
+                step_result.skipped = True
+                node.log(f'Lỗi [skip] - {self.name}: {step.name}', 'WARNING')
+                continue
+
+            node.log(f'Lỗi - {self.name}: {step.name}', 'ERROR')
+            result.success = False
+            result.failed_index = index
+            break
+
+        result.duration = time.perf_counter() - begin
+        return result
+
+    def resume(self, node, previous: PlanResult, **params) -> PlanResult:
+        '''
+        Chạy tiếp kế hoạch từ bước đã thất bại ở lần chạy trước.
+
+        Args:
+            node (Node): Node của profile hiện tại.
+            previous (PlanResult): Kết quả lần chạy trước.
+            **params: Giá trị thay thế cho placeholder.
+
+        Returns:
+            PlanResult: Kết quả lần chạy tiếp. Nếu lần trước đã thành công, trả về chính `previous`.
+        '''
+        if previous.success:
+            return previous
+        return self.run(node, previous.failed_index, **params)
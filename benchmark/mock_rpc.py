@@ -0,0 +1,156 @@
+import sys
+import json
+import random
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rpc_client import WEI
+
+
+class MockRpcNode:
+    def __init__(self, port: int = 0, gas_price: int = 2 * 10 ** 9, shuffle: bool = True, fail_status: int = 0) -> None:
+        '''
+        Node JSON-RPC giả cục bộ thay cho anvil khi thử `rpc_client`: hỗ trợ gọi đơn lẻ và batch cho
+        eth_getBalance, eth_getTransactionCount (latest/pending), eth_getTransactionReceipt, eth_gasPrice, eth_chainId.
+
+        Args:
+            port (int): Cổng lắng nghe, 0 là chọn cổng trống.
+            gas_price (int): Giá gas (wei) trả về.
+            shuffle (bool): Trả phản hồi batch theo thứ tự ngẫu nhiên (hợp lệ theo JSON-RPC 2.0).
+            fail_status (int): Số request đầu tiên bị trả HTTP 503 (thử cơ chế thử lại).
+
+        Ví dụ:
+            with MockRpcNode() as node:
+                node.fund('0x...', 0.05)
+                node.send('0x...', 0.001)          # một giao dịch đã xác nhận
+                node.send('0x...', 0.001, False)   # một giao dịch đang chờ
+                RpcClient(node.url).balances(['0x...'])
+        '''
+        self.gas_price = gas_price
+        self.shuffle = shuffle
+        self.fail_status = fail_status
+        self.balances = {}
+        self.nonces = {}
+        self.pending = {}
+        self.receipts = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with node._lock:
+                    node.requests += 1
+                    failing = node.requests <= node.fail_status
+                if failing:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    payload = None
+                if isinstance(payload, list):
+                    response = [node._handle(request) for request in payload]
+                    if node.shuffle:
+                        random.shuffle(response)
+                elif isinstance(payload, dict):
+                    response = node._handle(payload)
+                else:
+                    response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': 'Parse error'}}
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def fund(self, address: str, eth: float):
+        with self._lock:
+            address = address.lower()
+            self.balances[address] = self.balances.get(address, 0) + int(eth * WEI)
+
+    def send(self, address: str, eth: float, mined: bool = True, gas: int = 21000) -> str:
+        '''
+        Ghi một giao dịch gửi từ `address`. Trả về tx hash giả.
+        '''
+        with self._lock:
+            address = address.lower()
+            nonce = self.pending.get(address, self.nonces.get(address, 0))
+            self.pending[address] = nonce + 1
+            tx_hash = '0x' + f'{len(self.receipts):064x}'
+            self.receipts[tx_hash] = None
+            if mined:
+                self.nonces[address] = nonce + 1
+                self.balances[address] = self.balances.get(address, 0) - int(eth * WEI) - gas * self.gas_price
+                self.receipts[tx_hash] = {'transactionHash': tx_hash, 'from': address, 'status': '0x1',
+                                          'gasUsed': hex(gas), 'blockNumber': hex(len(self.receipts))}
+            return tx_hash
+
+    def _handle(self, request: dict) -> dict:
+        method, params = request.get('method'), request.get('params') or []
+        response = {'jsonrpc': '2.0', 'id': request.get('id')}
+        with self._lock:
+            if method == 'eth_getBalance':
+                response['result'] = hex(self.balances.get(params[0].lower(), 0))
+            elif method == 'eth_getTransactionCount':
+                address = params[0].lower()
+                nonce = self.nonces.get(address, 0)
+                if len(params) > 1 and params[1] == 'pending':
+                    nonce = self.pending.get(address, nonce)
+                response['result'] = hex(nonce)
+            elif method == 'eth_getTransactionReceipt':
+                response['result'] = self.receipts.get(params[0])
+            elif method == 'eth_gasPrice':
+                response['result'] = hex(self.gas_price)
+            elif method == 'eth_chainId':
+                response['result'] = hex(11155111)
+            else:
+                response['error'] = {'code': -32601, 'message': f'Method {method} not found'}
+        return response
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, name='mock-rpc', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+if __name__ == '__main__':
+    # Chạy node giả, nạp 0.05 ETH cho mọi ví trong data.txt:
+    # python benchmark/mock_rpc.py data.txt [--port 8545]
+    import argparse
+
+    from profile_source import ProfileSource, WALLET_PIN
+
+    parser = argparse.ArgumentParser(description='Node JSON-RPC giả cục bộ để thử rpc_client')
+    parser.add_argument('path', nargs='?', default=None, help='Tệp dữ liệu profile, mỗi ví được nạp --fund ETH')
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--fund', type=float, default=0.05)
+    args = parser.parse_args()
+
+    with MockRpcNode(args.port) as node:
+        if args.path:
+            for profile in ProfileSource(args.path, WALLET_PIN):
+                node.fund(profile['wallet'], args.fund)
+        print(f'Node giả chạy tại {node.url} ({len(node.balances)} ví). Ctrl+C để dừng.')
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,266 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import platform
+from pathlib import Path
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from browser_automation import BrowserManager
+from hahawallet import HaHaWallet
+from tracing import TRACER, report
+from utils import Utility
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+RESULTS_DIR = Path(__file__).parent / 'results'
+BASELINE = Path(__file__).parent / 'baseline.json'
+
+
+class MockServer:
+    def __init__(self, delay: float = 300, jitter: float = 100, fail: float = 0.0, port: int = 0) -> None:
+        '''
+        HTTP server cục bộ phục vụ `fixtures/home.html` (ví HaHa giả) và `fixtures/faucet.html` (faucet giả).
+
+        Args:
+            delay (float): Thời gian (ms) trước khi mỗi màn hình được render.
+            jitter (float): Dao động ± (ms) của `delay`.
+            fail (float): Xác suất một thao tác (Unlock, Confirm, Claim, faucet) thất bại.
+            port (int): Cổng lắng nghe, 0 là chọn cổng trống.
+        '''
+        self.config = {'delay': delay, 'jitter': jitter, 'fail': fail, 'chain': 'Ethereum'}
+        config = json.dumps(self.config).encode()
+        pages = {f'/{path.name}': path.read_bytes().replace(b'/*MOCK_CONFIG*/{', config + b' || {', 1)
+                 for path in FIXTURES.glob('*.html')}
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                body = pages.get(self.path.split('?')[0].split('#')[0])
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, name='mock-server', daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+class MockHaHaWallet(HaHaWallet):
+    # Gán bởi `run_level` trước khi chạy
+    BASE_URL = None
+
+    def __init__(self, driver, profile) -> None:
+        super().__init__(driver, profile)
+        self.url = self.BASE_URL
+        self.FAUCET_URL = f'{self.BASE_URL}/faucet.html'
+
+
+class MockMain:
+    def __init__(self, driver, profile) -> None:
+        self.driver = driver
+        self.profile = profile
+
+    def _run(self):
+        MockHaHaWallet(self.driver, self.profile)._run_logic()
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.5) -> None:
+        '''
+        Lấy mẫu RSS của tiến trình hiện tại và mọi tiến trình con (chromedriver, Chrome) theo chu kỳ.
+        '''
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    @staticmethod
+    def _children(pid: int) -> list[int]:
+        children = []
+        try:
+            for task in os.listdir(f'/proc/{pid}/task'):
+                with open(f'/proc/{pid}/task/{task}/children') as file:
+                    children.extend(int(child) for child in file.read().split())
+        except OSError:
+            pass
+        return children
+
+    @staticmethod
+    def _rss(pid: int) -> int:
+        try:
+            with open(f'/proc/{pid}/status') as file:
+                for line in file:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def tree_rss(self) -> int:
+        try:
+            import psutil
+            process = psutil.Process()
+            total = process.memory_info().rss
+            for child in process.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total
+        except ImportError:
+            pass
+        total, stack = 0, [os.getpid()]
+        while stack:
+            pid = stack.pop()
+            total += self._rss(pid)
+            stack.extend(self._children(pid))
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(self.tree_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {'peak_mb': None, 'mean_mb': None}
+        return {'peak_mb': max(self.samples) / 1048576, 'mean_mb': sum(self.samples) / len(self.samples) / 1048576}
+
+
+def _profiles(count: int, prefix: str) -> list[dict]:
+    return [{'profile': f'{prefix}{index}', 'wallet': '0x' + f'{index:040x}', 'pin': '12345678'} for index in range(count)]
+
+
+def run_level(server: MockServer, concurrency: int, profiles: int, headless: bool = True, delay_between_profiles: float = 0) -> dict:
+    '''
+    Chạy `profiles` profile qua `BrowserManager.run_multi` với `concurrency` luồng trên ví/faucet giả.
+
+    Returns:
+        dict: {'concurrency', 'profiles', 'success', 'elapsed', 'profiles_per_hour', 'rss', 'stages'}.
+    '''
+    MockHaHaWallet.BASE_URL = server.url
+    user_data_dir = Path(tempfile.mkdtemp(prefix='haha-bench-'))
+    trace_path = user_data_dir / 'traces.jsonl'
+
+    manager = BrowserManager(MockMain)
+    manager.user_data_dir = user_data_dir
+    if headless:
+        manager.config_fleet('headless')
+    TRACER.configure(trace_path)
+
+    try:
+        with RssSampler() as sampler:
+            begin = time.perf_counter()
+            results = manager.run_multi(_profiles(profiles, f'bench{concurrency}_'), concurrency, delay_between_profiles)
+            elapsed = time.perf_counter() - begin
+        TRACER.configure(None)
+
+        stages = {row['action']: {'count': row['count'], 'errors': row['errors'], 'p50': row['p50'], 'p95': row['p95']}
+                  for row in report(trace_path) if row['kind'] in ('stage', 'launch')}
+    finally:
+        TRACER.configure(None)
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+    success = sum(1 for result in results if result['success'])
+    return {
+        'concurrency': concurrency,
+        'profiles': profiles,
+        'success': success,
+        'elapsed': elapsed,
+        'profiles_per_hour': success / elapsed * 3600 if elapsed else 0.0,
+        'rss': sampler.summary(),
+        'stages': stages,
+    }
+
+
+def compare(current: list[dict], baseline: list[dict]):
+    '''
+    In chênh lệch profiles/hour và RSS đỉnh so với baseline theo từng mức song song.
+    '''
+    base = {level['concurrency']: level for level in baseline}
+    print(f"{'conc':>4} {'profiles/h':>11} {'baseline':>9} {'Δ':>7} {'peak MB':>8} {'baseline':>9}")
+    for level in current:
+        old = base.get(level['concurrency'])
+        if old is None:
+            continue
+        delta = (level['profiles_per_hour'] / old['profiles_per_hour'] - 1) if old['profiles_per_hour'] else 0
+        print(f"{level['concurrency']:>4} {level['profiles_per_hour']:>11.1f} {old['profiles_per_hour']:>9.1f} {delta:>+7.1%} "
+              f"{level['rss']['peak_mb'] or 0:>8.0f} {old['rss']['peak_mb'] or 0:>9.0f}")
+
+
+if __name__ == '__main__':
+    # python benchmark/offline.py [--levels 1 2 4 8] [--profiles-per-thread 2] [--delay 300] [--fail 0.05] [--sleep-scale 0.1] [--save-baseline]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Đo thông lượng HaHaWallet trên ví/faucet giả cục bộ (cần Chrome)')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8], help='Các mức chạy song song')
+    parser.add_argument('--profiles-per-thread', type=int, default=2)
+    parser.add_argument('--delay', type=float, default=300, help='Thời gian render mỗi màn hình (ms)')
+    parser.add_argument('--jitter', type=float, default=100)
+    parser.add_argument('--fail', type=float, default=0.0, help='Xác suất thao tác thất bại')
+    parser.add_argument('--sleep-scale', type=float, default=1.0, help='Nhân các lần chờ cố định (Utility.wait_time), 1 là như thật')
+    parser.add_argument('--headed', action='store_true', help='Mở cửa sổ Chrome thay vì headless')
+    parser.add_argument('--save-baseline', action='store_true', help='Lưu kết quả làm baseline')
+    args = parser.parse_args()
+
+    if args.sleep_scale != 1.0:
+        wait_time = Utility.wait_time
+        Utility.wait_time = staticmethod(lambda second=5, fix=False: wait_time(second * args.sleep_scale, fix))
+
+    levels = []
+    with MockServer(args.delay, args.jitter, args.fail) as server:
+        for concurrency in args.levels:
+            level = run_level(server, concurrency, concurrency * args.profiles_per_thread, not args.headed)
+            levels.append(level)
+            Utility.logger(message=f"x{concurrency}: {level['success']}/{level['profiles']} profile trong {level['elapsed']:.0f}s, "
+                                   f"{level['profiles_per_hour']:.1f} profile/giờ, RSS đỉnh {level['rss']['peak_mb'] or 0:.0f} MB")
+
+    result = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'options': vars(args),
+        'levels': levels,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"offline-{datetime.now():%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+    Utility.logger(message=f'Lưu kết quả vào {path}')
+
+    if BASELINE.exists():
+        compare(levels, json.loads(BASELINE.read_text(encoding='utf-8'))['levels'])
+    if args.save_baseline:
+        shutil.copyfile(path, BASELINE)
+        Utility.logger(message=f'Cập nhật baseline {BASELINE}')
@@ -0,0 +1,540 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import threading
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.timeouts import Timeouts
+
+from action_plan import ActionPlan
+from browser_automation import BrowserManager, Node
+from hahawallet import HaHaWallet
+from tracing import TRACER
+from utils import Utility
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+BASELINE = Path(__file__).parent / 'orchestration_baseline.json'
+
+# Locator không bao giờ xuất hiện trong luồng HaHaWallet mặc định: không có nút Reload, mạng đang chọn chưa phải Sepolia,
+# giao dịch không báo lỗi
+HAHA_RULES = {
+    'Reload': None,
+    '[normalize-space()="Sepolia"]': None,
+    '"failed")]': None,
+    '"error")]': None,
+}
+
+# Các hàm được đo CPU riêng (thời gian tự thân, không tính hàm con cũng được đo)
+TARGETS = [
+    (Node, 'go_to'), (Node, 'get_url'), (Node, 'find'), (Node, 'find_and_click'), (Node, 'find_and_input'),
+    (Node, 'get_text'), (Node, 'wait_for_any'), (Node, 'locate'), (Node, 'execute_chain'),
+    (ActionPlan, 'run'),
+    (Utility, 'logger'),
+    (BrowserManager, '_browser'), (BrowserManager, 'run_browser'),
+]
+
+
+class VirtualClock:
+    '''
+    Đồng hồ ảo: trong khối `with`, `time.sleep` không ngủ mà cộng dồn vào độ lệch của luồng gọi,
+    `time.perf_counter`/`time.monotonic`/`time.time` trả về giờ thật cộng độ lệch đó.
+
+    Mô tả:
+        - Mỗi luồng có độ lệch riêng, nên thời gian mô phỏng của một profile chỉ phụ thuộc các lần chờ của chính nó.
+        - `WebDriverWait`, `Utility.wait_time`, `Node._pace` và stagger của `run_multi` đều dùng các hàm trên nên được nén hết.
+        - `threading.Condition`/`queue` giữ đồng hồ thật (đã bind `time.monotonic` lúc import), nên việc chờ ô trống vẫn đúng.
+    '''
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._originals = None
+
+    def offset(self) -> float:
+        return getattr(self._local, 'offset', 0.0)
+
+    def sleep(self, second: float):
+        if second > 0:
+            self._local.offset = self.offset() + second
+        self._originals['sleep'](0)  # nhường GIL như một lần ngủ thật
+
+    def __enter__(self):
+        self._originals = {name: getattr(time, name) for name in ('sleep', 'perf_counter', 'monotonic', 'time')}
+        perf_counter, monotonic, now = self._originals['perf_counter'], self._originals['monotonic'], self._originals['time']
+        time.sleep = self.sleep
+        time.perf_counter = lambda: perf_counter() + self.offset()
+        time.monotonic = lambda: monotonic() + self.offset()
+        time.time = lambda: now() + self.offset()
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self._originals.items():
+            setattr(time, name, func)
+        return False
+
+
+class ElementScript:
+    def __init__(self, latency: float = 0.3, jitter: float = 0.5, page_load: float = 0.8, launch: float = 2.0,
+                 fail: float = 0.0, rules: dict = None, screenshot_kb: int = 150) -> None:
+        '''
+        Kịch bản độ trễ của `StubDriver`: mỗi locator xuất hiện sau một khoảng thời gian kể từ lần đổi màn hình gần nhất
+        (điều hướng hoặc click).
+
+        Args:
+            latency (float): Độ trễ mặc định (giây) của một phần tử.
+            jitter (float): Dao động ± theo tỉ lệ của độ trễ, ví dụ 0.5 là 50%.
+            page_load (float): Thời gian tải trang (giây) cho `get` và `go_to`.
+            launch (float): Thời gian khởi động trình duyệt (giây).
+            fail (float): Xác suất một locator không xuất hiện trên một màn hình (gây timeout/retry).
+            rules (dict, option): {chuỗi con của locator: độ trễ}. Độ trễ None là không bao giờ xuất hiện.
+            screenshot_kb (int): Kích thước ảnh chụp màn hình giả.
+
+        Ví dụ:
+            ElementScript(latency=0.5, fail=0.01, rules={'Reload': None, 'Confirm': 3.0})
+        '''
+        self.latency = latency
+        self.jitter = jitter
+        self.page_load = page_load
+        self.launch = launch
+        self.fail = fail
+        self.rules = rules or {}
+        self.screenshot = b'\x89PNG\r\n\x1a\n' + os.urandom(screenshot_kb * 1024)
+
+    def delay(self, value: str) -> float | None:
+        base = self.latency
+        for pattern, latency in self.rules.items():
+            if pattern in value:
+                base = latency
+                break
+        if base is None or random.random() < self.fail:
+            return None
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class StubElement:
+    def __init__(self, driver: 'StubDriver', by: str, value: str) -> None:
+        self._driver = driver
+        self._version = driver._version
+        self.locator = (by, value)
+
+    def _check(self):
+        if self._version != self._driver._version:
+            raise StaleElementReferenceException(f'{self.locator[0]}={self.locator[1]}')
+
+    def is_displayed(self) -> bool:
+        self._check()
+        return True
+
+    def is_enabled(self) -> bool:
+        self._check()
+        return True
+
+    def click(self):
+        self._check()
+        self._driver._change()
+
+    def send_keys(self, text: str):
+        self._check()
+        self._driver._values[self.locator] = self._driver._values.get(self.locator, '') + text
+
+    def clear(self):
+        self._check()
+        self._driver._values.pop(self.locator, None)
+
+    def get_attribute(self, name: str):
+        self._check()
+        return self._driver._values.get(self.locator, '') if name == 'value' else None
+
+    @property
+    def text(self) -> str:
+        return self.locator[1]
+
+
+class StubDriver:
+    def __init__(self, script: ElementScript, service=None, options=None) -> None:
+        '''
+        WebDriver giả thay cho `webdriver.Chrome`: không có trình duyệt, phần tử xuất hiện theo `ElementScript`
+        và mọi lần chờ đi qua `time.sleep` (được nén bởi `VirtualClock`).
+        Hỗ trợ đúng phần API mà `Node`, `BrowserManager` và các `expected_conditions` dùng.
+        '''
+        self.script = script
+        self.options = options
+        self.current_url = 'about:blank'
+        self.title = 'stub'
+        self.window_handles = ['stub-0']
+        self.current_window_handle = 'stub-0'
+        self.switch_to = self
+        self.timeouts = Timeouts(script=30)
+        self._version = 0
+        self._since = 0.0
+        self._appear = {}
+        self._values = {}
+        self._ready_at = 0.0
+        time.sleep(script.launch)
+        self._change()
+
+    def _change(self):
+        # Màn hình mới: các phần tử xuất hiện lại theo kịch bản
+        self._version += 1
+        self._since = time.perf_counter()
+        self._appear.clear()
+        self._values.clear()
+
+    def _navigate(self, url: str):
+        self.current_url = url
+        self._change()
+        self._ready_at = self._since + self.script.page_load
+        self._since = self._ready_at
+
+    def _appears_at(self, value: str) -> float | None:
+        if value not in self._appear:
+            delay = self.script.delay(value)
+            self._appear[value] = None if delay is None else self._since + delay
+        return self._appear[value]
+
+    def _present(self, value: str) -> bool:
+        at = self._appears_at(value)
+        return at is not None and time.perf_counter() >= at
+
+    def get(self, url: str):
+        self._navigate(url)
+        time.sleep(self.script.page_load)
+
+    def find_element(self, by: str, value: str) -> StubElement:
+        if not self._present(value):
+            raise NoSuchElementException(f'{by}={value}')
+        return StubElement(self, by, value)
+
+    def find_elements(self, by: str, value: str) -> list[StubElement]:
+        return [StubElement(self, by, value)] if self._present(value) else []
+
+    def execute_script(self, script: str, *args):
+        if script == Node._JS_SET_VALUE:
+            element, text = args
+            self._values[element.locator] = text
+        elif script.startswith('window.__nodeNavigating'):
+            self._navigate(args[0])
+        elif script == 'return !window.__nodeNavigating':
+            return True
+        elif script == Node._JS_TRANSFERRED_BYTES:
+            return 0
+        return None
+
+    def execute_async_script(self, script: str, *args):
+        now = time.perf_counter()
+        if script == Node._JS_WAIT_READY:
+            time.sleep(self._ready_at - now)
+            return True
+        if script == Node._JS_WAIT_QUIET:
+            time.sleep(args[0] / 1000)
+            return True
+        if script == Node._JS_WAIT_FOR_ANY:
+            candidates, timeout = args[0], args[1] / 1000
+            times = [self._appears_at(selector) for _, selector in candidates]
+            first = min((at for at in times if at is not None), default=None)
+            if first is None or first - now > timeout:
+                time.sleep(timeout)
+                return [-1, None]
+            time.sleep(first - now)
+            # Nhiều locator cùng có mặt thì lấy theo thứ tự trong danh sách, giống script thật
+            index = next(i for i, at in enumerate(times) if at is not None and at <= first)
+            return [index, StubElement(self, 'xpath' if candidates[index][0] == 'xpath' else 'css selector', candidates[index][1])]
+        return None
+
+    def set_script_timeout(self, timeout: float):
+        self.timeouts.script = timeout
+
+    def execute_cdp_cmd(self, cmd: str, params: dict):
+        return {}
+
+    def get_log(self, log_type: str):
+        raise WebDriverException(f'log type "{log_type}" chưa bật')
+
+    def get_screenshot_as_png(self) -> bytes:
+        return self.script.screenshot
+
+    def save_screenshot(self, path: str) -> bool:
+        return True
+
+    def set_window_rect(self, x=None, y=None, width=None, height=None):
+        pass
+
+    def window(self, handle: str):
+        pass
+
+    def quit(self):
+        pass
+
+
+class CpuProfiler:
+    def __init__(self) -> None:
+        '''
+        Đo thời gian CPU của luồng (`time.thread_time`, không bị `VirtualClock` ảnh hưởng) theo từng hàm trong `TARGETS`.
+        Mỗi hàm chỉ tính phần tự thân: thời gian của hàm con cũng được đo (kể cả `StubDriver`) được trừ ra.
+        '''
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._buckets = []
+        self._patched = []
+        self.profiles = []
+
+    def _bucket(self) -> dict:
+        bucket = getattr(self._local, 'bucket', None)
+        if bucket is None:
+            bucket = self._local.bucket = {}
+            self._local.stack = []
+            with self._lock:
+                self._buckets.append(bucket)
+        return bucket
+
+    def measure(self, name: str, func):
+        profiler = self
+
+        def measured(*args, **kwargs):
+            bucket = profiler._bucket()
+            stack = profiler._local.stack
+            stack.append(0.0)
+            start = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.thread_time() - start
+                child = stack.pop()
+                item = bucket.setdefault(name, [0, 0.0])
+                item[0] += 1
+                item[1] += elapsed - child
+                if stack:
+                    stack[-1] += elapsed
+                if name == 'BrowserManager.run_browser':
+                    with profiler._lock:
+                        profiler.profiles.append(elapsed)
+
+        measured.__name__ = func.__name__
+        measured.__qualname__ = getattr(func, '__qualname__', func.__name__)
+        return measured
+
+    def instrument(self, owner, attribute: str, name: str = None):
+        raw = owner.__dict__[attribute]
+        name = name or f'{owner.__name__}.{attribute}'
+        if isinstance(raw, staticmethod):
+            setattr(owner, attribute, staticmethod(self.measure(name, raw.__func__)))
+        else:
+            setattr(owner, attribute, self.measure(name, raw))
+        self._patched.append((owner, attribute, raw))
+
+    def restore(self):
+        for owner, attribute, raw in reversed(self._patched):
+            setattr(owner, attribute, raw)
+        self._patched.clear()
+
+    def totals(self) -> dict:
+        result = {}
+        with self._lock:
+            for bucket in self._buckets:
+                for name, (calls, cpu) in bucket.items():
+                    item = result.setdefault(name, [0, 0.0])
+                    item[0] += calls
+                    item[1] += cpu
+        return result
+
+
+class BenchMain:
+    def __init__(self, driver, profile) -> None:
+        self.driver = driver
+        self.profile = profile
+
+    def _run(self):
+        # Không gọi SELECTORS.save()/SCHEDULE.save() như hahawallet.Main để không ghi đè thống kê thật
+        HaHaWallet(self.driver, self.profile)._run_logic()
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))] if values else 0.0
+
+
+@contextlib.contextmanager
+def _quiet_stdout():
+    # Log của hàng nghìn profile đi vào /dev/null; Utility.logger vẫn chạy đầy đủ
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            yield
+        finally:
+            from log_backend import LOGGER
+            LOGGER.flush()
+            sys.stdout = stdout
+
+
+def run(profiles: int = 1000, concurrency: int = 8, script: ElementScript = None, trace: bool = False,
+        pacing: str = 'fixed', input_mode: str = 'char', quiet: bool = True) -> dict:
+    '''
+    Chạy `profiles` profile HaHaWallet giả qua `BrowserManager.run_multi` với `StubDriver` (thay `webdriver.Chrome`
+    nên `BrowserManager._browser` vẫn dựng ChromeOptions như thật) và `VirtualClock`.
+
+    Args:
+        profiles (int): Số profile mô phỏng.
+        concurrency (int): Số luồng chạy song song.
+        script (ElementScript, option): Kịch bản độ trễ. Mặc định dùng `HAHA_RULES`.
+        trace (bool): Bật `TRACER` (ghi vào tệp tạm) để tính cả chi phí ghi span.
+        pacing (str): Chế độ pacing của Node ('fixed' | 'ready').
+        input_mode (str): Chế độ nhập của Node ('char' | 'bulk' | 'js' | 'typing').
+        quiet (bool): Bỏ log ra /dev/null (log vẫn được tạo và đưa vào hàng đợi như thật).
+
+    Returns:
+        dict: {'profiles', 'success', 'wall', 'process_cpu', 'scheduler_cpu', 'profile_cpu', 'simulated', 'evidence', 'actions'}.
+            Thời gian CPU tính bằng giây; `actions` là {hàm: {'calls', 'cpu', 'us_per_call'}}.
+    '''
+    script = script or ElementScript(rules=HAHA_RULES)
+    profiler = CpuProfiler()
+    for owner, attribute in TARGETS:
+        profiler.instrument(owner, attribute)
+    for attribute in ('__init__', 'get', 'find_element', 'find_elements', 'execute_script', 'execute_async_script', 'get_screenshot_as_png'):
+        profiler.instrument(StubDriver, attribute, '(stub driver)')
+    for attribute in ('click', 'send_keys', 'get_attribute', 'is_displayed', 'is_enabled'):
+        profiler.instrument(StubElement, attribute, '(stub driver)')
+
+    evidence = {'count': 0, 'bytes': 0}
+
+    def sink(profile_name, png, message):
+        evidence['count'] += 1
+        evidence['bytes'] += len(png)
+
+    records = [{'profile': f'stub{index}', 'wallet': '0x' + f'{index:040x}', 'pin': '12345678'} for index in range(profiles)]
+    manager = BrowserManager(BenchMain)
+    manager.evidence_sink = profiler.measure('evidence_sink', sink)
+    defaults = (Node.PACING, Node.JITTER, Node.JITTER_BUDGET, Node.INPUT_MODE)
+    manager.config_pacing(pacing)
+    manager.config_input_mode(input_mode)
+    trace_path = RESULTS_DIR / f'orchestration-traces-{os.getpid()}.jsonl'
+    if trace:
+        TRACER.configure(trace_path)
+
+    chrome = webdriver.Chrome
+    webdriver.Chrome = lambda service=None, options=None: StubDriver(script, service, options)
+    try:
+        with _quiet_stdout() if quiet else contextlib.nullcontext():
+            begin_wall = time.perf_counter()
+            with VirtualClock():
+                begin_process = time.process_time()
+                begin_scheduler = time.thread_time()
+                results = manager.run_multi(records, concurrency, 0)
+                scheduler_cpu = time.thread_time() - begin_scheduler
+                process_cpu = time.process_time() - begin_process
+            wall = time.perf_counter() - begin_wall
+    finally:
+        webdriver.Chrome = chrome
+        profiler.restore()
+        Node.set_pacing(*defaults[:3])
+        Node.set_input_mode(defaults[3])
+        if trace:
+            TRACER.configure(None)
+            trace_path.unlink(missing_ok=True)
+
+    actions = {name: {'calls': calls, 'cpu': cpu, 'us_per_call': cpu / calls * 1e6 if calls else 0.0}
+               for name, (calls, cpu) in sorted(profiler.totals().items(), key=lambda item: -item[1][1])}
+    durations = [result['duration'] for result in results]
+    return {
+        'profiles': profiles,
+        'concurrency': concurrency,
+        'success': sum(1 for result in results if result['success']),
+        'wall': wall,
+        'process_cpu': process_cpu,
+        'scheduler_cpu': scheduler_cpu,
+        'profile_cpu': {
+            'mean': sum(profiler.profiles) / len(profiler.profiles) if profiler.profiles else 0.0,
+            'p50': _percentile(profiler.profiles, 50),
+            'p95': _percentile(profiler.profiles, 95),
+        },
+        'simulated': {'p50': _percentile(durations, 50), 'p95': _percentile(durations, 95)},
+        'evidence': evidence,
+        'actions': actions,
+    }
+
+
+def print_report(result: dict):
+    profiles = result['profiles'] or 1
+    print(f"{result['success']}/{result['profiles']} profile x{result['concurrency']} trong {result['wall']:.2f}s thật "
+          f"({result['profiles'] / result['wall']:.0f} profile/s), CPU tiến trình {result['process_cpu']:.2f}s")
+    print(f"Mô phỏng mỗi profile: p50 {result['simulated']['p50']:.0f}s, p95 {result['simulated']['p95']:.0f}s; "
+          f"{result['evidence']['count']} ảnh lỗi ({result['evidence']['bytes'] / 1048576:.1f} MB)")
+    print(f"CPU mỗi profile: mean {result['profile_cpu']['mean'] * 1e3:.2f} ms, p50 {result['profile_cpu']['p50'] * 1e3:.2f} ms, "
+          f"p95 {result['profile_cpu']['p95'] * 1e3:.2f} ms; bộ lập lịch {result['scheduler_cpu'] / profiles * 1e6:.0f} µs/profile")
+    print(f"{'hàm':<30} {'calls':>9} {'CPU s':>8} {'µs/call':>9} {'µs/profile':>11}")
+    for name, action in result['actions'].items():
+        print(f"{name:<30} {action['calls']:>9} {action['cpu']:>8.3f} {action['us_per_call']:>9.1f} "
+              f"{action['cpu'] / profiles * 1e6:>11.1f}")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    '''
+    So sánh CPU mỗi profile (mean) và µs/call của từng hàm với baseline.
+
+    Returns:
+        bool: False nếu CPU mỗi profile tăng quá `tolerance` (ví dụ 0.2 là 20%).
+    '''
+    old = baseline['profile_cpu']['mean']
+    delta = current['profile_cpu']['mean'] / old - 1 if old else 0.0
+    print(f"CPU mỗi profile: {current['profile_cpu']['mean'] * 1e3:.2f} ms, baseline {old * 1e3:.2f} ms ({delta:+.1%})")
+    for name, action in current['actions'].items():
+        previous = baseline['actions'].get(name)
+        if previous and previous['us_per_call']:
+            change = action['us_per_call'] / previous['us_per_call'] - 1
+            if abs(change) > tolerance:
+                print(f"  {name:<30} {action['us_per_call']:>9.1f} µs/call, baseline {previous['us_per_call']:.1f} ({change:+.1%})")
+    return delta <= tolerance
+
+
+if __name__ == '__main__':
+    # python benchmark/orchestration.py [--profiles 2000] [--concurrency 8] [--fail 0.01] [--trace] [--save-baseline] [--tolerance 0.2]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Đo chi phí CPU phía Python của bộ điều phối với WebDriver giả và đồng hồ ảo (không cần Chrome)')
+    parser.add_argument('--profiles', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.3, help='Độ trễ xuất hiện phần tử (giây, thời gian ảo)')
+    parser.add_argument('--jitter', type=float, default=0.5)
+    parser.add_argument('--fail', type=float, default=0.0, help='Xác suất một locator không xuất hiện')
+    parser.add_argument('--pacing', default='fixed', choices=['fixed', 'ready'])
+    parser.add_argument('--input-mode', default='char', choices=['char', 'bulk', 'js', 'typing'])
+    parser.add_argument('--trace', action='store_true', help='Bật TRACER để tính cả chi phí ghi span')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='In log của các profile')
+    parser.add_argument('--save-baseline', action='store_true', help='Lưu kết quả làm baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Mức tăng CPU mỗi profile cho phép so với baseline')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    script = ElementScript(args.latency, args.jitter, fail=args.fail, rules=HAHA_RULES)
+    result = run(args.profiles, args.concurrency, script, args.trace, args.pacing, args.input_mode, not args.verbose)
+    print_report(result)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    path = RESULTS_DIR / f"orchestration-{datetime.now():%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps({
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'options': vars(args),
+        **result,
+    }, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f'Lưu kết quả vào {path}')
+
+    passed = True
+    if BASELINE.exists():
+        passed = compare(result, json.loads(BASELINE.read_text(encoding='utf-8')), args.tolerance)
+    if args.save_baseline:
+        BASELINE.write_text(path.read_text(encoding='utf-8'), encoding='utf-8')
+        print(f'Cập nhật baseline {BASELINE}')
+    sys.exit(0 if passed else 1)
@@ -1,8 +1,17 @@
-import requests
+import os
 import sys
+import json
+import time
+import zlib
+import random
+import atexit
+import shutil
+import threading
+import subprocess
 from pathlib import Path
-from io import BytesIO
 from math import ceil
+from typing import Iterable
+from collections import deque
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 
@@ -12,13 +21,118 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException, ElementNotVisibleException
-from screeninfo import get_monitors
-
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, ElementClickInterceptedException, ElementNotInteractableException, ElementNotVisibleException, WebDriverException
+
+from driver_pool import DriverPool
+from evidence_uploader import EvidenceUploader
+from extension_cache import ExtensionCache
+from log_backend import LOGGER
+from profile_maintenance import maintain_profile
+from profile_source import ProfileSource, SECRETS_PASSWORD
+from resource_policy import ResourcePolicy, RESOURCE_STATS, match_policy
+from rpc_client import CHAIN
+from run_journal import JOURNAL
+from task_schedule import SCHEDULE, TaskRule
+from tracing import TRACER
 from utils import Utility
 
+# Ô trong ma trận vị trí không được dùng
+_BLOCKED = object()
+
+
+def _available_memory_mb() -> float | None:
+    '''
+    Bộ nhớ còn dùng được (MB): ưu tiên `psutil`, nếu không có thì đọc `MemAvailable` trong /proc/meminfo.
+    Trả về None nếu không xác định được.
+    '''
+    try:
+        import psutil
+        return psutil.virtual_memory().available / 1024 / 1024
+    except ImportError:
+        pass
+    try:
+        with open('/proc/meminfo') as file:
+            for line in file:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
 
 class Node:
+    # Cấu hình pacing mặc định cho mọi Node trong lần chạy, thay đổi qua `Node.set_pacing`
+    PACING = 'fixed'
+    JITTER = 1.5
+    JITTER_BUDGET = None
+    INPUT_MODE = 'char'
+    READY_SIGNALS = ('complete', 'interactive', 'element', 'network_idle', 'none')
+    RESOURCE_POLICIES = {}  # mẫu host -> ResourcePolicy, cấu hình qua `BrowserManager.config_resource_policy`
+
+    # Tổng số byte đã truyền của tài liệu hiện tại (navigation + resource)
+    _JS_TRANSFERRED_BYTES = '''
+        return performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+            .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+    '''
+
+    # Chờ DOMContentLoaded ('interactive') hoặc load ('complete') của tài liệu hiện tại
+    _JS_WAIT_READY = '''
+        const target = arguments[0], done = arguments[arguments.length - 1];
+        const reached = () => target === 'interactive' ? document.readyState !== 'loading' : document.readyState === 'complete';
+        if (reached()) { done(true); return; }
+        if (target === 'interactive') document.addEventListener('DOMContentLoaded', () => done(true), { once: true });
+        else window.addEventListener('load', () => done(true), { once: true });
+    '''
+
+    # Chờ khoảng lặng `arguments[0]` ms không có resource mới hoàn tất
+    _JS_WAIT_QUIET = '''
+        const idleMs = arguments[0], done = arguments[arguments.length - 1];
+        let timer = null;
+        const observer = new PerformanceObserver(() => { clearTimeout(timer); timer = setTimeout(finish, idleMs); });
+        const finish = () => { observer.disconnect(); done(true); };
+        timer = setTimeout(finish, idleMs);
+        observer.observe({ type: 'resource', buffered: false });
+    '''
+
+    # Chờ phần tử đầu tiên khớp một trong các locator, trả về [index, element] hoặc [-1, null] khi hết giờ
+    _JS_WAIT_FOR_ANY = '''
+        const candidates = arguments[0], timeoutMs = arguments[1], visible = arguments[2];
+        const done = arguments[arguments.length - 1];
+        const lookup = ([kind, selector]) => {
+            const el = kind === 'xpath'
+                ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                : document.querySelector(selector);
+            if (el && visible && !(el.offsetWidth || el.offsetHeight || el.getClientRects().length)) return null;
+            return el;
+        };
+        const check = () => {
+            for (let i = 0; i < candidates.length; i++) {
+                const el = lookup(candidates[i]);
+                if (el) return [i, el];
+            }
+            return null;
+        };
+        const first = check();
+        if (first) { done(first); return; }
+        let timer = null;
+        const observer = new MutationObserver(() => {
+            const hit = check();
+            if (hit) finish(hit);
+        });
+        const finish = (result) => { observer.disconnect(); clearTimeout(timer); done(result); };
+        timer = setTimeout(() => finish([-1, null]), timeoutMs);
+        observer.observe(document.documentElement, { childList: true, subtree: true, attributes: true, characterData: true });
+    '''
+
+    # Gán value qua setter gốc (để React nhận giá trị) và phát sự kiện input/change
+    _JS_SET_VALUE = '''
+        const el = arguments[0];
+        const proto = el.tagName === 'TEXTAREA' ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, arguments[1]);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+    '''
+
     def __init__(self, driver: webdriver.Chrome, profile_name: str) -> None:
         '''
         Khởi tạo một đối tượng Node để quản lý và thực hiện các tác vụ tự động hóa trình duyệt.
@@ -33,6 +147,105 @@ class Node:
         self.wait = 5
         self.timeout = 20  # Thời gian chờ mặc định (giây) cho các thao tác
 
+        # 'fixed': ngủ `wait` giây trước mỗi hành động (hành vi cũ)
+        # 'ready': hành động ngay khi phần tử sẵn sàng, sau đó thêm jitter ngẫu nhiên nhỏ
+        self.pacing = Node.PACING
+        self.jitter = Node.JITTER
+        self.jitter_budget = Node.JITTER_BUDGET
+        self._jitter_spent = 0.0
+        self.input_mode = Node.INPUT_MODE  # Chiến lược nhập văn bản mặc định của find_and_input
+        self.timings = []  # Thời gian trễ có chủ đích / chờ thực tế của từng hành động
+        self.last_time_to_ready = None  # Thời gian đến khi trang sẵn sàng của lần go_to gần nhất
+        self.resource_policy = None  # ResourcePolicy đang áp dụng cho trình duyệt
+        self._network_log = []  # Sự kiện CDP Network.* của trang đang tải (performance log)
+        self.selectors = None  # SelectorRegistry dùng cho `locate`, gán bởi handler
+
+    @classmethod
+    def set_pacing(cls, mode: str = 'fixed', jitter: float = 1.5, jitter_budget: float = None):
+        '''
+        Thiết lập chế độ pacing mặc định cho các Node được tạo sau lời gọi này.
+
+        Args:
+            mode (str): 'fixed' (ngủ cố định trước hành động) hoặc 'ready' (hành động ngay khi phần tử sẵn sàng).
+            jitter (float): Khoảng trễ ngẫu nhiên tối đa (giây) sau mỗi hành động ở chế độ 'ready'.
+            jitter_budget (float, option): Tổng số giây jitter tối đa cho một Node (một profile). None là không giới hạn.
+        '''
+        if mode not in ('fixed', 'ready'):
+            raise ValueError(f'Chế độ pacing không hợp lệ: {mode}')
+        cls.PACING = mode
+        cls.JITTER = jitter
+        cls.JITTER_BUDGET = jitter_budget
+
+    @classmethod
+    def set_input_mode(cls, mode: str = 'char'):
+        '''
+        Thiết lập chiến lược nhập văn bản mặc định của `find_and_input` cho các Node được tạo sau lời gọi này.
+
+        Args:
+            mode (str): 'char' | 'bulk' | 'js' | 'typing'. Xem `find_and_input`.
+        '''
+        if mode not in ('char', 'bulk', 'js', 'typing'):
+            raise ValueError(f'Chế độ nhập không hợp lệ: {mode}')
+        cls.INPUT_MODE = mode
+
+    def _pace(self, wait: float, fix: bool = False) -> float:
+        '''
+        Thực hiện khoảng trễ có chủ đích theo chế độ pacing hiện tại.
+
+        Args:
+            wait (float): Thời gian chờ dùng ở chế độ 'fixed'.
+            fix (bool): Truyền cho `Utility.wait_time` ở chế độ 'fixed'.
+
+        Returns:
+            float: Số giây đã thực sự ngủ.
+        '''
+        if self.pacing == 'ready':
+            second = random.uniform(0, self.jitter)
+            if self.jitter_budget is not None:
+                second = max(0.0, min(second, self.jitter_budget - self._jitter_spent))
+            self._jitter_spent += second
+            fix = True
+        else:
+            second = wait
+
+        start = time.perf_counter()
+        if second > 0:
+            Utility.wait_time(second, fix)
+        return time.perf_counter() - start
+
+    def _record(self, action: str, locator: str, delay: float, start: float, success: bool):
+        '''
+        Ghi lại thời gian của một hành động: phần trễ có chủ đích (`delay`) và phần chờ/làm việc thực tế (`waited`).
+        '''
+        total = time.perf_counter() - start
+        TRACER.emit('action', self.profile_name, action, locator,
+                    'ok' if success else 'fail', delay, total)
+        self.timings.append({
+            'action': action,
+            'locator': locator,
+            'success': success,
+            'delay': round(delay, 3),
+            'waited': round(total - delay, 3),
+            'total': round(total, 3),
+        })
+
+    def timing_report(self) -> dict:
+        '''
+        Tổng hợp thời gian trễ có chủ đích và thời gian chờ thực tế theo từng loại hành động.
+
+        Returns:
+            dict: {action: {'count', 'delay', 'waited', 'total'}} và khóa '_all' cho tổng cộng.
+        '''
+        report = {}
+        for timing in self.timings:
+            for key in (timing['action'], '_all'):
+                item = report.setdefault(key, {'count': 0, 'delay': 0.0, 'waited': 0.0, 'total': 0.0})
+                item['count'] += 1
+                item['delay'] += timing['delay']
+                item['waited'] += timing['waited']
+                item['total'] += timing['total']
+        return report
+
     def _execute_node(self, node_action, *args):
         """
         Thực hiện một hành động node bất kỳ.
@@ -51,6 +264,9 @@ class Node:
         Thực hiện chuỗi các node hành động. 
         Dừng lại nếu một node thất bại.
 
+        Ghi chú:
+            - Với chuỗi cần retry, bước tùy chọn, kết quả từng bước hoặc chạy tiếp từ bước lỗi, dùng `action_plan.ActionPlan`.
+
         Args:
             actions (list[tuple]): Danh sách các tuple đại diện cho các hành động.
                 Mỗi tuple có cấu trúc: 
@@ -81,15 +297,21 @@ class Node:
             *action_args, stop_on_failure = action if len(
                 action) > 2 and isinstance(action[-1], bool) else (*action, True)
 
-            if not self._execute_node(action_args[0], *action_args[1:]):
+            with TRACER.span('step', self.profile_name, action_args[0].__name__,
+                             ' '.join(map(str, action_args[1:3]))) as span:
+                success = self._execute_node(action_args[0], *action_args[1:])
+                span.outcome = 'ok' if success else 'fail'
+
+            if not success:
                 self.log(
-                    f'Lỗi {["skip "] if not stop_on_failure else ""}- {message_error}')
+                    f'Lỗi {["skip "] if not stop_on_failure else ""}- {message_error}',
+                    'ERROR' if stop_on_failure else 'WARNING')
                 if stop_on_failure:
                     return False
 
         return True
 
-    def log(self, message: str = 'message chưa có mô tả'):
+    def log(self, message: str = 'message chưa có mô tả', level: str = 'INFO'):
         '''
         Ghi và hiển thị thông báo nhật ký (log)
 
@@ -98,11 +320,12 @@ class Node:
 
         Args:
             message (str, option): Nội dung thông báo log. Mặc định là 'message chưa có mô tả'.
+            level (str, option): Mức log. Mặc định là 'INFO'.
 
         Mô tả:
             - Phương thức sử dụng tiện ích `Utility.logger` để ghi lại thông tin nhật ký kèm theo tên hồ sơ (`profile_name`) của phiên làm việc hiện tại.
         '''
-        Utility.logger(self.profile_name, message)
+        Utility.logger(self.profile_name, message, level)
 
     def stop(self, message: str = 'Dừng thực thi.'):
         '''
@@ -115,40 +338,226 @@ class Node:
             Phương thức này sẽ ghi lại thông điệp dừng thực thi qua log, sau đó quăng ra một lỗi `ValueError` với thông điệp tương ứng.
             Khi được gọi, phương thức sẽ ngừng các hành động tiếp theo trong chương trình.
         '''
-        self.log(message)
+        self.log(message, 'ERROR')
         raise ValueError(f'{message}')
 
-    def go_to(self, url: str, wait: int = None, timeout: int = None):
+    def set_resource_policy(self, policy: ResourcePolicy = None):
+        '''
+        Áp dụng chính sách chặn tài nguyên cho các request tiếp theo của trình duyệt (CDP `Network.setBlockedURLs`).
+
+        Args:
+            policy (ResourcePolicy, option): Chính sách cần áp dụng. None để bỏ chặn.
+        '''
+        if policy is self.resource_policy:
+            return
+        try:
+            self._driver.execute_cdp_cmd('Network.enable', {})
+            self._driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': policy.blocked_urls() if policy else []})
+            self.resource_policy = policy
+            self.log(f"Áp dụng chính sách tài nguyên: {policy.name if policy else 'không chặn'}")
+        except Exception as e:
+            self.log(f'Lỗi - Không áp dụng được chính sách tài nguyên: {e}', 'ERROR')
+
+    def _read_network_log(self) -> list[dict]:
+        '''
+        Đọc (và xả) performance log, giữ các sự kiện CDP Network.* vào `self._network_log`.
+        Quăng lỗi nếu trình duyệt không bật performance log.
+        '''
+        messages = [json.loads(entry['message'])['message'] for entry in self._driver.get_log('performance')]
+        messages = [message for message in messages if message.get('method', '').startswith('Network.')]
+        self._network_log.extend(messages)
+        return messages
+
+    def _record_transferred(self, url: str):
+        '''
+        Ghi số byte trang vừa tải và số request bị chặn vào `RESOURCE_STATS` để báo cáo byte tiết kiệm.
+
+        Mô tả:
+            - Có performance log: byte tải là tổng `encodedDataLength` của `Network.loadingFinished` (đo được cả tài nguyên
+              khác origin), request bị chặn là `Network.loadingFailed` có `blockedReason`.
+            - Không có: tổng `transferSize` của Performance API (bằng 0 với tài nguyên khác origin không có Timing-Allow-Origin).
+        '''
+        try:
+            self._read_network_log()
+        except Exception:
+            try:
+                transferred = self._driver.execute_script(Node._JS_TRANSFERRED_BYTES)
+            except Exception:
+                return
+            RESOURCE_STATS.record(url, int(transferred or 0), self.resource_policy)
+            return
+
+        types = {}
+        transferred = 0
+        blocked = {}
+        loaded = {}
+        for message in self._network_log:
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+            if message['method'] == 'Network.requestWillBeSent':
+                types[request_id] = params.get('type', 'Other')
+            elif message['method'] == 'Network.loadingFinished':
+                size = int(params.get('encodedDataLength', 0))
+                transferred += size
+                total = loaded.setdefault(types.get(request_id, 'Other'), [0, 0])
+                total[0] += 1
+                total[1] += size
+            elif message['method'] == 'Network.loadingFailed' and params.get('blockedReason'):
+                resource_type = params.get('type') or types.get(request_id, 'Other')
+                blocked[resource_type] = blocked.get(resource_type, 0) + 1
+        self._network_log = []
+        RESOURCE_STATS.record(url, transferred, self.resource_policy, blocked, loaded)
+
+    def _execute_async(self, timeout: float, script: str, *args):
+        '''
+        Chạy script bất đồng bộ với script timeout `timeout` giây, sau đó khôi phục script timeout cũ của driver.
+        '''
+        previous = self._driver.timeouts.script
+        self._driver.set_script_timeout(timeout)
+        try:
+            return self._driver.execute_async_script(script, *args)
+        finally:
+            self._driver.set_script_timeout(previous)
+
+    def _wait_new_document(self, timeout: float):
         '''
-        Điều hướng trình duyệt đến một URL cụ thể và chờ trang tải hoàn tất.
+        Chờ đến khi tài liệu cũ (có cờ `__nodeNavigating`) được thay bằng tài liệu mới.
+        '''
+        WebDriverWait(self._driver, timeout, poll_frequency=0.05,
+                      ignored_exceptions=[WebDriverException]).until(
+            lambda driver: driver.execute_script('return !window.__nodeNavigating')
+        )
+
+    def _wait_ready_state(self, target: str, timeout: float):
+        '''
+        Chờ sự kiện DOMContentLoaded ('interactive') hoặc load ('complete') bằng một lần gọi script.
+        '''
+        return self._execute_async(timeout, Node._JS_WAIT_READY, target)
+
+    def _wait_network_idle(self, timeout: float, idle_time: float = 0.5) -> bool:
+        '''
+        Chờ mạng rảnh: không có request nào đang chạy trong `idle_time` giây.
+
+        Mô tả:
+            - Dùng sự kiện CDP Network.* từ performance log nếu trình duyệt bật `goog:loggingPrefs`
+              (xem `BrowserManager.config_page_load`).
+            - Nếu không có performance log, chờ khoảng lặng của PerformanceObserver trong trang.
+        '''
+        try:
+            messages = self._read_network_log()
+        except Exception:
+            return self._execute_async(timeout, Node._JS_WAIT_QUIET, int(idle_time * 1000))
+
+        inflight = set()
+        last_activity = time.perf_counter()
+        deadline = last_activity + timeout
+        while True:
+            for message in messages:
+                request_id = message.get('params', {}).get('requestId')
+                if message['method'] == 'Network.requestWillBeSent':
+                    inflight.add(request_id)
+                    last_activity = time.perf_counter()
+                elif message['method'] in ('Network.loadingFinished', 'Network.loadingFailed'):
+                    inflight.discard(request_id)
+                    last_activity = time.perf_counter()
+
+            now = time.perf_counter()
+            if not inflight and now - last_activity >= idle_time:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(0.1)
+            messages = self._read_network_log()
+
+    def go_to(self, url: str, wait: int = None, timeout: int = None, ready: str = 'complete', locator: tuple = None):
+        '''
+        Điều hướng trình duyệt đến một URL cụ thể và chờ trang sẵn sàng.
 
         Args:
             url (str): URL đích cần điều hướng đến.
             wait (int, optional): Thời gian chờ trước khi điều hướng, mặc định là giá trị của `self.wait = 5`.
             timeout (int, optional): Thời gian chờ tải trang, mặc định là giá trị của `self.timeout`.
+            ready (str, optional): Tín hiệu coi là trang đã sẵn sàng. Mặc định 'complete'.
+                - 'complete': sự kiện load (document.readyState == 'complete').
+                - 'interactive': sự kiện DOMContentLoaded.
+                - 'element': phần tử `locator` xuất hiện (dùng `wait_for_any`).
+                - 'network_idle': DOMContentLoaded và mạng rảnh 0.5s.
+                - 'none': không chờ, chỉ đợi tài liệu mới được tạo.
+            locator (tuple, optional): (by, value) dùng với `ready='element'`.
 
         Returns:
             bool:
                 - `True`: nếu trang tải thành công.
                 - `False`: nếu có lỗi xảy ra trong quá trình tải trang.
+
+        Mô tả:
+            - Thời gian từ lúc điều hướng đến khi đạt tín hiệu `ready` được lưu ở `self.last_time_to_ready`.
+            - Chiến lược tải trang của trình duyệt ('normal'/'eager'/'none') cấu hình bằng `BrowserManager.config_page_load`.
         '''
         timeout = timeout if timeout else self.timeout
         wait = wait if wait else self.wait
-
-        Utility.wait_time(wait)
+        if ready not in Node.READY_SIGNALS:
+            raise ValueError(f'Tín hiệu ready không hợp lệ: {ready}')
+        if ready == 'element' and not locator:
+            raise ValueError("ready='element' cần `locator`")
+
+        start = time.perf_counter()
+        delay = 0.0
+        success = False
+        self.last_time_to_ready = None
+        if self.pacing == 'fixed':
+            delay += self._pace(wait)
         try:
-            # self._driver.get(url)
-            self._driver.execute_script(f"window.location.href = '{url}';")
-
-            WebDriverWait(self._driver, timeout).until(
-                lambda driver: driver.execute_script(
-                    "return document.readyState") == 'complete'
-            )
-            self.log(f'Trang {url} đã tải thành công.')
+            if Node.RESOURCE_POLICIES:
+                self.set_resource_policy(match_policy(Node.RESOURCE_POLICIES, url))
+
+            if ready == 'network_idle' or Node.RESOURCE_POLICIES:
+                try:
+                    self._driver.get_log('performance')  # Bỏ các sự kiện cũ trước khi điều hướng
+                except Exception:
+                    pass
+                self._network_log = []
+
+            # Chỉ đổi hash thì trình duyệt không tạo tài liệu mới
+            current = self._driver.current_url
+            same_document = '#' in url and current.split('#')[0] == url.split('#')[0]
+
+            navigate_start = time.perf_counter()
+            self._driver.execute_script(
+                'window.__nodeNavigating = true; window.location.href = arguments[0];', url)
+            if not same_document:
+                self._wait_new_document(timeout)
+
+            remaining = max(1, timeout - (time.perf_counter() - navigate_start))
+            if ready in ('complete', 'interactive'):
+                reached = self._wait_ready_state(ready, remaining)
+            elif ready == 'network_idle':
+                reached = self._wait_ready_state('interactive', remaining)
+                remaining = max(1, timeout - (time.perf_counter() - navigate_start))
+                reached = reached and self._wait_network_idle(remaining)
+            elif ready == 'element':
+                reached = self.wait_for_any([locator], remaining)[0] is not None
+            else:
+                reached = True
+
+            if not reached:
+                self.log(f'Lỗi - Trang "{url}" chưa đạt trạng thái {ready} sau {timeout}s', 'WARNING')
+                return False
+
+            self.last_time_to_ready = time.perf_counter() - navigate_start
+            if Node.RESOURCE_POLICIES or self.resource_policy:
+                self._record_transferred(url)
+            if self.pacing == 'ready':
+                delay += self._pace(wait)
+            self.log(f'Trang {url} đã tải thành công ({ready} sau {self.last_time_to_ready:.2f}s).')
+            success = True
             return True
 
         except Exception as e:
-            self.log(f'Lỗi - Khi tải trang "{url}": {e}')
+            self.log(f'Lỗi - Khi tải trang "{url}": {e}', 'ERROR')
+
+        finally:
+            self._record('go_to', url, delay, start, success)
 
         return False
 
@@ -164,8 +573,11 @@ class Node:
         '''
         wait = wait if wait else self.wait
 
-        Utility.wait_time(wait, True)
-        return self._driver.current_url
+        start = time.perf_counter()
+        delay = self._pace(wait, True)
+        url = self._driver.current_url
+        self._record('get_url', '', delay, start, True)
+        return url
 
     def find(self, by: By | str, value: str, wait: int = None, timeout: int = None):
         '''
@@ -184,22 +596,33 @@ class Node:
         '''
         timeout = timeout if timeout else self.timeout
         wait = wait if wait else self.wait
-        Utility.wait_time(wait)
+
+        start = time.perf_counter()
+        delay = 0.0
+        success = False
+        if self.pacing == 'fixed':
+            delay += self._pace(wait)
         try:
             element = WebDriverWait(self._driver, timeout).until(
                 EC.presence_of_element_located((by, value))
             )
+            if self.pacing == 'ready':
+                delay += self._pace(wait)
             self.log(f'Tìm thấy phần tử {by}={value}')
+            success = True
             return element
 
         except TimeoutException:
             self.log(
-                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s')
+                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s', 'WARNING')
         except StaleElementReferenceException:
             self.log(
-                f'Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM')
+                f'Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM', 'ERROR')
         except Exception as e:
-            self.log(f'Lỗi - không xác định khi tìm phần tử {by}={value} {e}')
+            self.log(f'Lỗi - không xác định khi tìm phần tử {by}={value} {e}', 'ERROR')
+
+        finally:
+            self._record('find', f'{by}={value}', delay, start, success)
 
         return None
 
@@ -228,43 +651,113 @@ class Node:
         timeout = timeout if timeout else self.timeout
         wait = wait if wait else self.wait
 
+        start = time.perf_counter()
+        delay = 0.0
+        success = False
         try:
             element = WebDriverWait(self._driver, timeout). until(
                 EC.element_to_be_clickable((by, value))
             )
-            Utility.wait_time(wait)
+            delay += self._pace(wait)
             element.click()
             self.log(f'Click phần tử {by}={value} thành công')
+            success = True
             return True
 
         except TimeoutException:
             self.log(
-                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s')
+                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s', 'WARNING')
         except StaleElementReferenceException:
             self.log(
-                f'Lỗi - Phần tử {by}={value} đã thay đổi hoặc không còn hợp lệ')
+                f'Lỗi - Phần tử {by}={value} đã thay đổi hoặc không còn hợp lệ', 'ERROR')
         except ElementClickInterceptedException:
             self.log(
-                f'Lỗi - Không thể nhấp vào phần tử phần tử {by}={value} vì bị che khuất hoặc ngăn chặn')
+                f'Lỗi - Không thể nhấp vào phần tử phần tử {by}={value} vì bị che khuất hoặc ngăn chặn', 'ERROR')
         except ElementNotInteractableException:
             self.log(
-                f'Lỗi - Phần tử {by}={value} không thể tương tác, có thể bị vô hiệu hóa hoặc ẩn')
+                f'Lỗi - Phần tử {by}={value} không thể tương tác, có thể bị vô hiệu hóa hoặc ẩn', 'ERROR')
         except Exception as e:
             # Thử phương pháp click khác khi bị lỗi từ Javascript
             if 'LavaMoat' in str(e):
                 element = WebDriverWait(self._driver, timeout).until(
                     EC.presence_of_element_located((by, value))
                 )
-                Utility.wait_time(wait)
+                delay += self._pace(wait)
                 element.click()
                 self.log(f'Click phần tử {by}={value} thành công (PT2)')
+                success = True
                 return True
             else:
-                self.log(f'Lỗi - Không xác định {by}={value} {e}')
+                self.log(f'Lỗi - Không xác định {by}={value} {e}', 'ERROR')
+
+        finally:
+            self._record('find_and_click', f'{by}={value}', delay, start, success)
 
         return False
 
-    def find_and_input(self, by: By | str, value: str, text: str, delay: float = 0.2, wait: int = None, timeout: int = None):
+    def _clear_input(self, element):
+        '''
+        Xóa giá trị của ô nhập qua setter gốc và phát sự kiện input/change để React cập nhật state.
+        '''
+        self._driver.execute_script(Node._JS_SET_VALUE, element, '')
+
+    def _type_text(self, element, text: str, delay: float, mode: str) -> float:
+        '''
+        Nhập văn bản vào phần tử theo chiến lược `mode`.
+
+        Args:
+            element (WebElement): Phần tử nhập liệu.
+            text (str): Văn bản cần nhập.
+            delay (float): Thời gian trễ giữa mỗi ký tự ('char') hoặc mỗi cụm ký tự ('typing').
+            mode (str): 'char' | 'bulk' | 'js' | 'typing'.
+
+        Returns:
+            float: Số giây đã ngủ có chủ đích trong lúc nhập.
+        '''
+        slept = 0.0
+        if mode == 'bulk':
+            element.send_keys(text)
+        elif mode == 'js':
+            self._driver.execute_script(Node._JS_SET_VALUE, element, text)
+        elif mode == 'typing':
+            i = 0
+            while i < len(text):
+                size = random.randint(2, 5)
+                begin = time.perf_counter()
+                Utility.wait_time(delay * size)
+                slept += time.perf_counter() - begin
+                element.send_keys(text[i:i + size])
+                i += size
+        else:
+            for char in text:
+                begin = time.perf_counter()
+                Utility.wait_time(delay)
+                slept += time.perf_counter() - begin
+                element.send_keys(char)
+        return slept
+
+    def _fill(self, element, text: str, delay: float, mode: str, verify: bool, retries: int = 2) -> tuple[bool, float]:
+        '''
+        Nhập văn bản rồi đọc lại giá trị để kiểm tra. Nếu không khớp thì xóa và nhập lại tối đa `retries` lần.
+
+        Returns:
+            tuple[bool, float]: (nhập đúng hay không, số giây đã ngủ có chủ đích)
+        '''
+        slept = 0.0
+        for attempt in range(retries + 1):
+            slept += self._type_text(element, text, delay, mode)
+            if not verify:
+                return True, slept
+
+            current = element.get_attribute('value')
+            if current == text:
+                return True, slept
+
+            self.log(f'Giá trị nhập không khớp (lần {attempt + 1}), xóa và nhập lại')
+            self._clear_input(element)
+        return False, slept
+
+    def find_and_input(self, by: By | str, value: str, text: str, delay: float = 0.2, wait: int = None, timeout: int = None, mode: str = None, verify: bool = True):
         '''
         Phương thức tìm và điền văn bản vào một phần tử trên trang web.
 
@@ -275,6 +768,12 @@ class Node:
             delay (float): Thời gian trễ giữa mỗi ký tự khi nhập văn bản. Mặc định là 0.2 giây.
             wait (int, option): Thời gian chờ trước khi thực hiện thao tác nhấp. Mặc định sử dụng giá trị `self.wait = 5`.
             timeout (int, option): Thời gian tối đa để chờ phần tử có thể nhấp được. Mặc định sử dụng giá trị `self.timeout`.
+            mode (str, option): Chiến lược nhập. Mặc định sử dụng giá trị `self.input_mode`.
+                - 'char': gửi từng ký tự một, trễ `delay` giữa mỗi ký tự (hành vi cũ).
+                - 'bulk': một lần `send_keys` cho cả chuỗi.
+                - 'js': gán value bằng JS và phát sự kiện input/change mà React cần.
+                - 'typing': gửi theo cụm 2-5 ký tự với thời gian trễ giống người gõ.
+            verify (bool, option): Đọc lại giá trị sau khi nhập, nếu sai thì xóa và nhập lại. Mặc định là True.
 
         Returns:
             bool: 
@@ -283,48 +782,59 @@ class Node:
 
         Mô tả:
             - Phương thức sẽ tìm phần tử theo phương thức `by` và `value`.
-            - Sau khi tìm thấy phần tử và đảm bảo phần tử có thể tương tác, phương thức sẽ thực hiện nhập văn bản `text` vào phần tử đó.
-            - Văn bản sẽ được nhập từng ký tự một, với thời gian trễ giữa mỗi ký tự được xác định bởi tham số `delay`.
+            - Sau khi tìm thấy phần tử và đảm bảo phần tử có thể tương tác, phương thức sẽ thực hiện nhập văn bản `text` vào phần tử đó theo `mode`.
+            - Nếu `verify`, giá trị của phần tử được đọc lại và nhập lại khi không khớp.
             - Nếu gặp lỗi, sẽ ghi lại thông báo lỗi cụ thể.
             - Nếu gặp lỗi liên quan đến Javascript (LavaMoat), phương thức sẽ thử lại bằng cách tìm phần tử theo cách khác.
         '''
         timeout = timeout if timeout else self.timeout
         wait = wait if wait else self.wait
+        mode = mode if mode else self.input_mode
 
+        start = time.perf_counter()
+        paced = 0.0
+        success = False
         try:
             element = WebDriverWait(self._driver, timeout).until(
                 EC.visibility_of_element_located((by, value))
             )
-            Utility.wait_time(wait)
-            for char in text:
-                Utility.wait_time(delay)
-                element.send_keys(char)
-            self.log(f'Nhập văn bản phần tử {by}={value} thành công')
-            return True
+            paced += self._pace(wait)
+            success, slept = self._fill(element, text, delay, mode, verify)
+            paced += slept
+            if success:
+                self.log(f'Nhập văn bản phần tử {by}={value} thành công')
+            else:
+                self.log(f'Lỗi - Giá trị phần tử {by}={value} không khớp sau khi nhập lại', 'ERROR')
+            return success
 
         except TimeoutException:
             self.log(
-                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s')
+                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s', 'WARNING')
         except StaleElementReferenceException:
             self.log(
-                f'Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM')
+                f'Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM', 'ERROR')
         except ElementNotVisibleException:
             self.log(
-                f'Lỗi - Phần tử {by}={value} có trong DOM nhưng không nhìn thấy. ví dụ display: none hoặc visibility: hidden')
+                f'Lỗi - Phần tử {by}={value} có trong DOM nhưng không nhìn thấy. ví dụ display: none hoặc visibility: hidden', 'ERROR')
         except Exception as e:
             # Thử phương pháp click khác khi bị lỗi từ Javascript
             if 'LavaMoat' in str(e):
                 element = WebDriverWait(self._driver, timeout).until(
                     EC.presence_of_element_located((by, value))
                 )
-                Utility.wait_time(wait)
-                for char in text:
-                    Utility.wait_time(delay)
-                    element.send_keys(char)
-                self.log(f'Nhập văn bản phần tử {by}={value} thành công (PT2)')
-                return True
+                paced += self._pace(wait)
+                success, slept = self._fill(element, text, delay, mode, verify)
+                paced += slept
+                if success:
+                    self.log(f'Nhập văn bản phần tử {by}={value} thành công (PT2)')
+                else:
+                    self.log(f'Lỗi - Giá trị phần tử {by}={value} không khớp sau khi nhập lại (PT2)', 'ERROR')
+                return success
             else:
-                self.log(f'Lỗi - không xác định {by}={value} {e}')
+                self.log(f'Lỗi - không xác định {by}={value} {e}', 'ERROR')
+
+        finally:
+            self._record('find_and_input', f'{by}={value}', paced, start, success)
 
         return False
 
@@ -351,31 +861,146 @@ class Node:
         timeout = timeout if timeout else self.timeout
         wait = wait if wait else self.wait
 
+        start = time.perf_counter()
+        delay = 0.0
+        success = False
         try:
             element = WebDriverWait(self._driver, timeout).until(
                 EC.presence_of_element_located((by, value))
             )
-            Utility.wait_time(wait)
+            delay += self._pace(wait)
             text = element.text.strip()
 
             if text:
                 self.log(f'Tìm thấy văn bản trong phần tử {by}={value}')
+                success = True
                 return text
             else:
-                self.log(f'Lỗi - Phần tử {by}={value} không chứa văn bản')
+                self.log(f'Lỗi - Phần tử {by}={value} không chứa văn bản', 'ERROR')
 
         except TimeoutException:
-            print(
-                f'[{self.profile_name}][get_text]: Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s')
+            self.log(
+                f'Lỗi - Không tìm thấy phần tử {by}={value} trong {timeout}s', 'WARNING')
         except StaleElementReferenceException:
-            print(
-                f'[{self.profile_name}][get_text]: Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM')
+            self.log(
+                f'Lỗi - Phần tử {by}={value} đã bị thay đổi hoặc bị loại bỏ khỏi DOM', 'ERROR')
         except Exception as e:
             self.log(
-                f'Lỗi - Không xác định khi tìm văn bản trong phần tử {by}={value}')
+                f'Lỗi - Không xác định khi tìm văn bản trong phần tử {by}={value}', 'ERROR')
+
+        finally:
+            self._record('get_text', f'{by}={value}', delay, start, success)
 
         return None
 
+    def _to_js_locator(self, by: By | str, value: str) -> list:
+        '''
+        Chuyển locator của Selenium sang dạng ['css'|'xpath', selector] để tìm bằng JS.
+        '''
+        if by == By.XPATH:
+            return ['xpath', value]
+        if by in (By.CSS_SELECTOR, By.TAG_NAME):
+            return ['css', value]
+        if by == By.ID:
+            return ['css', f'[id="{value}"]']
+        if by == By.NAME:
+            return ['css', f'[name="{value}"]']
+        if by == By.CLASS_NAME:
+            return ['css', f'.{value}']
+        if by == By.LINK_TEXT:
+            return ['xpath', f'//a[normalize-space()="{value}"]']
+        raise ValueError(f'Kiểu định vị {by} không hỗ trợ trong wait_for_any')
+
+    def _poll_for_any(self, candidates: list[tuple], timeout: int, visible: bool):
+        '''
+        Phương án dự phòng của `wait_for_any` khi không chạy được script: thăm dò lần lượt các locator.
+        '''
+        def match(driver):
+            for index, (by, value) in enumerate(candidates):
+                for element in driver.find_elements(by, value):
+                    if not visible or element.is_displayed():
+                        return index, element
+            return False
+
+        try:
+            return WebDriverWait(self._driver, timeout, poll_frequency=0.2).until(match)
+        except TimeoutException:
+            return None, None
+
+    def wait_for_any(self, candidates: list[tuple], timeout: int = None, visible: bool = True) -> tuple:
+        '''
+        Chờ cho đến khi một trong nhiều locator xuất hiện, chỉ với một lần gọi script (MutationObserver).
+
+        Args:
+            candidates (list[tuple]): Danh sách (by, value), ví dụ [(By.XPATH, '//button[text()="Reload"]'), (By.CSS_SELECTOR, 'input')].
+            timeout (int, option): Thời gian chờ tối đa (giây). Mặc định sử dụng giá trị `self.timeout`.
+            visible (bool, option): Chỉ tính phần tử đang hiển thị. Mặc định là True.
+
+        Returns:
+            tuple: (index, WebElement) của locator đầu tiên khớp theo thứ tự trong `candidates`.
+                   (None, None) nếu hết thời gian chờ.
+
+        Mô tả:
+            - Không có thời gian chờ trước hành động: trả về ngay khi DOM có phần tử khớp.
+            - Nếu script bị chặn (ví dụ LavaMoat), phương thức chuyển sang thăm dò bằng `find_elements`.
+        '''
+        timeout = timeout if timeout else self.timeout
+        locators = ' | '.join(f'{by}={value}' for by, value in candidates)
+
+        start = time.perf_counter()
+        index, element = None, None
+        try:
+            js_candidates = [self._to_js_locator(by, value) for by, value in candidates]
+            index, element = self._execute_async(
+                timeout + 5, Node._JS_WAIT_FOR_ANY, js_candidates, int(timeout * 1000), visible)
+            if index < 0:
+                index, element = None, None
+        except Exception as e:
+            self.log(f'Không chạy được script chờ, chuyển sang thăm dò: {e}')
+            index, element = self._poll_for_any(candidates, timeout, visible)
+
+        self._record('wait_for_any', locators, 0.0, start, index is not None)
+        if index is None:
+            self.log(f'Lỗi - Không có phần tử nào trong [{locators}] xuất hiện sau {timeout}s', 'WARNING')
+        else:
+            by, value = candidates[index]
+            self.log(f'Phần tử {by}={value} xuất hiện trước')
+        return index, element
+
+    def locate(self, name: str, timeout: int = None) -> tuple:
+        '''
+        Tìm locator đang khớp của một phần tử logic trong `self.selectors` (SelectorRegistry).
+
+        Args:
+            name (str): Tên phần tử đã đăng ký trong registry.
+            timeout (int, option): Thời gian chờ tối đa. Mặc định sử dụng giá trị `self.timeout`.
+
+        Returns:
+            tuple: (by, value) của locator khớp, hoặc (None, None) nếu không có locator nào khớp.
+
+        Mô tả:
+            - Các locator được chờ đồng thời bằng `wait_for_any` theo thứ hạng hiện tại, nên selector hỏng
+              không tốn thêm timeout khi có selector dự phòng khớp.
+            - Locator khớp được ghi nhận hit kèm độ trễ, các locator xếp trên nó (không khớp) bị ghi nhận miss.
+        '''
+        if self.selectors is None:
+            raise ValueError('Node chưa được gán SelectorRegistry')
+
+        candidates = self.selectors.ranked(name)
+        start = time.perf_counter()
+        index, _ = self.wait_for_any(candidates, timeout)
+        latency = time.perf_counter() - start
+
+        missed = candidates if index is None else candidates[:index]
+        for by, value in missed:
+            self.selectors.record(name, by, value, False)
+        if index is None:
+            return None, None
+
+        by, value = candidates[index]
+        self.selectors.record(name, by, value, True, latency)
+        return by, value
+
     def check_window_handles(self):
         Utility.wait_time(5, True)
         original_handle = self._driver.current_window_handle
@@ -391,23 +1016,61 @@ class Node:
 
 
 class BrowserManager:
+    # Kích thước viewport phổ biến cho chế độ fleet
+    VIEWPORTS = [(1366, 768), (1440, 900), (1536, 864), (1920, 1080)]
+
     def __init__(self, HandlerClass=None) -> None:
         self.HandlerClass = HandlerClass
 
         self.user_data_dir = Path(__file__).parent/'user_data'
         self.data_tele = self._get_telegram_credentials()
         self.matrix = [[None]]
+        self._slots = threading.Condition()  # Bảo vệ self.matrix và báo khi có ô trống
         self.extensions = []
+        self.unpacked_extensions = []
+        self.extension_cache = ExtensionCache()
+        self.page_load_strategy = 'normal'
+        self.network_events = False
+        self.uploader = None
+        self.uploader_options = {}
+        # Hàm (profile_name, png_bytes, message) nhận ảnh lỗi thay cho Telegram/snapshot, ví dụ worker của distributed.py
+        self.evidence_sink = None
+        self.driver_pool = None
+        self._uploader_lock = threading.Lock()
+
+        # Khởi động sẵn trình duyệt cho profile đang chờ ô trống (config_prewarm)
+        self.prewarm_ahead = 0
+        self.prewarm_url = None
+        self.prewarm_min_free_mb = 1024
+        self._prewarmed = {}
+
+        # Bảo trì user-data-dir trước khi mở trình duyệt (config_maintenance)
+        self.maintenance = None
+
+        # None: chạy trên màn hình thật; 'headless' | 'xvfb': chế độ fleet, không xếp cửa sổ
+        self.fleet_mode = None
+        self.viewport = None
+        self._display = None
+
+        self.screen_width, self.screen_height, self.screen_x, self.screen_y = self._detect_screen()
+
+    def _detect_screen(self) -> tuple:
+        '''
+        Lấy kích thước màn hình để xếp cửa sổ: ưu tiên màn hình phụ, nếu chỉ có một màn hình thì dùng màn hình chính.
+        Trên máy không có màn hình (hoặc thiếu `screeninfo`) trả về 1920x1080.
+        '''
+        try:
+            from screeninfo import get_monitors
+            monitors = get_monitors()
+        except Exception:
+            monitors = []
 
-        monitors = get_monitors()
-        # print(monitors)
-        select_monitor = monitors[1]
-        self.screen_width = select_monitor.width
-        self.screen_height = select_monitor.height
-        self.screen_x = select_monitor.x
-        self.screen_y = select_monitor.y
+        if not monitors:
+            return 1920, 1080, 0, 0
+        select_monitor = monitors[1] if len(monitors) > 1 else monitors[0]
+        return select_monitor.width, select_monitor.height, select_monitor.x, select_monitor.y
 
-    def _log(self, profile_name: str = 'SYS', message: str = 'message chưa có mô tả'):
+    def _log(self, profile_name: str = 'SYS', message: str = 'message chưa có mô tả', level: str = 'INFO'):
         '''
         Ghi và hiển thị thông báo nhật ký (log)
 
@@ -417,13 +1080,14 @@ class BrowserManager:
         Args:
             profile_name (str): tên hồ sơ hiện tại
             message (str, option): Nội dung thông báo log. Mặc định là 'message chưa có mô tả'.
+            level (str, option): Mức log. Mặc định là 'INFO'.
 
         Mô tả:
             - Phương thức sử dụng tiện ích `Utility.logger` để ghi lại thông tin nhật ký kèm theo tên hồ sơ (`profile_name`) của phiên làm việc hiện tại.
         '''
-        Utility.logger(profile_name, message)
+        Utility.logger(profile_name, message, level)
 
-    def _save_screenshot(self, driver, profile_name):
+    def _save_screenshot(self, driver, profile_name, png: bytes = None):
         snapshot_dir = Path(__file__).parent / 'snapshot'
 
         if not snapshot_dir.exists():
@@ -434,36 +1098,52 @@ class BrowserManager:
 
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         screenshot_path = snapshot_dir/f'{profile_name}_{timestamp}.png'
-        driver.save_screenshot(str(screenshot_path))
+        if png is not None:
+            screenshot_path.write_bytes(png)
+        else:
+            driver.save_screenshot(str(screenshot_path))
 
-    def _send_screenshot_to_telegram(self, driver: webdriver.Chrome, profile_name: str, message: str):
-        chat_id, telegram_token = self.data_tele
-        # Tạo URL gửi ảnh qua Telegram
-        url = f"https://api.telegram.org/bot{telegram_token}/sendPhoto"
+    def _get_uploader(self) -> EvidenceUploader:
+        '''
+        Khởi tạo (một lần) bộ gửi ảnh lỗi chạy nền, dùng chung cho mọi profile.
+        '''
+        with self._uploader_lock:
+            if self.uploader is None:
+                chat_id, telegram_token = self.data_tele
+                self.uploader = EvidenceUploader(
+                    chat_id, telegram_token,
+                    save_local=lambda profile_name, png: self._save_screenshot(None, profile_name, png),
+                    **self.uploader_options)
+                # Gửi nốt ảnh còn trong hàng đợi trước khi thoát chương trình
+                atexit.register(self.uploader.join)
+            return self.uploader
 
-        # Chụp ảnh màn hình và lưu vào bộ nhớ
+    def _send_screenshot_to_telegram(self, driver: webdriver.Chrome, profile_name: str, message: str):
+        '''
+        Chụp ảnh màn hình và đưa vào hàng đợi gửi Telegram chạy nền. Trình duyệt có thể đóng ngay sau khi hàm trả về.
+        Nếu hàng đợi đầy, ảnh được lưu vào thư mục snapshot.
+        '''
         screenshot_png = driver.get_screenshot_as_png()
-        screenshot_buffer = BytesIO(screenshot_png)
-        screenshot_buffer.seek(0)  # Đặt con trỏ về đầu tệp
-
-        # Gửi ảnh lên Telegram
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H:%M:%S')
-        files = {'photo': ('screenshot.png', screenshot_buffer, 'image/png')}
-        data = {'chat_id': chat_id,
-                'caption': f'[{timestamp}][{profile_name}] - {message}'}
-        response = requests.post(url, files=files, data=data)
-
-        # Kiểm tra kết quả
-        if response.status_code == 200:
-            self._log(profile_name, f'Hình ảnh lỗi được gửi đến bot tele')
-        else:
-            self._log(
-                profile_name,
-                f'Không thể gửi "Hình ảnh lỗi" lên Telegram. Mã lỗi: {response.status_code}. Lưu về local'
-            )
-            self._save_screenshot(driver, profile_name)
-        # Đóng buffer sau khi sử dụng
-        screenshot_buffer.close()
+        if not self._get_uploader().submit(screenshot_png, profile_name, str(message)):
+            self._log(profile_name, 'Hàng đợi gửi ảnh lỗi đã đầy. Lưu về local', 'WARNING')
+            self._save_screenshot(driver, profile_name, screenshot_png)
+
+    def config_evidence(self, max_queue: int = 20, workers: int = 2, max_width: int = None, jpeg_quality: int = None):
+        '''
+        Cấu hình bộ gửi ảnh lỗi lên Telegram (phải gọi trước khi chạy).
+
+        Args:
+            max_queue (int): Số ảnh tối đa chờ gửi; khi đầy ảnh được lưu vào thư mục snapshot.
+            workers (int): Số luồng gửi song song.
+            max_width (int, option): Thu nhỏ ảnh về chiều rộng này (cần Pillow).
+            jpeg_quality (int, option): Nén lại thành JPEG với chất lượng này (cần Pillow).
+        '''
+        self.uploader_options = {
+            'max_queue': max_queue,
+            'workers': workers,
+            'max_width': max_width,
+            'jpeg_quality': jpeg_quality,
+        }
 
     def _get_telegram_credentials(self):
         """
@@ -496,7 +1176,7 @@ class BrowserManager:
                         message=f'Nội dung tệp {config_path} không hợp lệ. Định dạng phải là "chat_id|telegram_token".')
                     return None
             except Exception as e:
-                Utility.logger(message=f'Lỗi khi đọc tệp {config_path}: {e}')
+                Utility.logger(message=f'Lỗi khi đọc tệp {config_path}: {e}', level='ERROR')
                 return None
         else:
             Utility.logger(
@@ -530,6 +1210,11 @@ class BrowserManager:
         # Tạo ma trận với số hàng và cột đã xác định
         self.matrix = [[None for _ in range(cols)] for _ in range(rows)]
 
+        # Khóa các ô dư (ví dụ 3 luồng trên ma trận 2x2) để số ô trống luôn bằng số luồng
+        slots = min(number_profiles, max_concurrent_profiles)
+        for index in range(slots, rows * cols):
+            self.matrix[index // cols][index % cols] = _BLOCKED
+
     def _arrange_window(self, driver, row, col):
         cols = len(self.matrix[0])
         y = row * self.screen_height
@@ -544,23 +1229,37 @@ class BrowserManager:
         """
         Gán profile vào một ô trống và trả về tọa độ (x, y).
         """
-        for row in range(len(self.matrix)):
-            for col in range(len(self.matrix[0])):
-                if self.matrix[row][col] is None:
-                    self.matrix[row][col] = profile_name
+        with self._slots:
+            for row in range(len(self.matrix)):
+                for col in range(len(self.matrix[0])):
+                    if self.matrix[row][col] is None:
+                        self.matrix[row][col] = profile_name
+                        return row, col
+            return None, None
+
+    def _acquire_position(self, profile_name: int):
+        """
+        Chờ (không thăm dò) đến khi có ô trống rồi gán profile vào ô đó.
+        """
+        with self._slots:
+            while True:
+                row, col = self._get_position(profile_name)
+                if row is not None:
                     return row, col
-        return None, None
+                self._slots.wait()
 
     def _release_position(self, profile_name: int, row, col):
         """
-        Giải phóng ô khi profile kết thúc.
+        Giải phóng ô khi profile kết thúc và báo cho bộ lập lịch.
         """
-        for row in range(len(self.matrix)):
-            for col in range(len(self.matrix[0])):
-                if self.matrix[row][col] == profile_name:
-                    self.matrix[row][col] = None
-                    return True
-        return False
+        with self._slots:
+            for row in range(len(self.matrix)):
+                for col in range(len(self.matrix[0])):
+                    if self.matrix[row][col] == profile_name:
+                        self.matrix[row][col] = None
+                        self._slots.notify_all()
+                        return True
+            return False
 
     def _browser(self, profile_name: str) -> webdriver.Chrome:
         '''
@@ -575,7 +1274,7 @@ class BrowserManager:
         Mô tả:
             - Dựa trên thông tin hồ sơ (`profile_data`), hàm sẽ thiết lập và khởi tạo trình duyệt Chrome với các tùy chọn cấu hình sau:
                 - Chạy browser với dữ liệu người dùng (`--user-data-dir`).
-                - Tùy chọn tỉ lệ hiển thị trình duyệt (`--force-device-scale-factor`)
+                - Tùy chọn tỉ lệ hiển thị trình duyệt (`--force-device-scale-factor`), hoặc viewport cố định khi bật chế độ fleet (`config_fleet`).
                 - Tắt các thông báo tự động và hạn chế các tính năng tự động hóa của trình duyệt.
                 - Vô hiệu hóa dịch tự động của Chrome.
                 - Vô hiệu hóa tính năng lưu mật khẩu (chỉ áp dụng khi sử dụng hồ sơ mặc định).
@@ -584,6 +1283,9 @@ class BrowserManager:
         rows = len(self.matrix)
         scale = 1 if (rows == 1) else 0.5
 
+        if self.maintenance is not None:
+            self._maintain(profile_name)
+
         self._log(profile_name, 'Đang mở')
 
         chrome_options = ChromeOptions()
@@ -594,7 +1296,13 @@ class BrowserManager:
         chrome_options.add_argument('--disable-blink-features=AutomationControlled') # để có thể đăng nhập google
         chrome_options.add_argument("--log-level=3")
         chrome_options.add_argument("--silent")
-        chrome_options.add_argument(f"--force-device-scale-factor={scale}")
+        if self.fleet_mode:
+            width, height = self._get_viewport(profile_name)
+            chrome_options.add_argument(f'--window-size={width},{height}')
+            if self.fleet_mode == 'headless':
+                chrome_options.add_argument('--headless=new')
+        else:
+            chrome_options.add_argument(f"--force-device-scale-factor={scale}")
         chrome_options.add_argument(
             "--disable-features=Translate")  # Vô hiệu hóa translate
         # Tắt dòng thông báo auto
@@ -607,39 +1315,370 @@ class BrowserManager:
             "credentials_enable_service": False
         })  # chỉ dùng được khi dùng profile default (tắt --profile-directory={profile_name})
 
-        # add extensions
+        chrome_options.page_load_strategy = self.page_load_strategy
+        if self.network_events or Node.RESOURCE_POLICIES:
+            # Sự kiện CDP Network.* cho Node.go_to(ready='network_idle') và thống kê request bị chặn
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        # add extensions: bản giải nén trong cache nạp bằng --load-extension, CRX không giải nén được thì nhúng như cũ
+        if self.unpacked_extensions:
+            chrome_options.add_argument(
+                f"--load-extension={','.join(str(ext) for ext in self.unpacked_extensions)}")
         for ext in self.extensions:
             chrome_options.add_extension(ext)
 
-        service = Service(log_path='NUL')
-
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+        with TRACER.span('launch', profile_name, 'browser'):
+            if self.driver_pool:
+                driver = self.driver_pool.new_driver(chrome_options, profile_name)
+            else:
+                service = Service(log_output=subprocess.DEVNULL)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
 
         return driver
 
-    def config_extension(self, *args: str):
+    def config_extension(self, *args: str, expected_ids: dict = None, unpack: bool = True):
         '''
         Cấu hình trình duyệt với các tiện ích mở rộng (extensions).
 
         Args:
             *args (str): Danh sách tên tệp các tiện ích mở rộng (ví dụ: 'ext1.crx', 'ext2.crx').
+            expected_ids (dict, option): {tên_tệp: id_extension} để kiểm tra ID sau khi giải nén.
+            unpack (bool, option): Giải nén CRX một lần vào `extensions/.cache` và nạp bằng `--load-extension`. Mặc định là True.
 
         Mô tả:
             - Phương thức sẽ kiểm tra sự tồn tại của từng tệp tiện ích mở rộng được cung cấp trong tham số `args`.
             - Đường dẫn của các tiện ích mở rộng sẽ được xác định dựa trên thư mục `extensions` nằm cùng cấp với tệp hiện tại (`__file__`).
             - Nếu bất kỳ tệp tiện ích mở rộng nào không tồn tại, phương thức sẽ thông báo lỗi và dừng chương trình.
-            - Nếu tất cả các tệp tồn tại, chúng sẽ được thêm vào danh sách `self.extensions` để sử dụng trước khi khởi chạy trình duyệt.
+            - Nếu `unpack`, tệp CRX được giải nén (theo hash nội dung, tự làm mới khi CRX thay đổi) và thêm vào `self.unpacked_extensions`.
+            - Nếu ID extension không khớp `expected_ids`, phương thức sẽ thông báo lỗi và dừng chương trình.
+            - Tệp không giải nén được (hoặc `unpack=False`) được thêm vào danh sách `self.extensions` để nhúng khi khởi chạy trình duyệt.
 
         Ví dụ:
             config_extension('ext1.crx', 'ext2.crx')
+            config_extension('HaHa-Wallet-Chrome-Web-Store.crx', expected_ids={'HaHa-Wallet-Chrome-Web-Store.crx': 'andhndehpcjpmneneealacgnmealilal'})
         '''
+        expected_ids = expected_ids or {}
         for arg in args:
             ext = Path(__file__).parent/'extensions'/f'{arg}'
             if not ext.exists():
-                self._log(f'Lỗi: {ext} không tồn tại. Dừng chương trình')
+                self._log(message=f'Lỗi: {ext} không tồn tại. Dừng chương trình', level='ERROR')
                 exit()
-            self.extensions.append(ext)
-            
+
+            if not unpack:
+                self.extensions.append(ext)
+                continue
+
+            try:
+                unpacked_dir, extension_id = self.extension_cache.unpack(ext, expected_ids.get(arg))
+                self.unpacked_extensions.append(unpacked_dir)
+            except ValueError as e:
+                if arg in expected_ids:
+                    self._log(message=f'Lỗi: {e}. Dừng chương trình', level='ERROR')
+                    exit()
+                self._log(message=f'Không giải nén được {arg} ({e}). Nhúng CRX khi khởi chạy')
+                self.extensions.append(ext)
+
+    def config_pacing(self, mode: str = 'fixed', jitter: float = 1.5, jitter_budget: float = None):
+        '''
+        Cấu hình chế độ pacing cho các Node trong lần chạy này.
+
+        Args:
+            mode (str): 'fixed' - ngủ `Node.wait` giây trước mỗi hành động (mặc định, hành vi cũ).
+                        'ready' - hành động ngay khi phần tử sẵn sàng, kèm jitter ngẫu nhiên nhỏ.
+            jitter (float): Jitter tối đa (giây) sau mỗi hành động ở chế độ 'ready'.
+            jitter_budget (float, option): Tổng số giây jitter tối đa cho mỗi profile. None là không giới hạn.
+
+        Ví dụ:
+            config_pacing('ready', jitter=1, jitter_budget=15)
+        '''
+        Node.set_pacing(mode, jitter, jitter_budget)
+
+    def config_resource_policy(self, policy: ResourcePolicy, sites: list[str] = None):
+        '''
+        Cấu hình chính sách chặn tài nguyên theo trang. `Node.go_to` tự áp dụng chính sách khớp với host của URL.
+
+        Args:
+            policy (ResourcePolicy): Chính sách, ví dụ `resource_policy.HEAVY_ASSETS`.
+            sites (list[str], option): Mẫu host áp dụng (wildcard `*`), ví dụ ['cloud.google.com']. None là mọi trang.
+
+        Ví dụ:
+            config_resource_policy(HEAVY_ASSETS, ['cloud.google.com'])
+        '''
+        for site in sites or ['*']:
+            Node.RESOURCE_POLICIES[site] = policy
+
+    def _log_resource_report(self):
+        for host, item in RESOURCE_STATS.report().items():
+            saved = 'chưa có số liệu so sánh' if item['saved'] is None else f"~{item['saved'] / 1024:.0f} KB"
+            self._log(message=f"{host} [{item['policy'] or 'không chặn'}]: {item['pages']} trang, "
+                              f"tải {item['transferred'] / 1024:.0f} KB, chặn {item['blocked']} request, tiết kiệm {saved}")
+
+    def config_driver_pool(self, size: int = 2, max_sessions: int = 50, log_dir: str | Path = None):
+        '''
+        Dùng chung một pool chromedriver chạy lâu dài thay vì khởi chạy một chromedriver cho mỗi profile.
+
+        Args:
+            size (int): Số chromedriver tối đa chạy cùng lúc.
+            max_sessions (int): Thay chromedriver mới sau số phiên này.
+            log_dir (str | Path, option): Thư mục ghi log chromedriver, đường dẫn tương đối tính từ thư mục chứa tệp mã nguồn. None là bỏ log.
+
+        Ghi chú:
+            - Thời gian khởi chạy chromedriver (span 'driver_spawn') và tạo phiên (span 'session') được tách riêng khi bật tracing.
+        '''
+        if log_dir and not Path(log_dir).is_absolute():
+            log_dir = Path(__file__).parent / log_dir
+        self.driver_pool = DriverPool(size, max_sessions, log_dir)
+
+    def config_maintenance(self, max_mb: float = None, prune_cache: bool = False):
+        '''
+        Bảo trì user-data-dir của profile ngay trước khi mở trình duyệt: xóa khóa `SingletonLock` cũ
+        do lần chạy bị tắt đột ngột để lại và giữ dung lượng profile trong giới hạn.
+
+        Args:
+            max_mb (float, option): Giới hạn dung lượng mỗi profile (MB). Vượt giới hạn thì dọn cache và lịch sử.
+            prune_cache (bool): Luôn dọn cache trước mỗi lần mở (chậm lần tải trang đầu). Mặc định chỉ dọn khi vượt `max_mb`.
+
+        Ghi chú:
+            - Dọn toàn bộ thư mục `user_data` ngoài lần chạy: `python profile_maintenance.py --max-mb 500`.
+        '''
+        self.maintenance = {'max_mb': max_mb, 'prune_cache': prune_cache}
+
+    def _maintain(self, profile_name: str):
+        profile_dir = self.user_data_dir / profile_name
+        if not profile_dir.is_dir():
+            return
+        try:
+            result = maintain_profile(profile_dir, **self.maintenance)
+        except Exception as e:
+            self._log(profile_name, f'Lỗi khi bảo trì {profile_dir}: {e}', 'WARNING')
+            return
+        if result['locks_cleared']:
+            self._log(profile_name, 'Đã xóa khóa SingletonLock cũ')
+        if result['reclaimed']:
+            self._log(profile_name, f"Giải phóng {result['reclaimed'] / 1048576:.1f} MB cache")
+        if result['over_budget']:
+            self._log(profile_name, f"Profile {result['after'] / 1048576:.0f} MB vẫn vượt giới hạn {self.maintenance['max_mb']} MB", 'WARNING')
+
+    def config_prewarm(self, ahead: int = 1, url: str = None, min_free_mb: int = 1024):
+        '''
+        Khởi động sẵn trình duyệt của các profile đang chờ trong `run_multi` khi mọi ô đều bận,
+        để profile kế tiếp bắt đầu chạy ngay khi có ô trống thay vì mới bắt đầu mở Chrome.
+
+        Args:
+            ahead (int): Số profile tối đa được khởi động sẵn cùng lúc. 0 là tắt.
+            url (str, option): Trang mở sẵn sau khi khởi động, ví dụ `chrome-extension://<id>/home.html`.
+            min_free_mb (int): Chỉ khởi động sẵn khi bộ nhớ còn trống trên máy lớn hơn mức này (MB).
+
+        Ghi chú:
+            - Trình duyệt khởi động sẵn vẫn tuân theo `delay_between_profiles`.
+            - Không đọc được bộ nhớ còn trống (không có `psutil` và /proc/meminfo) thì chỉ giới hạn theo `ahead`.
+
+        Ví dụ:
+            config_prewarm(1, url=f'chrome-extension://{HaHaWallet.EXTENSION_ID}/home.html', min_free_mb=2048)
+        '''
+        self.prewarm_ahead = ahead
+        self.prewarm_url = url
+        self.prewarm_min_free_mb = min_free_mb
+
+    def _has_free_slot(self) -> bool:
+        with self._slots:
+            return any(cell is None for row in self.matrix for cell in row)
+
+    def _prewarm(self, queued: list[dict], wait_stagger) -> None:
+        '''
+        Khởi động sẵn trình duyệt cho các profile trong `queued` khi chưa có ô trống và bộ nhớ còn đủ.
+        Dừng ngay khi có ô trống: profile kế tiếp sẽ được mở theo cách thông thường.
+        '''
+        for profile in queued:
+            profile_name = profile['profile']
+            if profile_name in self._prewarmed:
+                continue
+            if self._has_free_slot() or len(self._prewarmed) >= self.prewarm_ahead:
+                return
+
+            available = _available_memory_mb()
+            if available is not None and available < self.prewarm_min_free_mb:
+                self._log(profile_name, f'Bỏ qua khởi động sẵn: còn {available:.0f} MB < {self.prewarm_min_free_mb} MB', 'DEBUG')
+                return
+
+            wait_stagger()
+            try:
+                with TRACER.span('launch', profile_name, 'prewarm'):
+                    driver = self._browser(profile_name)
+                    if self.prewarm_url:
+                        driver.get(self.prewarm_url)
+            except Exception as e:
+                self._log(profile_name, f'Khởi động sẵn thất bại, sẽ mở khi có ô trống: {e}', 'WARNING')
+                return
+            self._prewarmed[profile_name] = driver
+            self._log(profile_name, 'Đã khởi động sẵn, chờ ô trống')
+
+    def _close_prewarmed(self):
+        for profile_name, driver in list(self._prewarmed.items()):
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            self._prewarmed.pop(profile_name, None)
+
+    def config_fleet(self, mode: str = 'headless', viewport: tuple | list = None):
+        '''
+        Bật chế độ fleet cho máy chủ không có màn hình: không xếp cửa sổ, không dùng `--force-device-scale-factor`,
+        mỗi profile dùng một viewport cố định.
+
+        Args:
+            mode (str): 'headless' - Chrome new-headless (`--headless=new`, vẫn hỗ trợ extension).
+                        'xvfb' - chạy Chrome bình thường trên màn hình ảo Xvfb (cần cài `Xvfb`).
+            viewport (tuple | list, option): (width, height) dùng cho mọi profile, hoặc danh sách các (width, height)
+                để mỗi profile cố định chọn một kích thước theo tên. Mặc định là `BrowserManager.VIEWPORTS`.
+
+        Ví dụ:
+            config_fleet('headless')
+            config_fleet('xvfb', viewport=(1366, 768))
+        '''
+        if mode not in ('headless', 'xvfb'):
+            raise ValueError(f'Chế độ fleet không hợp lệ: {mode}')
+        self.fleet_mode = mode
+        self.viewport = viewport or self.VIEWPORTS
+        if mode == 'xvfb':
+            self._start_virtual_display()
+
+    def _start_virtual_display(self):
+        '''
+        Khởi chạy Xvfb trên một display trống và đặt biến môi trường DISPLAY cho chromedriver/Chrome.
+        '''
+        if self._display is not None:
+            return
+        if not shutil.which('Xvfb'):
+            self._log(message='Lỗi: không tìm thấy Xvfb. Cài Xvfb hoặc dùng config_fleet("headless")', level='ERROR')
+            exit()
+
+        number = 99
+        while Path(f'/tmp/.X{number}-lock').exists():
+            number += 1
+        width = max(w for w, _ in self._viewports())
+        height = max(h for _, h in self._viewports())
+        self._display = subprocess.Popen(
+            ['Xvfb', f':{number}', '-screen', '0', f'{width}x{height}x24', '-nolisten', 'tcp'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        os.environ['DISPLAY'] = f':{number}'
+        atexit.register(self._display.terminate)
+        self._log(message=f'Đã mở màn hình ảo Xvfb :{number}')
+
+    def _viewports(self) -> list[tuple]:
+        if isinstance(self.viewport[0], int):
+            return [tuple(self.viewport)]
+        return [tuple(size) for size in self.viewport]
+
+    def _get_viewport(self, profile_name: str) -> tuple:
+        '''
+        Viewport cố định của profile: cùng tên profile luôn nhận cùng kích thước giữa các lần chạy.
+        '''
+        viewports = self._viewports()
+        return viewports[zlib.crc32(profile_name.encode()) % len(viewports)]
+
+    def config_page_load(self, strategy: str = 'normal', network_events: bool = False):
+        '''
+        Cấu hình chiến lược tải trang của trình duyệt.
+
+        Args:
+            strategy (str): 'normal' (chờ load), 'eager' (chờ DOMContentLoaded) hoặc 'none' (không chờ) - áp dụng cho `driver.get`.
+            network_events (bool): Bật performance log để `Node.go_to(ready='network_idle')` dùng sự kiện CDP Network.*.
+        '''
+        if strategy not in ('normal', 'eager', 'none'):
+            raise ValueError(f'Chiến lược tải trang không hợp lệ: {strategy}')
+        self.page_load_strategy = strategy
+        self.network_events = network_events
+
+    def config_logging(self, level: str = 'INFO', log_dir: str | Path = None):
+        '''
+        Cấu hình log: mức log tối thiểu và thư mục ghi tệp log.
+
+        Args:
+            level (str): 'DEBUG' | 'INFO' | 'WARNING' | 'ERROR'.
+            log_dir (str | Path, option): Thư mục ghi `_all.log` và `<profile>.log`, đường dẫn tương đối tính từ thư mục chứa tệp mã nguồn. None là chỉ in ra console.
+        '''
+        if log_dir and not Path(log_dir).is_absolute():
+            log_dir = Path(__file__).parent / log_dir
+        LOGGER.configure(level, log_dir)
+
+    def config_tracing(self, path: str | Path = 'traces.jsonl'):
+        '''
+        Bật ghi span (hành động Node, bước chuỗi, mở trình duyệt, giai đoạn handler) vào tệp JSONL.
+
+        Args:
+            path (str | Path): Tệp JSONL, đường dẫn tương đối tính từ thư mục chứa tệp mã nguồn.
+
+        Xem báo cáo p50/p95/p99:
+            python tracing.py traces.jsonl
+        '''
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path(__file__).parent / path
+        TRACER.configure(path)
+
+    def config_schedule(self, rules: list[TaskRule], path: str | Path = 'task_state.json'):
+        '''
+        Bật lịch tác vụ theo cooldown: lưu thời điểm thành công của từng tác vụ và chỉ mở trình duyệt
+        cho profile có ít nhất một tác vụ đến hạn. Handler dùng `SCHEDULE.remaining` để bỏ qua tác vụ chưa đến hạn.
+
+        Args:
+            rules (list[TaskRule]): Quy tắc đến hạn, ví dụ `HaHaWallet.TASK_RULES`.
+            path (str | Path): Tệp JSON lưu thời điểm thành công, đường dẫn tương đối tính từ thư mục chứa tệp mã nguồn.
+
+        Xem tác vụ đến hạn:
+            python task_schedule.py task_state.json
+        '''
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path(__file__).parent / path
+        SCHEDULE.configure(rules, path)
+
+    def config_journal(self, path: str | Path = 'run_journal.db', run_name: str = None, resume: bool = False):
+        '''
+        Bật nhật ký lần chạy (SQLite/WAL) để chạy lại chỉ làm các phần chưa xong.
+
+        Args:
+            path (str | Path): Tệp SQLite, đường dẫn tương đối tính từ thư mục chứa tệp mã nguồn.
+            run_name (str, option): Tên lần chạy, ví dụ ngày chạy.
+            resume (bool): Tiếp tục lần chạy chưa kết thúc gần nhất: bỏ qua profile đã xong,
+                handler bỏ qua tác vụ đã xong (ví dụ tiếp tục send ETH từ 7/10).
+
+        Xem nhật ký:
+            python run_journal.py run_journal.db
+        '''
+        path = Path(path)
+        if not path.is_absolute():
+            path = Path(__file__).parent / path
+        run_id = JOURNAL.configure(path, run_name, resume)
+        self._log(message=f"{'Tiếp tục' if resume else 'Bắt đầu'} lần chạy #{run_id} ({path.name})")
+
+    def config_rpc(self, url: str, prefetch: Iterable[str] = None, **options):
+        '''
+        Bật đọc trạng thái on-chain (số dư, nonce) của ví qua JSON-RPC để handler quyết định bỏ qua tác vụ
+        và kiểm tra kết quả sau khi chạy.
+
+        Args:
+            url (str): Địa chỉ RPC, ví dụ anvil 'http://127.0.0.1:8545'.
+            prefetch (Iterable[str], option): Địa chỉ ví cần đọc trước theo lô (kiểm tra RPC và giá gas trước khi chạy), ví dụ mọi ví trong data.txt.
+            **options: Truyền cho `rpc_client.RpcClient` (timeout, batch_size, pool_size, max_retries).
+
+        Xem trạng thái các ví:
+            python rpc_client.py data.txt --rpc <url>
+        '''
+        CHAIN.configure(url, **options)
+        if prefetch is not None:
+            CHAIN.prefetch(prefetch)
+
+    def config_input_mode(self, mode: str = 'char'):
+        '''
+        Cấu hình chiến lược nhập văn bản mặc định của `Node.find_and_input` trong lần chạy này.
+
+        Args:
+            mode (str): 'char' (từng ký tự, mặc định) | 'bulk' (một lần send_keys) | 'js' (gán value + sự kiện input/change) | 'typing' (theo cụm, giống người gõ).
+        '''
+        Node.set_input_mode(mode)
+
     def _listen_for_enter(self, profile_name: str):
         """Lắng nghe sự kiện Enter để dừng trình duyệt"""
         if sys.stdin.isatty():  # Kiểm tra nếu có stdin hợp lệ
@@ -669,13 +1708,32 @@ class BrowserManager:
             - Nêu `stop_flag` được cung cấp, trình duyệt sẽ duy trì hoạt động cho đến khi nhấn enter.
             - Sau cùng, - Đóng trình duyệt và giải phóng vị trí đã chiếm dụng bằng `_release_position`.
 
+        Returns:
+            dict: {'profile', 'success', 'error', 'duration', 'prewarmed'} - kết quả chạy của profile.
+
         Lưu ý:
             - Phương thức này có thể chạy độc lập hoặc được gọi bên trong `BrowserManager.run_multi()` và `BrowserManager.run_stop()`.
             - Đảm bảo rằng `HandlerClass` (nếu có) được định nghĩa với phương thức `run_browser()`.
         '''
         profile_name = profile['profile']
-        driver = self._browser(profile_name)
-        self._arrange_window(driver, row, col)
+        result = {'profile': profile_name, 'success': False, 'error': None, 'duration': 0.0, 'prewarmed': False}
+        start = time.perf_counter()
+
+        try:
+            driver = self._prewarmed.pop(profile_name, None)
+            if driver is not None:
+                result['prewarmed'] = True
+                self._log(profile_name, 'Dùng trình duyệt đã khởi động sẵn')
+            else:
+                driver = self._browser(profile_name)
+            if not self.fleet_mode:
+                self._arrange_window(driver, row, col)
+        except Exception as e:
+            self._log(profile_name, f'Lỗi - Không mở được trình duyệt: {e}', 'ERROR')
+            self._release_position(profile_name, row, col)
+            result['error'] = str(e)
+            result['duration'] = time.perf_counter() - start
+            return result
         
         try:
             # Khi chạy chương trình với phương thức run_stop. Duyệt trình sẽ duy trì trạng thái
@@ -685,55 +1743,160 @@ class BrowserManager:
             # Thực thi logic bên ngoài khi đồng thời có HandlerClass và không chạy run_stop()
             if self.HandlerClass and not stop_flag:
                 self.HandlerClass(driver, profile)._run()
-                
+                # Chỉ đánh dấu profile xong khi mọi tác vụ đã ghi đều thành công, để lần chạy tiếp (resume) làm lại phần lỗi
+                unfinished = JOURNAL.unfinished(profile_name)
+                if unfinished:
+                    result['error'] = f"Chưa hoàn thành: {', '.join(unfinished)}"
+                    self._log(profile_name, result['error'], 'WARNING')
+                else:
+                    JOURNAL.finish(profile_name, 'profile')
+            result['success'] = result['error'] is None
 
         except Exception as e:
+            result['error'] = str(e)
             Utility.wait_time(5, True)
-            if self.data_tele:
-                self._send_screenshot_to_telegram(driver, profile_name, e)
-            else:
-                self._save_screenshot(driver, profile_name)
+            # Lỗi khi chụp/gửi ảnh (trình duyệt đã chết, coordinator mất kết nối) không che lỗi gốc trong `result`
+            try:
+                if self.evidence_sink:
+                    self.evidence_sink(profile_name, driver.get_screenshot_as_png(), str(e))
+                elif self.data_tele:
+                    self._send_screenshot_to_telegram(driver, profile_name, e)
+                else:
+                    self._save_screenshot(driver, profile_name)
+            except Exception as capture_error:
+                self._log(profile_name, f'Không lưu được ảnh lỗi: {capture_error}', 'WARNING')
 
         finally:
             self._log(profile_name, 'Đóng... wait')
             Utility.wait_time(1, True)
             driver.quit()
             self._release_position(profile_name, row, col)
+            result['duration'] = time.perf_counter() - start
+
+        return result
+
+    def _stagger_delay(self, delay_between_profiles, index: int) -> float:
+        if callable(delay_between_profiles):
+            return delay_between_profiles(index)
+        return delay_between_profiles
+
+    def _log_summary(self, results: list[dict], elapsed: float):
+        failed = [result for result in results if not result['success']]
+        self._log(message=f'Hoàn thành {len(results) - len(failed)}/{len(results)} profile trong {elapsed:.0f}s')
+        prewarmed = sum(1 for result in results if result.get('prewarmed'))
+        if prewarmed:
+            self._log(message=f'{prewarmed}/{len(results)} profile dùng trình duyệt khởi động sẵn')
+        for result in failed:
+            self._log(message=f"Lỗi - {result['profile']}: {result['error']}", level='ERROR')
 
-    def run_multi(self, profiles: list[dict], max_concurrent_profiles: int = 1, delay_between_profiles: int = 10):
+    def run_multi(self, profiles: Iterable[dict], max_concurrent_profiles: int = 1, delay_between_profiles: float = 10):
         '''
         Phương thức khởi chạy nhiều hồ sơ đồng thời
 
         Args:
-            profiles (list[dict]): Danh sách các hồ sơ trình duyệt cần khởi chạy.
+            profiles (Iterable[dict]): Danh sách (hoặc iterator, ví dụ `ProfileSource`) các hồ sơ trình duyệt cần khởi chạy.
                 Mỗi hồ sơ là một dictionary chứa thông tin, với key 'profile' là bắt buộc, ví dụ: {'profile': 'profile_name',...}.
             max_concurrent_profiles (int, option): Số lượng tối đa các hồ sơ có thể chạy đồng thời. Mặc định là 1.
-            delay_between_profiles (int, option): Thời gian chờ giữa việc khởi chạy hai hồ sơ liên tiếp (tính bằng giây). Mặc định là 10 giây.
+            delay_between_profiles (float | callable, option): Khoảng cách tối thiểu giữa hai lần khởi chạy liên tiếp (giây). Mặc định là 10 giây.
+                Có thể là hàm `f(index) -> float` để tùy biến theo thứ tự profile.
+
+        Returns:
+            list[dict]: Kết quả từng profile theo thứ tự `profiles`: {'profile', 'success', 'error', 'duration', 'prewarmed'}.
 
         Hoạt động:
             - Sử dụng `ThreadPoolExecutor` để khởi chạy các hồ sơ trình duyệt theo mô hình đa luồng.
-            - Hàng đợi (`queue`) chứa danh sách các hồ sơ cần chạy.
-            - Xác định vị trí hiển thị trình duyệt (`row`, `col`) thông qua `_get_position`.
-            - Khi có vị trí trống, hồ sơ sẽ được khởi chạy thông qua phương thức `run`.
-            - Nếu không có vị trí nào trống, chương trình chờ 10 giây trước khi kiểm tra lại.
+            - `profiles` được duyệt dần: chỉ đọc trước số profile đủ cho các ô trống và trình duyệt khởi động sẵn.
+            - Bộ lập lịch chờ ô trống bằng `threading.Condition` (`_acquire_position`) và khởi chạy hồ sơ kế tiếp ngay khi một ô được giải phóng.
+            - Khoảng cách khởi chạy (`delay_between_profiles`) được tính từ lần khởi chạy trước, độc lập với việc chờ ô trống.
+            - Nếu bật `config_prewarm`, trong lúc chờ ô trống trình duyệt của profile kế tiếp được khởi động sẵn (giới hạn theo bộ nhớ còn trống).
+            - Nếu bật `config_schedule`, chỉ mở trình duyệt cho profile có tác vụ đến hạn.
+            - Nếu bật `config_journal`, profile đã hoàn thành trong lần chạy hiện tại được bỏ qua; lần chạy được đánh dấu kết thúc khi mọi profile thành công.
+            - Kết quả của các future được thu thập và tóm tắt khi kết thúc.
         '''
-        queue = [profile for profile in profiles]
-        self._get_matrix(max_concurrent_profiles, len(queue))
+        skipped = {'idle': 0, 'done': 0, 'next_due': None}
 
-        with ThreadPoolExecutor(max_workers=max_concurrent_profiles) as executor:
-            while len(queue) > 0:
-                profile = queue[0]
+        def runnable():
+            # Lọc theo lịch và nhật ký khi duyệt, không cần nạp toàn bộ danh sách profile
+            for profile in profiles:
                 profile_name = profile['profile']
-                row, col = self._get_position(profile_name)
+                if SCHEDULE.enabled and not SCHEDULE.due(profile_name):
+                    skipped['idle'] += 1
+                    next_due = SCHEDULE.next_due(profile_name)
+                    skipped['next_due'] = min(filter(None, (skipped['next_due'], next_due)), default=None)
+                    continue
+                if JOURNAL.enabled and JOURNAL.done(profile_name, 'profile'):
+                    skipped['done'] += 1
+                    continue
+                yield profile
+
+        source = runnable()
+        queue = deque()
+
+        def fill(count: int):
+            while len(queue) < count:
+                profile = next(source, None)
+                if profile is None:
+                    return
+                queue.append(profile)
+
+        # Chỉ cần biết tối đa `max_concurrent_profiles` profile đầu tiên để dựng ma trận vị trí
+        fill(max_concurrent_profiles)
+        self._get_matrix(len(queue), max_concurrent_profiles)
+        futures = []
+        begin = time.perf_counter()
+        last_launch = None
+
+        def wait_stagger(index):
+            # thời gian chờ mở profile kế, tính từ lần mở trước
+            nonlocal last_launch
+            if last_launch is not None:
+                remaining = self._stagger_delay(delay_between_profiles, index) - (time.perf_counter() - last_launch)
+                if remaining > 0:
+                    Utility.wait_time(remaining, True)
+            last_launch = time.perf_counter()
 
-                if row is not None and col is not None:
-                    queue.pop(0)
-                    executor.submit(self.run_browser, profile, row, col)
-                    # thời gian chờ mở profile kế
-                    Utility.wait_time(delay_between_profiles, True)
-                else:
-                    # thời gian chờ mở profile kế# Thời gian chờ check lại
-                    Utility.wait_time(10, True)
+        try:
+            with ThreadPoolExecutor(max_workers=max_concurrent_profiles) as executor:
+                index = 0
+                while True:
+                    fill(1 + self.prewarm_ahead)
+                    if not queue:
+                        break
+                    profile = queue[0]
+                    profile_name = profile['profile']
+                    if self.prewarm_ahead and not self._has_free_slot():
+                        self._prewarm(list(queue)[:self.prewarm_ahead], lambda: wait_stagger(index))
+
+                    row, col = self._acquire_position(profile_name)
+                    queue.popleft()
+                    if profile_name not in self._prewarmed:
+                        wait_stagger(index)
+                    futures.append((profile_name, executor.submit(self.run_browser, profile, row, col)))
+                    index += 1
+        finally:
+            self._close_prewarmed()
+
+        if skipped['idle']:
+            self._log(message=f"Bỏ qua {skipped['idle']} profile không có tác vụ đến hạn (sớm nhất lúc {skipped['next_due']:%Y-%m-%d %H:%M} UTC)")
+        if skipped['done']:
+            self._log(message=f"Bỏ qua {skipped['done']} profile đã hoàn thành trong lần chạy #{JOURNAL.run_id}")
+
+        results = []
+        for profile_name, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'profile': profile_name, 'success': False, 'error': str(e), 'duration': 0.0, 'prewarmed': False})
+
+        if self.uploader:
+            self.uploader.join()
+        self._log_summary(results, time.perf_counter() - begin)
+        self._log_resource_report()
+        SCHEDULE.save()
+        # Chỉ kết thúc lần chạy khi không còn đơn vị lỗi/dở, để `resume=True` tiếp tục đúng lần chạy này
+        if JOURNAL.enabled and all(result['success'] for result in results) and not JOURNAL.incomplete():
+            JOURNAL.finish_run()
+        return results
 
     def run_stop(self, profiles: list[dict]):
         '''
@@ -844,20 +2007,7 @@ class BrowserManager:
 if __name__ == '__main__':
     DATA_DIR = Path(__file__).parent/'data.txt'
 
-    PROFILES = []
-    with open(DATA_DIR, 'r') as file:
-        data = file.readlines()
-
-    for line in data:
-        parts = line.strip().split('|')
-        profile = parts[0]
-        secrets = parts[1].split()
-        password = parts[2]
-        PROFILES.append({
-            'profile': profile,
-            'secrets': secrets,
-            'password': password
-        })
+    PROFILES = list(ProfileSource(DATA_DIR, SECRETS_PASSWORD))
 
     manager = BrowserManager()
     # nếu có đoạn này thì chạy extension, nếu không thì khôgn chạy extension
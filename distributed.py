@@ -0,0 +1,500 @@
+import json
+import time
+import uuid
+import base64
+import socket
+import importlib
+import threading
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from browser_automation import BrowserManager
+from profile_source import ProfileSource, SCHEMAS, WALLET_PIN
+from utils import Utility
+
+
+class Coordinator:
+    def __init__(self, profiles: list[dict], bind: str = '127.0.0.1', port: int = 8765, lease_ttl: float = 60,
+                 max_attempts: int = 3, token: str = None, shard_path: Path | str = None, manager: BrowserManager = None,
+                 node_timeout: float = None) -> None:
+        '''
+        Giữ hàng đợi profile và cho các worker (trên các máy khác) thuê (lease) từng profile qua HTTP.
+
+        Args:
+            profiles (list[dict]): Danh sách hồ sơ, key 'profile' là bắt buộc.
+            bind (str), port (int): Địa chỉ lắng nghe. Dùng '0.0.0.0' để nhận worker từ máy khác.
+            lease_ttl (float): Số giây một lease còn hiệu lực nếu không nhận được heartbeat.
+            max_attempts (int): Số lần lease hết hạn tối đa trước khi đánh dấu profile thất bại.
+            token (str, option): Khóa chia sẻ, worker phải gửi trong header `X-Token`.
+            shard_path (Path | str, option): Tệp JSON lưu profile thuộc node nào. Mặc định là `shards.json` cạnh tệp mã nguồn.
+            manager (BrowserManager, option): Dùng để gửi ảnh lỗi lên Telegram hoặc lưu vào snapshot.
+            node_timeout (float, option): Profile đang chờ đã gắn với một node đã kết nối trong lần chạy này rồi mất
+                liên lạc quá số giây này bị đánh dấu thất bại (user_data của nó không có trên node khác).
+                Node chưa kết nối lần nào chỉ được cảnh báo, profile của nó tiếp tục chờ. Mặc định là 5 x `lease_ttl`.
+
+        Mô tả:
+            - Lần đầu một node thuê profile, profile được gắn cố định với node đó (user_data của profile nằm trên máy đó);
+              các lần sau chỉ node đó được thuê lại profile.
+            - Lease hết hạn (worker chết, mất mạng) được đưa lại đầu hàng đợi.
+        '''
+        self.profiles = {profile['profile']: profile for profile in profiles}
+        self.order = list(self.profiles)
+        self.lease_ttl = lease_ttl
+        self.max_attempts = max_attempts
+        self.node_timeout = node_timeout or lease_ttl * 5
+        self.token = token
+        self.shard_path = Path(shard_path) if shard_path else Path(__file__).parent / 'shards.json'
+        self.manager = manager
+
+        self.pending = deque(self.order)
+        self.leases = {}
+        self.results = {}
+        self.attempts = {}
+        self.last_seen = {}
+        self.shards = self._load_shards()
+        self._cond = threading.Condition()
+        self._begin = time.perf_counter()
+        self._started = time.monotonic()
+        self._absent = set()  # Node được gắn profile nhưng chưa kết nối, đã cảnh báo
+
+        self.server = ThreadingHTTPServer((bind, port), self._make_handler())
+        self.server.daemon_threads = True
+        self.url = f'http://{bind}:{self.server.server_address[1]}'
+
+    def _load_shards(self) -> dict:
+        if not self.shard_path.exists():
+            return {}
+        try:
+            return json.loads(self.shard_path.read_text(encoding='utf-8'))
+        except ValueError as e:
+            Utility.logger(message=f'Không đọc được {self.shard_path}: {e}')
+            return {}
+
+    def _save_shards(self):
+        tmp_path = self.shard_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.shards, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp_path.replace(self.shard_path)
+
+    def _finished(self) -> bool:
+        return not self.pending and not self.leases
+
+    def _fail(self, profile_name: str, node: str, error: str):
+        self.results[profile_name] = {'profile': profile_name, 'success': False, 'error': error, 'duration': 0.0, 'node': node}
+        Utility.logger(profile_name, error)
+
+    def lease(self, node: str, count: int) -> dict:
+        '''
+        Cho `node` thuê tối đa `count` profile đang chờ (chưa gắn node nào hoặc đã gắn với `node`).
+        '''
+        with self._cond:
+            if self._finished():
+                return {'done': True, 'leases': []}
+
+            granted = []
+            assigned = False
+            for profile_name in list(self.pending):
+                if len(granted) >= count:
+                    break
+                owner = self.shards.get(profile_name)
+                if owner not in (None, node):
+                    continue
+                if owner is None:
+                    self.shards[profile_name] = node
+                    assigned = True
+
+                self.pending.remove(profile_name)
+                lease_id = uuid.uuid4().hex
+                self.leases[lease_id] = {'profile': profile_name, 'node': node,
+                                         'expires': time.monotonic() + self.lease_ttl}
+                granted.append({'lease_id': lease_id, 'profile': self.profiles[profile_name], 'ttl': self.lease_ttl})
+                Utility.logger(profile_name, f'Cho {node} thuê')
+
+            if assigned:
+                self._save_shards()
+            return {'done': False, 'leases': granted}
+
+    def heartbeat(self, node: str, lease_ids: list[str]) -> dict:
+        '''
+        Gia hạn các lease của `node`. Trả về các lease không còn hiệu lực (`lost`) để worker biết.
+        '''
+        lost = []
+        with self._cond:
+            expires = time.monotonic() + self.lease_ttl
+            for lease_id in lease_ids:
+                lease = self.leases.get(lease_id)
+                if lease is None or lease['node'] != node:
+                    lost.append(lease_id)
+                else:
+                    lease['expires'] = expires
+        return {'lost': lost}
+
+    def complete(self, node: str, lease_id: str, result: dict) -> dict:
+        '''
+        Nhận kết quả một profile. Kết quả đến muộn (lease đã hết hạn) vẫn được nhận nếu profile chưa có kết quả.
+        '''
+        with self._cond:
+            lease = self.leases.pop(lease_id, None)
+            profile_name = lease['profile'] if lease else result.get('profile')
+            if profile_name not in self.profiles:
+                return {'accepted': False}
+            if lease is None:
+                if profile_name in self.results:
+                    return {'accepted': False}
+                if profile_name in self.pending:
+                    self.pending.remove(profile_name)
+
+            result['node'] = node
+            self.results[profile_name] = result
+            status = 'thành công' if result.get('success') else f"lỗi: {result.get('error')}"
+            Utility.logger(profile_name, f'Kết quả từ {node}: {status}')
+            self._cond.notify_all()
+            return {'accepted': True}
+
+    def evidence(self, node: str, profile_name: str, png: bytes, message: str):
+        '''
+        Nhận ảnh lỗi từ worker: gửi lên Telegram (nếu có cấu hình) hoặc lưu vào thư mục snapshot.
+        '''
+        manager = self.manager
+        if manager is None:
+            return
+        if manager.data_tele and manager._get_uploader().submit(png, profile_name, f'[{node}] {message}'):
+            return
+        manager._save_screenshot(None, profile_name, png)
+
+    def _reap(self):
+        while True:
+            time.sleep(1)
+            with self._cond:
+                now = time.monotonic()
+                for lease_id, lease in list(self.leases.items()):
+                    if lease['expires'] > now:
+                        continue
+                    del self.leases[lease_id]
+                    profile_name = lease['profile']
+                    self.attempts[profile_name] = self.attempts.get(profile_name, 0) + 1
+                    if self.attempts[profile_name] >= self.max_attempts:
+                        self._fail(profile_name, lease['node'], f"Lease trên {lease['node']} hết hạn {self.attempts[profile_name]} lần")
+                    else:
+                        self.pending.appendleft(profile_name)
+                        Utility.logger(profile_name, f"Lease trên {lease['node']} hết hạn - đưa lại hàng đợi")
+
+                # Profile gắn với node đã mất liên lạc không thể chạy ở node khác
+                for profile_name in list(self.pending):
+                    node = self.shards.get(profile_name)
+                    if not node:
+                        continue
+                    seen = self.last_seen.get(node)
+                    if seen is None:
+                        # Node chưa kết nối (có thể khởi động muộn): chỉ cảnh báo, không đánh dấu thất bại
+                        if now - self._started > self.node_timeout and node not in self._absent:
+                            self._absent.add(node)
+                            Utility.logger(message=f'Node {node} chưa kết nối sau {self.node_timeout:.0f}s - '
+                                                   f'các profile gắn với node này tiếp tục chờ', level='WARNING')
+                    elif now - seen > self.node_timeout:
+                        self.pending.remove(profile_name)
+                        self._fail(profile_name, node, f'Node {node} mất liên lạc quá {self.node_timeout:.0f}s')
+                self._cond.notify_all()
+
+    def status(self) -> dict:
+        with self._cond:
+            return {
+                'pending': list(self.pending),
+                'leased': {lease['profile']: lease['node'] for lease in self.leases.values()},
+                'done': len(self.results),
+                'total': len(self.profiles),
+                'failed': [name for name, result in self.results.items() if not result.get('success')],
+            }
+
+    def _make_handler(self):
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, code: int, payload: dict):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorized(self) -> bool:
+                if coordinator.token and self.headers.get('X-Token') != coordinator.token:
+                    self._reply(403, {'error': 'token không hợp lệ'})
+                    return False
+                return True
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path == '/status':
+                    self._reply(200, coordinator.status())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    data = json.loads(self.rfile.read(length) or b'{}')
+                    node = data['node']
+                    coordinator.last_seen[node] = time.monotonic()
+                    if self.path == '/lease':
+                        payload = coordinator.lease(node, int(data.get('count', 1)))
+                    elif self.path == '/heartbeat':
+                        payload = coordinator.heartbeat(node, data.get('leases', []))
+                    elif self.path == '/result':
+                        payload = coordinator.complete(node, data['lease_id'], data['result'])
+                    elif self.path == '/evidence':
+                        coordinator.evidence(node, data['profile'], base64.b64decode(data['png']), data.get('message', ''))
+                        payload = {}
+                    else:
+                        self._reply(404, {'error': 'not found'})
+                        return
+                except (KeyError, ValueError) as e:
+                    self._reply(400, {'error': str(e)})
+                    return
+                self._reply(200, payload)
+
+        return Handler
+
+    def start(self):
+        '''
+        Chạy HTTP server và luồng thu hồi lease hết hạn ở nền.
+        '''
+        threading.Thread(target=self.server.serve_forever, name='coordinator-http', daemon=True).start()
+        threading.Thread(target=self._reap, name='coordinator-reaper', daemon=True).start()
+        Utility.logger(message=f'Coordinator lắng nghe tại {self.url} ({len(self.pending)} profile)')
+
+    def wait(self, timeout: float = None) -> list[dict]:
+        '''
+        Chờ đến khi mọi profile có kết quả, rồi trả về kết quả theo thứ tự `profiles`.
+        Worker nhận `done` ở lần thuê kế tiếp và tự thoát.
+        '''
+        with self._cond:
+            self._cond.wait_for(self._finished, timeout)
+            results = [self.results.get(name, {'profile': name, 'success': False, 'error': 'chưa chạy', 'duration': 0.0})
+                       for name in self.order]
+        if self.manager:
+            if self.manager.uploader:
+                self.manager.uploader.join()
+            self.manager._log_summary(results, time.perf_counter() - self._begin)
+        return results
+
+    def shutdown(self, grace: float = 10):
+        '''
+        Dừng HTTP server. Chờ tối đa `grace` giây để worker nhận được `done`.
+        '''
+        time.sleep(grace)
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Worker:
+    def __init__(self, coordinator_url: str, HandlerClass=None, node: str = None, capacity: int = 1,
+                 user_data_dir: Path | str = None, token: str = None, heartbeat_interval: float = 10,
+                 poll_interval: float = 5, delay_between_profiles: float = 0, manager: BrowserManager = None) -> None:
+        '''
+        Thuê profile từ coordinator và chạy `HandlerClass._run` trên máy này bằng `BrowserManager.run_browser`.
+
+        Args:
+            coordinator_url (str): Ví dụ 'http://10.0.0.5:8765'.
+            HandlerClass (class, option): Lớp xử lý, ví dụ `hahawallet.Main`.
+            node (str, option): Tên node - profile được gắn cố định với tên này. Mặc định là hostname.
+            capacity (int): Số profile chạy đồng thời trên node.
+            user_data_dir (Path | str, option): Thư mục user_data của node (mặc định như `BrowserManager`).
+            token (str, option): Khóa chia sẻ với coordinator.
+            heartbeat_interval (float): Chu kỳ gửi heartbeat (giây), nên nhỏ hơn 1/3 `lease_ttl` của coordinator.
+            poll_interval (float): Thời gian chờ trước khi hỏi thuê lại khi không có profile phù hợp.
+            delay_between_profiles (float): Khoảng cách tối thiểu giữa hai lần mở trình duyệt trên node.
+            manager (BrowserManager, option): Dùng manager đã cấu hình sẵn thay vì tạo mới.
+
+        Mô tả:
+            - Ảnh lỗi được gửi về coordinator (`BrowserManager.evidence_sink`) thay vì gửi Telegram từ worker.
+        '''
+        self.coordinator_url = coordinator_url.rstrip('/')
+        self.node = node or socket.gethostname()
+        self.capacity = capacity
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+        self.delay_between_profiles = delay_between_profiles
+
+        self.manager = manager or BrowserManager(HandlerClass)
+        if user_data_dir:
+            self.manager.user_data_dir = Path(user_data_dir)
+        self.manager.evidence_sink = self._send_evidence
+        self.manager._get_matrix(capacity, capacity)
+
+        self.session = requests.Session()
+        if token:
+            self.session.headers['X-Token'] = token
+        self.active = {}
+        self.results = []
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+
+    def _post(self, path: str, payload: dict, retries: int = 0) -> dict:
+        payload = dict(payload, node=self.node)
+        delay = 1.0
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.post(f'{self.coordinator_url}{path}', json=payload, timeout=(5, 30))
+                response.raise_for_status()
+                return response.json()
+            except requests.RequestException as e:
+                if attempt == retries:
+                    raise
+                Utility.logger(message=f'Lỗi kết nối coordinator ({path}): {e}. Thử lại sau {delay:.0f}s', level='WARNING')
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _send_evidence(self, profile_name: str, png: bytes, message: str):
+        try:
+            self._post('/evidence', {'profile': profile_name, 'png': base64.b64encode(png).decode(), 'message': message}, retries=2)
+        except requests.RequestException:
+            self.manager._save_screenshot(None, profile_name, png)
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._cond:
+                lease_ids = list(self.active)
+            if not lease_ids:
+                continue
+            try:
+                lost = self._post('/heartbeat', {'leases': lease_ids}).get('lost', [])
+                for lease_id in lost:
+                    Utility.logger(self.active.get(lease_id, {}).get('profile', 'SYS'),
+                                   'Lease đã hết hạn trên coordinator, profile có thể bị chạy lại')
+            except requests.RequestException as e:
+                Utility.logger(message=f'Không gửi được heartbeat: {e}')
+
+    def _run_lease(self, lease: dict):
+        profile = lease['profile']
+        profile_name = profile['profile']
+        try:
+            row, col = self.manager._acquire_position(profile_name)
+            result = self.manager.run_browser(profile, row, col)
+        except Exception as e:
+            result = {'profile': profile_name, 'success': False, 'error': str(e), 'duration': 0.0}
+
+        try:
+            self._post('/result', {'lease_id': lease['lease_id'], 'result': result}, retries=5)
+        except requests.RequestException as e:
+            Utility.logger(profile_name, f'Không gửi được kết quả về coordinator: {e}')
+        finally:
+            with self._cond:
+                self.active.pop(lease['lease_id'], None)
+                self.results.append(result)
+                self._cond.notify_all()
+
+    def run(self) -> list[dict]:
+        '''
+        Vòng lặp thuê và chạy profile đến khi coordinator báo `done`.
+
+        Returns:
+            list[dict]: Kết quả các profile đã chạy trên node này.
+        '''
+        heartbeat = threading.Thread(target=self._heartbeat, name='worker-heartbeat', daemon=True)
+        heartbeat.start()
+        Utility.logger(message=f'Worker {self.node} kết nối {self.coordinator_url} (capacity={self.capacity})')
+        last_launch = None
+
+        with ThreadPoolExecutor(max_workers=self.capacity) as executor:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: len(self.active) < self.capacity)
+                    free = self.capacity - len(self.active)
+
+                try:
+                    response = self._post('/lease', {'count': free})
+                except requests.RequestException as e:
+                    Utility.logger(message=f'Không kết nối được coordinator: {e}')
+                    time.sleep(self.poll_interval)
+                    continue
+
+                if response['done']:
+                    break
+                if not response['leases']:
+                    # Không có profile phù hợp: chờ một profile đang chạy xong hoặc hết chu kỳ hỏi lại
+                    with self._cond:
+                        self._cond.wait(self.poll_interval)
+                    continue
+
+                for lease in response['leases']:
+                    if last_launch is not None:
+                        remaining = self.delay_between_profiles - (time.perf_counter() - last_launch)
+                        if remaining > 0:
+                            Utility.wait_time(remaining, True)
+                    last_launch = time.perf_counter()
+                    with self._cond:
+                        self.active[lease['lease_id']] = lease['profile']
+                    executor.submit(self._run_lease, lease)
+
+        self._stopped.set()
+        if self.manager.uploader:
+            self.manager.uploader.join()
+        Utility.logger(message=f'Worker {self.node} kết thúc: {sum(r["success"] for r in self.results)}/{len(self.results)} thành công')
+        return self.results
+
+
+def _load_handler(path: str):
+    '''
+    Nạp lớp xử lý từ chuỗi 'module:Class', ví dụ 'hahawallet:Main'.
+    '''
+    module_name, _, class_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), class_name or 'Main')
+
+
+if __name__ == '__main__':
+    # Coordinator: python distributed.py coordinator [--data data.txt] [--bind 0.0.0.0] [--port 8765] [--token X]
+    # Worker:      python distributed.py worker --coordinator http://<ip>:8765 [--node w1] [--capacity 2] [--user-data-dir user_data_w1]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Chạy profile trên nhiều máy: một coordinator giữ hàng đợi, các worker thuê profile')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    coordinator_parser = commands.add_parser('coordinator')
+    coordinator_parser.add_argument('--data', default=Path(__file__).parent / 'data.txt')
+    coordinator_parser.add_argument('--schema', default=WALLET_PIN.name, choices=sorted(SCHEMAS))
+    coordinator_parser.add_argument('--range', default=None, help="Thứ tự profile, ví dụ '1-100'")
+    coordinator_parser.add_argument('--glob', action='append', default=None)
+    coordinator_parser.add_argument('--tag', action='append', default=None)
+    coordinator_parser.add_argument('--bind', default='127.0.0.1')
+    coordinator_parser.add_argument('--port', type=int, default=8765)
+    coordinator_parser.add_argument('--token', default=None)
+    coordinator_parser.add_argument('--lease-ttl', type=float, default=60)
+    coordinator_parser.add_argument('--max-attempts', type=int, default=3)
+
+    worker_parser = commands.add_parser('worker')
+    worker_parser.add_argument('--coordinator', default='http://127.0.0.1:8765')
+    worker_parser.add_argument('--handler', default='hahawallet:Main', help="Lớp xử lý dạng 'module:Class'")
+    worker_parser.add_argument('--node', default=None)
+    worker_parser.add_argument('--capacity', type=int, default=1)
+    worker_parser.add_argument('--user-data-dir', default=None)
+    worker_parser.add_argument('--token', default=None)
+    worker_parser.add_argument('--heartbeat', type=float, default=10)
+    worker_parser.add_argument('--delay', type=float, default=10, help='Khoảng cách giữa hai lần mở trình duyệt (giây)')
+    args = parser.parse_args()
+
+    if args.command == 'coordinator':
+        source = ProfileSource(args.data, SCHEMAS[args.schema], ranges=args.range, globs=args.glob, tags=args.tag)
+        coordinator = Coordinator(list(source), args.bind, args.port, args.lease_ttl,
+                                  args.max_attempts, args.token, manager=BrowserManager())
+        coordinator.start()
+        coordinator.wait()
+        coordinator.shutdown(grace=args.lease_ttl / 2)
+    else:
+        HandlerClass = _load_handler(args.handler)
+        worker = Worker(args.coordinator, HandlerClass, args.node, args.capacity, args.user_data_dir,
+                        args.token, args.heartbeat, delay_between_profiles=args.delay)
+        # Lớp xử lý có thể tự cấu hình manager (extension, pacing...), ví dụ `hahawallet.Main.configure`
+        if hasattr(HandlerClass, 'configure'):
+            HandlerClass.configure(worker.manager)
+        worker.run()
@@ -0,0 +1,156 @@
+import atexit
+import threading
+import subprocess
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from selenium.webdriver.common.driver_finder import DriverFinder
+
+from tracing import TRACER
+from utils import Utility
+
+
+class PooledChrome(webdriver.Chrome):
+    def __init__(self, pool: 'DriverPool', service: 'PooledService', options) -> None:
+        '''
+        Phiên Chrome tạo trên một chromedriver đang chạy sẵn của `DriverPool`, không khởi chạy chromedriver mới.
+        `quit()` chỉ đóng phiên và trả chromedriver về pool.
+        '''
+        self.service = service.service
+        self._pool = pool
+        self._pooled_service = service
+        self._released = False
+        executor = ChromiumRemoteConnection(
+            remote_server_addr=service.service.service_url,
+            browser_name=DesiredCapabilities.CHROME['browserName'],
+            vendor_prefix='goog',
+            keep_alive=True,
+            ignore_proxy=options._ignore_local_proxy,
+        )
+        webdriver.Remote.__init__(self, command_executor=executor, options=options)
+        self._is_remote = False
+
+    def quit(self) -> None:
+        try:
+            webdriver.Remote.quit(self)
+        except Exception:
+            pass
+        finally:
+            if not self._released:
+                self._released = True
+                self._pool.release(self._pooled_service)
+
+
+class PooledService:
+    def __init__(self, service: Service, index: int) -> None:
+        self.service = service
+        self.index = index
+        self.active = 0  # Số phiên đang mở
+        self.sessions = 0  # Tổng số phiên đã tạo
+        self.retiring = False
+
+    def healthy(self) -> bool:
+        process = self.service.process
+        return process is not None and process.poll() is None and self.service.is_connectable()
+
+
+class DriverPool:
+    def __init__(self, size: int = 2, max_sessions: int = 50, log_dir: Path | str = None) -> None:
+        '''
+        Pool các chromedriver chạy lâu dài. Mỗi profile tạo một phiên (session) trên chromedriver sẵn có
+        thay vì khởi chạy một tiến trình chromedriver riêng.
+
+        Args:
+            size (int): Số chromedriver tối đa chạy cùng lúc.
+            max_sessions (int): Sau số phiên này chromedriver được thay mới (khi không còn phiên đang mở).
+            log_dir (Path | str, option): Thư mục ghi log `chromedriver-<n>.log`. None là bỏ log.
+        '''
+        self.size = size
+        self.max_sessions = max_sessions
+        self.log_dir = Path(log_dir) if log_dir else None
+        self._services = []
+        self._counter = 0
+        self._browser_path = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _spawn(self, options) -> PooledService:
+        self._counter += 1
+        if self.log_dir:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            log_output = str(self.log_dir / f'chromedriver-{self._counter}.log')
+        else:
+            log_output = subprocess.DEVNULL
+
+        service = Service(log_output=log_output)
+        finder = DriverFinder(service, options)
+        self._browser_path = finder.get_browser_path() or None
+        service.path = service.env_path() or finder.get_driver_path()
+
+        with TRACER.span('launch', 'SYS', 'driver_spawn'):
+            service.start()
+        Utility.logger(message=f'Khởi chạy chromedriver #{self._counter} tại {service.service_url}')
+        return PooledService(service, self._counter)
+
+    def _stop(self, pooled: PooledService):
+        try:
+            pooled.service.stop()
+        except Exception:
+            pass
+        if pooled in self._services:
+            self._services.remove(pooled)
+
+    def _acquire(self, options) -> PooledService:
+        with self._lock:
+            for pooled in list(self._services):
+                if pooled.active == 0 and (pooled.retiring or not pooled.healthy()):
+                    self._stop(pooled)
+
+            candidates = [pooled for pooled in self._services if not pooled.retiring and pooled.healthy()]
+            if len(candidates) < self.size and (not candidates or min(p.active for p in candidates) > 0):
+                candidates.append(self._spawn(options))
+                self._services.append(candidates[-1])
+
+            pooled = min(candidates, key=lambda p: p.active)
+            pooled.active += 1
+            pooled.sessions += 1
+            if pooled.sessions >= self.max_sessions:
+                pooled.retiring = True
+            return pooled
+
+    def new_driver(self, options, profile_name: str = 'SYS') -> PooledChrome:
+        '''
+        Tạo phiên Chrome mới trên chromedriver ít tải nhất trong pool.
+        '''
+        pooled = self._acquire(options)
+        if self._browser_path:
+            options.binary_location = self._browser_path
+            options.browser_version = None
+        try:
+            with TRACER.span('launch', profile_name, 'session'):
+                return PooledChrome(self, pooled, options)
+        except Exception:
+            self.release(pooled)
+            raise
+
+    def release(self, pooled: PooledService):
+        with self._lock:
+            pooled.active = max(0, pooled.active - 1)
+            if pooled.active == 0 and pooled.retiring:
+                self._stop(pooled)
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            return [{'index': p.index, 'url': p.service.service_url, 'active': p.active,
+                     'sessions': p.sessions, 'retiring': p.retiring} for p in self._services]
+
+    def close(self):
+        '''
+        Dừng tất cả chromedriver trong pool.
+        '''
+        with self._lock:
+            for pooled in list(self._services):
+                self._stop(pooled)
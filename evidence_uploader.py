@@ -0,0 +1,177 @@
+import time
+import queue
+import threading
+from io import BytesIO
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import Utility
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow là tùy chọn, chỉ cần khi nén ảnh
+    Image = None
+
+
+class EvidenceUploader:
+    def __init__(self, chat_id: str, telegram_token: str, save_local=None, max_queue: int = 20, workers: int = 2,
+                 timeout: tuple = (5, 30), max_retries: int = 4, max_width: int = None, jpeg_quality: int = None) -> None:
+        '''
+        Gửi ảnh lỗi lên Telegram ở luồng nền để worker có thể đóng trình duyệt ngay sau khi chụp.
+
+        Args:
+            chat_id (str), telegram_token (str): Thông tin bot Telegram.
+            save_local (callable, option): Hàm `(profile_name, png_bytes)` lưu ảnh về máy khi không gửi được.
+            max_queue (int): Số ảnh tối đa chờ gửi. Khi đầy, `submit` trả về False.
+            workers (int): Số luồng gửi, dùng chung một `requests.Session`.
+            timeout (tuple): (connect, read) timeout cho mỗi request.
+            max_retries (int): Số lần thử lại khi lỗi mạng, 5xx hoặc 429 (tôn trọng `retry_after` của Telegram).
+            max_width (int, option): Thu nhỏ ảnh về chiều rộng này trước khi gửi (cần Pillow).
+            jpeg_quality (int, option): Nén lại thành JPEG với chất lượng này trước khi gửi (cần Pillow).
+        '''
+        self.url = f'https://api.telegram.org/bot{telegram_token}/sendPhoto'
+        self.chat_id = chat_id
+        self.save_local = save_local
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_width = max_width
+        self.jpeg_quality = jpeg_quality
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=workers))
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closing = threading.Event()  # join() hết thời gian chờ: không thử lại nữa, lưu ảnh về local
+        self._threads = []
+        for index in range(workers):
+            thread = threading.Thread(target=self._worker, name=f'evidence-uploader-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, png: bytes, profile_name: str, message: str) -> bool:
+        '''
+        Đưa ảnh vào hàng đợi gửi.
+
+        Returns:
+            bool: False nếu hàng đợi đầy - người gọi cần tự lưu ảnh.
+        '''
+        timestamp = datetime.now().strftime('%Y-%m-%d_%H:%M:%S')
+        caption = f'[{timestamp}][{profile_name}] - {message}'
+        try:
+            self._queue.put_nowait((png, profile_name, caption))
+            self._closing.clear()
+            return True
+        except queue.Full:
+            return False
+
+    def _prepare(self, png: bytes) -> tuple[bytes, str, str]:
+        if Image is None or not (self.max_width or self.jpeg_quality):
+            return png, 'screenshot.png', 'image/png'
+        try:
+            return self._compress(png)
+        except Exception as e:
+            # Ảnh hỏng, quá lớn (DecompressionBombError)... - gửi nguyên ảnh PNG
+            Utility.logger(message=f'Không nén được ảnh lỗi, gửi ảnh gốc: {e}', level='WARNING')
+            return png, 'screenshot.png', 'image/png'
+
+    def _compress(self, png: bytes) -> tuple[bytes, str, str]:
+        image = Image.open(BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height))
+        buffer = BytesIO()
+        if self.jpeg_quality:
+            image.convert('RGB').save(buffer, 'JPEG', quality=self.jpeg_quality, optimize=True)
+            return buffer.getvalue(), 'screenshot.jpg', 'image/jpeg'
+        image.save(buffer, 'PNG', optimize=True)
+        return buffer.getvalue(), 'screenshot.png', 'image/png'
+
+    def _send(self, png: bytes, profile_name: str, caption: str) -> bool:
+        photo, filename, mime = self._prepare(png)
+        delay = 1.0
+
+        for attempt in range(self.max_retries + 1):
+            if self._closing.is_set():
+                return False
+            try:
+                response = self.session.post(
+                    self.url,
+                    files={'photo': (filename, photo, mime)},
+                    data={'chat_id': self.chat_id, 'caption': caption},
+                    timeout=self.timeout,
+                )
+                if response.status_code == 200:
+                    Utility.logger(profile_name, 'Hình ảnh lỗi được gửi đến bot tele')
+                    return True
+                if response.status_code == 429:
+                    try:
+                        delay = response.json().get('parameters', {}).get('retry_after', delay)
+                    except ValueError:
+                        pass
+                elif response.status_code < 500:
+                    # Lỗi phía yêu cầu (token/chat_id sai, ảnh quá lớn...) - thử lại không có ích
+                    Utility.logger(profile_name, f'Không thể gửi "Hình ảnh lỗi" lên Telegram. Mã lỗi: {response.status_code}', 'ERROR')
+                    return False
+            except requests.RequestException as e:
+                Utility.logger(profile_name, f'Lỗi mạng khi gửi ảnh lên Telegram (lần {attempt + 1}): {e}', 'WARNING')
+
+            if attempt < self.max_retries:
+                self._closing.wait(delay)
+                delay = min(delay * 2, 60)
+        return False
+
+    def _worker(self):
+        while True:
+            png, profile_name, caption = self._queue.get()
+            try:
+                if not self._send(png, profile_name, caption):
+                    Utility.logger(profile_name, 'Không gửi được "Hình ảnh lỗi" lên Telegram. Lưu về local', 'ERROR')
+                    self._save_local(profile_name, png)
+            except Exception as e:
+                Utility.logger(message=f'Lỗi khi xử lý ảnh lỗi: {e}. Lưu về local', level='ERROR')
+                self._save_local(profile_name, png)
+            finally:
+                self._queue.task_done()
+
+    def _save_local(self, profile_name: str, png: bytes):
+        if not self.save_local:
+            return
+        try:
+            self.save_local(profile_name, png)
+        except Exception as e:
+            Utility.logger(profile_name, f'Không lưu được ảnh lỗi về local: {e}', 'ERROR')
+
+    def join(self, timeout: float = 120):
+        '''
+        Chờ gửi hết các ảnh trong hàng đợi (gọi khi kết thúc lần chạy).
+
+        Args:
+            timeout (float): Số giây chờ tối đa. Hết thời gian (ví dụ Telegram không truy cập được), ảnh còn trong
+                hàng đợi được lưu về local và các ảnh đang gửi dừng thử lại để lưu về local. None là chờ đến khi xong.
+        '''
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._queue.all_tasks_done.wait(remaining)
+            if not self._queue.unfinished_tasks:
+                return
+
+        self._closing.set()
+        saved = 0
+        while True:
+            try:
+                png, profile_name, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._save_local(profile_name, png)
+            self._queue.task_done()
+            saved += 1
+        Utility.logger(message=f'Hết {timeout:.0f}s chờ gửi ảnh lỗi: lưu {saved} ảnh còn trong hàng đợi về local', level='WARNING')
+        # Chờ request đang chạy kết thúc (tối đa một lần timeout) để các luồng gửi tự lưu ảnh về local
+        with self._queue.all_tasks_done:
+            self._queue.all_tasks_done.wait_for(lambda: not self._queue.unfinished_tasks, sum(self.timeout))
@@ -0,0 +1,168 @@
+import re
+import json
+import base64
+import shutil
+import struct
+import hashlib
+import zipfile
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from utils import Utility
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _proto_fields(data: bytes):
+    '''
+    Duyệt các trường (field_number, value) của một message protobuf. Chỉ đọc varint và length-delimited,
+    đủ cho header CRX3.
+    '''
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field_number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        elif wire_type == 5:
+            value = data[pos:pos + 4]
+            pos += 4
+        elif wire_type == 1:
+            value = data[pos:pos + 8]
+            pos += 8
+        else:
+            raise ValueError(f'Wire type {wire_type} không hỗ trợ trong header CRX')
+        yield field_number, value
+
+
+def extension_id_from_key(public_key: bytes) -> str:
+    '''
+    ID extension của Chrome: 16 byte đầu của sha256(public key), mỗi nửa byte ánh xạ sang 'a'-'p'.
+    '''
+    digest = hashlib.sha256(public_key).hexdigest()[:32]
+    return ''.join(chr(ord('a') + int(char, 16)) for char in digest)
+
+
+def parse_crx(data: bytes) -> tuple[bytes, bytes]:
+    '''
+    Tách public key và nội dung zip từ tệp CRX (phiên bản 2 hoặc 3).
+
+    Returns:
+        tuple[bytes, bytes]: (public_key, zip_bytes)
+    '''
+    if data[:4] != b'Cr24':
+        raise ValueError('Không phải tệp CRX (thiếu magic Cr24)')
+    version = struct.unpack('<I', data[4:8])[0]
+
+    if version == 2:
+        key_length, signature_length = struct.unpack('<II', data[8:16])
+        public_key = data[16:16 + key_length]
+        return public_key, data[16 + key_length + signature_length:]
+
+    if version == 3:
+        header_length = struct.unpack('<I', data[8:12])[0]
+        header = data[12:12 + header_length]
+        zip_bytes = data[12 + header_length:]
+
+        crx_id = None
+        public_keys = []
+        for field_number, value in _proto_fields(header):
+            if field_number == 10000:  # signed_header_data -> SignedData.crx_id
+                crx_id = dict(_proto_fields(value)).get(1)
+            elif field_number in (2, 3):  # sha256_with_rsa / sha256_with_ecdsa -> AsymmetricKeyProof.public_key
+                key = dict(_proto_fields(value)).get(1)
+                if key:
+                    public_keys.append(key)
+
+        for key in public_keys:
+            if crx_id is None or hashlib.sha256(key).digest()[:16] == crx_id:
+                return key, zip_bytes
+        raise ValueError('Không tìm thấy public key khớp với crx_id trong header CRX3')
+
+    raise ValueError(f'Phiên bản CRX {version} không hỗ trợ')
+
+
+class ExtensionCache:
+    def __init__(self, cache_dir: Path | str = None) -> None:
+        '''
+        Bộ nhớ đệm extension đã giải nén. Mỗi tệp CRX chỉ giải nén một lần theo hash nội dung,
+        sau đó được nạp bằng `--load-extension` thay vì nhúng cả tệp CRX vào capabilities mỗi lần mở trình duyệt.
+
+        Args:
+            cache_dir (Path | str, option): Thư mục đệm. Mặc định là `extensions/.cache` cạnh tệp mã nguồn.
+        '''
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(__file__).parent / 'extensions' / '.cache'
+        self._lock = threading.Lock()
+
+    def unpack(self, crx_path: Path | str, expected_id: str = None) -> tuple[Path, str]:
+        '''
+        Giải nén CRX vào thư mục đệm (nếu chưa có) và trả về thư mục cùng ID extension.
+
+        Args:
+            crx_path (Path | str): Đường dẫn tệp CRX.
+            expected_id (str, option): ID extension mong đợi. Quăng `ValueError` nếu không khớp.
+
+        Returns:
+            tuple[Path, str]: (thư mục extension đã giải nén, ID extension)
+
+        Quăng `ValueError` nếu tệp CRX hỏng (header, zip hoặc manifest không đọc được).
+
+        Mô tả:
+            - Thư mục đệm đặt tên theo sha256 của tệp CRX nên tự động làm mới khi CRX thay đổi; bản cũ bị xóa.
+            - Public key của CRX được ghi vào `manifest.json` (`key`) để bản giải nén giữ nguyên ID extension.
+        '''
+        crx_path = Path(crx_path)
+        data = crx_path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        target = self.cache_dir / f'{crx_path.stem}-{digest}'
+        marker = target / '.extension_id'
+
+        with self._lock:
+            if marker.exists():
+                extension_id = marker.read_text().strip()
+            else:
+                tmp_dir = self.cache_dir / f'.tmp-{crx_path.stem}-{digest}'
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                try:
+                    public_key, zip_bytes = parse_crx(data)
+                    extension_id = extension_id_from_key(public_key)
+                    with zipfile.ZipFile(BytesIO(zip_bytes)) as archive:
+                        archive.extractall(tmp_dir)
+
+                    manifest_path = tmp_dir / 'manifest.json'
+                    manifest = json.loads(manifest_path.read_text(encoding='utf-8-sig'))
+                    manifest['key'] = base64.b64encode(public_key).decode()
+                    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+                    (tmp_dir / '.extension_id').write_text(extension_id)
+                except (ValueError, zipfile.BadZipFile, struct.error, IndexError, KeyError, OSError) as e:
+                    # CRX bị cắt ngắn/hỏng: báo như lỗi định dạng để người gọi nhúng nguyên tệp CRX
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise ValueError(f'{crx_path.name} hỏng: {e}') from e
+
+                shutil.rmtree(target, ignore_errors=True)
+                tmp_dir.rename(target)
+
+                # Xóa các bản giải nén cũ của cùng tệp CRX (đúng dạng `<stem>-<16 hex>`, không đụng CRX khác cùng tiền tố)
+                pattern = re.compile(rf'^{re.escape(crx_path.stem)}-[0-9a-f]{{16}}$')
+                for old in self.cache_dir.iterdir():
+                    if old != target and old.is_dir() and pattern.match(old.name):
+                        shutil.rmtree(old, ignore_errors=True)
+                Utility.logger(message=f'Giải nén {crx_path.name} vào {target} (id={extension_id})')
+
+        if expected_id and extension_id != expected_id:
+            raise ValueError(f'ID extension của {crx_path.name} là {extension_id}, mong đợi {expected_id}')
+        return target, extension_id
@@ -1,47 +1,210 @@
 
+import time
 import random
+from math import ceil
 from pathlib import Path
+from dataclasses import dataclass, field
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
+from action_plan import ActionPlan, Step
 from browser_automation import BrowserManager, Node
+from rpc_client import CHAIN, WEI
+from run_journal import JOURNAL
+from task_schedule import SCHEDULE, TaskRule
+from profile_source import ProfileSource, WALLET_PIN
+from selector_registry import SelectorRegistry
+from tracing import TRACER
 from utils import Utility
 
+SELECTORS = SelectorRegistry()
+SELECTORS.register('legacy_wallet',
+    (By.XPATH, '//p[text()="Legacy Wallet"]'),
+    (By.XPATH, '//*[normalize-space()="Legacy Wallet"]'))
+SELECTORS.register('send_button',
+    (By.XPATH, '//button[p[text()="Send"]]'),
+    (By.XPATH, '//button[normalize-space()="Send"]'))
+SELECTORS.register('token_eth',
+    (By.XPATH, '//div[p[text()="ETH"]]'),
+    (By.XPATH, '//*[normalize-space()="ETH"]/parent::div'))
+SELECTORS.register('recipient_smart_wallet',
+    (By.XPATH, '//div[text()="Account 1 (Smart Wallet)"]'),
+    (By.XPATH, '//div[contains(text(), "(Smart Wallet)")]'))
+SELECTORS.register('amount_input',
+    (By.CSS_SELECTOR, 'input[type="text"]'),
+    (By.CSS_SELECTOR, 'input[inputmode="decimal"]'))
+SELECTORS.register('next_button',
+    (By.XPATH, '//button[text()="Next"]'),
+    (By.XPATH, '//button[normalize-space()="Next"]'))
+SELECTORS.register('confirm_button',
+    (By.XPATH, '//button[text()="Confirm"]'),
+    (By.XPATH, '//button[normalize-space()="Confirm"]'))
+SELECTORS.register('claim_button',
+    (By.XPATH, '//button[text()="Claim"]'),
+    (By.XPATH, '//button[normalize-space()="Claim"]'))
+SELECTORS.register('claimed_label',
+    (By.XPATH, '//p[text()="Claimed"]'),
+    (By.XPATH, '//*[normalize-space()="Claimed"]'))
+SELECTORS.register('faucet_address_input',
+    (By.CSS_SELECTOR, 'input[id="mat-input-0"]'),
+    (By.CSS_SELECTOR, 'input[matinput]'))
+SELECTORS.register('faucet_submit',
+    (By.XPATH, '//button[span[contains(text(), "Sepolia ETH")]]'),
+    (By.XPATH, '//button[contains(normalize-space(), "Sepolia ETH")]'))
+SELECTORS.register('send_error',
+    (By.XPATH, '//p[contains(text(), "failed")]'),
+    (By.XPATH, '//*[contains(@class, "error")]'))
+
+
+@dataclass
+class TransferResult:
+    '''
+    Kết quả một giao dịch trong `HaHaWallet.send_batch`.
+
+    Attributes:
+        index (int): Thứ tự giao dịch trong lô (tính từ 0).
+        amount (str): Số ETH.
+        recipient (str | None): Tên người nhận hiển thị trên ví, None là 'Account 1 (Smart Wallet)'.
+        success (bool): True nếu đã bấm Confirm và ví không báo lỗi.
+        confirmed (bool | None): True nếu sau Confirm ví quay về một màn hình đã biết, False nếu ví báo lỗi,
+            None nếu không nhận ra màn hình (coi như đã gửi, giao dịch kế tiếp điều hướng lại).
+        attempts (int): Số lần chạy kế hoạch gửi.
+        renavigated (int): Số lần phải mở lại home.html.
+        duration (float): Thời gian (giây).
+    '''
+    index: int
+    amount: str
+    recipient: str = None
+    success: bool = False
+    confirmed: bool = None
+    attempts: int = 0
+    renavigated: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class BatchResult:
+    '''
+    Kết quả `HaHaWallet.send_batch`. Dùng trực tiếp như bool (True khi mọi giao dịch thành công).
+
+    Attributes:
+        times (int): Số giao dịch của lô.
+        transfers (list[TransferResult]): Kết quả từng giao dịch đã chạy (lô dừng ở giao dịch lỗi đầu tiên).
+        duration (float): Tổng thời gian (giây).
+    '''
+    times: int
+    transfers: list = field(default_factory=list)
+    duration: float = 0.0
+
+    @property
+    def sent(self) -> int:
+        return sum(1 for transfer in self.transfers if transfer.success)
+
+    def __bool__(self):
+        return self.sent == self.times
+
+
 class HaHaWallet:
+    EXTENSION_ID = 'andhndehpcjpmneneealacgnmealilal'
+    FAUCET_URL = 'https://cloud.google.com/application/web3/faucet/ethereum/sepolia'
+    SEND_TIMES = 10
+    RPC_URL = 'https://ethereum-sepolia-rpc.publicnode.com'
+    MAX_SEND_ETH = 0.001  # Số ETH tối đa của một lần send ngẫu nhiên
+    SEND_GAS = 60000  # Gas ước lượng (dư) cho một lần send, dùng khi kiểm tra số dư trước khi chạy
+    FAUCET_ETH = 0.05
+    VERIFY_TIMEOUT = 30  # Thời gian chờ các giao dịch vừa gửi được xác nhận on-chain (giây)
+
+    # Faucet: cooldown 24h từ lần nhận trước; check-in và quest send làm mới lúc 00:00 UTC
+    TASK_RULES = [
+        TaskRule('faucet_eth', period=24 * 3600),
+        TaskRule('check_in', reset_hour=0),
+        TaskRule('send_eth', quota=SEND_TIMES, reset_hour=0),
+    ]
+
+    UNLOCK_PLAN = ActionPlan('unlock ví không thành công', [
+        Step('input', By.CSS_SELECTOR, "input[type='password']", text='{pin}'),
+        Step('click', By.XPATH, "//button[text()='Unlock']", retries=1),
+    ])
+    CHECK_IN_PLAN = ActionPlan('Check-in gặp lỗi hoặc đã thực hiện', [
+        Step('click', selector='claim_button'),
+    ])
+    SEND_ETH_PLAN = ActionPlan('Send ETH thất bại', [
+        Step('click', selector='legacy_wallet', retries=1),
+        Step('click', selector='send_button', retries=1),
+        Step('click', selector='token_eth', retries=1),
+        Step('click', selector='recipient_smart_wallet', retries=1),
+        Step('input', selector='amount_input', text='{amount}', retries=1),
+        Step('click', selector='next_button', retries=1),
+        Step('click', selector='confirm_button', retries=1),
+    ])
+    # Như SEND_ETH_PLAN nhưng chọn người nhận theo tên hiển thị `{recipient}`
+    SEND_TO_PLAN = ActionPlan('Send ETH thất bại', [
+        *SEND_ETH_PLAN.steps[:3],
+        Step('click', By.XPATH, '//div[text()={recipient}]', retries=1, template=True),
+        *SEND_ETH_PLAN.steps[4:],
+    ])
+    # Màn hình ví quay về sau khi Confirm -> bước bắt đầu của giao dịch kế tiếp trong kế hoạch gửi
+    AFTER_CONFIRM = [('legacy_wallet', 0), ('send_button', 1), ('token_eth', 2)]
+    CONFIRM_TIMEOUT = 15
+
     def __init__(self, driver: webdriver.Chrome, profile) -> None:
         self.node = Node(driver, profile['profile'])
+        self.node.selectors = SELECTORS
         self.driver = driver
         self.profile_name = profile['profile']
         self.pin = profile['pin']
         self.wallet = profile['wallet']
-        self.url ='chrome-extension://andhndehpcjpmneneealacgnmealilal'
+        self.url = f'chrome-extension://{self.EXTENSION_ID}'
+        self._send_start = None  # Bước bắt đầu của giao dịch kế tiếp, None là cần mở lại home.html
+        self.last_batch = None  # BatchResult của lần send_batch gần nhất
+        self.onchain = None  # Kết quả kiểm tra on-chain sau khi chạy (verify_onchain)
     
-    def faucet_eth(self):
+    def faucet_eth(self) -> bool:
         Utility.wait_time(10)
-        self.node.go_to('https://cloud.google.com/application/web3/faucet/ethereum/sepolia')
-        self.node.find_and_input(By.CSS_SELECTOR, 'input[id="mat-input-0"]', self.wallet, 0, 5)
-        if self.node.find_and_click(By.XPATH, '//button[span[contains(text(), "Sepolia ETH")]]'):
-            Utility.wait_time(8)
-        
+        try:
+            self.node.go_to(self.FAUCET_URL, ready='interactive')
+            by, value = self.node.locate('faucet_address_input')
+            if by is None:
+                return False
+            self.node.find_and_input(by, value, self.wallet, 0, 5, mode='js')
+            by, value = self.node.locate('faucet_submit')
+            if by and self.node.find_and_click(by, value):
+                Utility.wait_time(8)
+                return True
+            return False
+        finally:
+            # Các trang ví mở bằng driver.get (không qua go_to/match_policy): bỏ danh sách chặn của trang faucet
+            self.node.set_resource_policy(None)
+
     def unlock(self) -> bool:
         self.driver.get(f'{self.url}/home.html')
-        self.node.find_and_click(By.XPATH, '//button[text()="Reload"]', False)
-        self.driver.get(f'{self.url}/home.html')
-        actions = [
-            (self.node.find_and_input, By.CSS_SELECTOR, "input[type='password']", self.pin),
-            (self.node.find_and_click, By.XPATH, "//button[text()='Unlock']")
+        # Màn hình khóa, nút Reload hoặc ví đã mở khóa - xác định trong một lần chờ
+        screens = [
+            (By.CSS_SELECTOR, "input[type='password']"),
+            (By.XPATH, '//button[text()="Reload"]'),
+            (By.XPATH, '//p[text()="Legacy Wallet"]'),
         ]
-        return self.node.execute_chain(actions=actions, message_error='unlock ví không thành công')
+        index, element = self.node.wait_for_any(screens)
+        if index == 2:
+            self.node.log('Ví đã mở khóa')
+            return True
+        if index == 1:
+            element.click()
+            self.driver.get(f'{self.url}/home.html')
+        return self.UNLOCK_PLAN.run(self.node, pin=self.pin).success
 
     def check_in(self) -> bool:
         Utility.wait_time(5)
         self.driver.get(f'{self.url}/home.html#quests')
-        actions = [
-            (self.node.find_and_click, By.XPATH, '//button[text()="Claim"]')
-        ]
-        
-        if self.node.execute_chain(actions=actions, message_error='Check-in gặp lỗi hoặc đã thực hiện'):
+
+        # Đã check-in (bằng tay hoặc ở máy khác) thì coi như xong để lịch ghi nhận, không chờ nút Claim đến timeout
+        index, _ = self.node.wait_for_any([SELECTORS.ranked('claim_button')[0], SELECTORS.ranked('claimed_label')[0]])
+        if index == 1:
+            self.node.log('Đã check-in trước đó')
+            return True
+
+        if self.CHECK_IN_PLAN.run(self.node):
             self.node.log("check-in thành công")
             return True
         
@@ -49,53 +212,268 @@ class HaHaWallet:
     
     def switch_chain(self):
         self.driver.get(f'{self.url}/home.html')
-        text_chain = self.node.get_text(By.XPATH, '//div[div[div[div[contains(text(), "Account")]]]]//div[1]')
-        if text_chain == "Sepolia":
+        chain_selector = '//div[div[div[div[contains(text(), "Account")]]]]//div[1]'
+        index, _ = self.node.wait_for_any([
+            (By.XPATH, f'({chain_selector})[1][normalize-space()="Sepolia"]'),
+            (By.XPATH, chain_selector),
+        ])
+        if index == 0:
             return True
-        
-        if text_chain != "Sepolia":
-            self.node.find_and_click(By.XPATH, '//div[div[div[div[contains(text(), "Account")]]]]//div[1]')
-            return self.node.find_and_click(By.XPATH, '//p[text()="Sepolia (ETH)"]')
 
-    def send_eth(self) -> bool:
-        random_eth = str(round(random.uniform(0.00001, 0.001), 6))
-        self.driver.get(f'{self.url}/home.html')
-        
-        actions = [
-            (self.node.find_and_click, By.XPATH, '//p[text()="Legacy Wallet"]'),
-            (self.node.find_and_click, By.XPATH, '//button[p[text()="Send"]]'),
-            (self.node.find_and_click, By.XPATH, '//div[p[text()="ETH"]]'),
-            (self.node.find_and_click, By.XPATH, '//div[text()="Account 1 (Smart Wallet)"]'),
-            (self.node.find_and_input, By.CSS_SELECTOR, 'input[type="text"]', random_eth),
-            (self.node.find_and_click, By.XPATH, '//button[text()="Next"]'),
-            (self.node.find_and_click, By.XPATH, '//button[text()="Confirm"]'),
-        ]
-        if not self.node.execute_chain(actions=actions, message_error='Send ETH thất bại. Thử lại lần nữa'):
-            self.driver.get(f'{self.url}/home.html')
-            return self.node.execute_chain(actions=actions, message_error='Send ETH thất bại')
-        
+        self.node.find_and_click(By.XPATH, chain_selector)
+        return self.node.find_and_click(By.XPATH, '//p[text()="Sepolia (ETH)"]')
+
+    @staticmethod
+    def _random_amount() -> str:
+        return str(round(random.uniform(0.00001, HaHaWallet.MAX_SEND_ETH), 6))
+
+    def _confirm_landing(self) -> tuple:
+        '''
+        Chờ màn hình sau khi bấm Confirm.
+
+        Returns:
+            tuple: (confirmed, bước bắt đầu của giao dịch kế tiếp hoặc None nếu cần điều hướng lại).
+        '''
+        names = ['send_error'] + [name for name, _ in self.AFTER_CONFIRM]
+        index, _ = self.node.wait_for_any([SELECTORS.ranked(name)[0] for name in names], self.CONFIRM_TIMEOUT)
+        if index is None:
+            return None, None
+        if index == 0:
+            self.node.log('Lỗi - Ví báo giao dịch thất bại', 'ERROR')
+            return False, None
+        return True, self.AFTER_CONFIRM[index - 1][1]
+
+    def _send_transfer(self, transfer: TransferResult, retries: int = 1) -> TransferResult:
+        '''
+        Gửi một giao dịch, bắt đầu từ màn hình hiện tại nếu giao dịch trước để lại ví trong luồng gửi.
+        Bước lỗi được chạy tiếp một lần; nếu vẫn lỗi thì mở lại home.html và làm lại từ đầu (tối đa `retries` lần).
+        '''
+        start = time.perf_counter()
+        if transfer.recipient:
+            plan, params = self.SEND_TO_PLAN, {'amount': transfer.amount, 'recipient': transfer.recipient}
+        else:
+            plan, params = self.SEND_ETH_PLAN, {'amount': transfer.amount}
+
+        for attempt in range(retries + 1):
+            if self._send_start is None:
+                self.driver.get(f'{self.url}/home.html')
+                self._send_start = 0
+                transfer.renavigated += 1
+            elif attempt == 0 and self._send_start:
+                self.node.log(f'Ở lại luồng gửi, bắt đầu từ bước {self._send_start}')
+
+            transfer.attempts += 1
+            result = plan.run(self.node, self._send_start, **params)
+            if not result:
+                self.node.log('Send ETH thất bại. Thử lại từ bước lỗi', 'WARNING')
+                result = plan.resume(self.node, result, **params)
+            self._send_start = None
+            if not result:
+                self.node.log('Send ETH thất bại. Thử lại từ đầu', 'WARNING')
+                continue
+
+            transfer.confirmed, self._send_start = self._confirm_landing()
+            if transfer.confirmed is False:
+                continue
+            transfer.success = True
+            break
+
+        transfer.duration = time.perf_counter() - start
+        return transfer
+
+    def send_eth(self, amount: str = None, recipient: str = None) -> bool:
+        '''
+        Gửi một giao dịch ETH (mặc định số lượng ngẫu nhiên tới Account 1 (Smart Wallet)).
+        '''
+        transfer = TransferResult(0, amount or self._random_amount(), recipient)
+        return self._send_transfer(transfer).success
+
+    def send_batch(self, transfers: list, start: int = 0) -> BatchResult:
+        '''
+        Gửi nhiều giao dịch liên tiếp mà không mở lại ví giữa các giao dịch nếu giao diện cho phép.
+
+        Args:
+            transfers (list): Mỗi phần tử là số ETH (str) hoặc dict {'amount': str, 'recipient': str}.
+                `recipient` là tên người nhận hiển thị trên ví, mặc định 'Account 1 (Smart Wallet)'.
+            start (int, option): Số lần send đã hoàn thành trước lô này, dùng làm `iteration` trong nhật ký.
+
+        Returns:
+            BatchResult: Kết quả từng giao dịch (`confirmed`, `attempts`, `duration`), `sent`/`times` và tổng thời gian.
+
+        Mô tả:
+            - Sau Confirm, màn hình ví quay về (`AFTER_CONFIRM`) quyết định bước bắt đầu của giao dịch kế tiếp,
+              ví dụ về Legacy Wallet thì bỏ qua việc mở lại home.html.
+            - Chỉ mở lại home.html khi giao dịch lỗi hoặc không nhận ra màn hình sau Confirm.
+            - Mỗi giao dịch là một span 'send_eth' và một đơn vị trong nhật ký; giao dịch thành công được ghi vào lịch.
+            - Lô dừng ở giao dịch lỗi đầu tiên.
+
+        Ví dụ:
+            result = wallet.send_batch(['0.0001', {'amount': '0.0002', 'recipient': 'Account 2'}])
+            print(f'{result.sent}/{result.times}', [t.confirmed for t in result.transfers])
+        '''
+        batch = BatchResult(len(transfers))
+        begin = time.perf_counter()
+        for index, item in enumerate(transfers):
+            if isinstance(item, dict):
+                transfer = TransferResult(index, str(item['amount']), item.get('recipient'))
+            else:
+                transfer = TransferResult(index, str(item))
+
+            with self._stage('send_eth') as span, self._unit('send_eth', start + index) as unit:
+                self._send_transfer(transfer)
+                unit.success = transfer.success
+                span.outcome = 'ok' if transfer.success else 'fail'
+            batch.transfers.append(transfer)
+            if not transfer.success:
+                break
+            SCHEDULE.record(self.profile_name, 'send_eth')
+            self.node.log(f'Send ETH {start + index + 1}: {transfer.amount} ETH trong {transfer.duration:.1f}s'
+                          f"{'' if transfer.confirmed else ' (chưa xác nhận được màn hình sau Confirm)'}")
+
+        batch.duration = time.perf_counter() - begin
+        self.last_batch = batch
+        self.node.log(f'Send ETH {batch.sent}/{batch.times} trong {batch.duration:.1f}s, '
+                      f'mở lại ví {sum(transfer.renavigated for transfer in batch.transfers)} lần')
+        return batch
+
+    def _affordable(self, state: dict, count: int) -> bool:
+        '''
+        Số dư on-chain có đủ cho `count` lần send (số ETH tối đa + gas ước lượng) hay không.
+        '''
+        required = count * (int(self.MAX_SEND_ETH * WEI) + self.SEND_GAS * (CHAIN.gas_price or 0))
+        return state['balance'] >= required
+
+    def verify_onchain(self, before: dict, faucet: bool = False) -> dict:
+        '''
+        So sánh trạng thái on-chain của ví sau khi chạy với trạng thái trước khi chạy (`before`).
+
+        Args:
+            before (dict): Trạng thái từ `CHAIN.snapshot` trước khi chạy.
+            faucet (bool): Faucet đã báo thành công trong lần chạy này.
+
+        Returns:
+            dict: {'expected', 'landed', 'pending', 'balance_delta', 'faucet_paid'} - số giao dịch UI báo thành công,
+                số giao dịch đã xác nhận (theo nonce), số giao dịch đang chờ, chênh lệch số dư (ETH),
+                faucet đã trả tiền hay chưa (None nếu không chạy faucet). None nếu không đọc được trạng thái.
+
+        Mô tả:
+            - `wallet` trong dữ liệu profile là địa chỉ Legacy Wallet (ví gửi ETH), nên nonce tăng một sau mỗi giao dịch.
+            - Chờ tối đa `VERIFY_TIMEOUT` giây để các giao dịch vừa gửi được xác nhận và, nếu chạy faucet,
+              để số dư tăng đủ ngưỡng faucet (faucet chuyển tiền sau khi trang báo thành công).
+        '''
+        transfers = [transfer for transfer in self.last_batch.transfers if transfer.success] if self.last_batch else []
+        expected = len(transfers)
+        sent = sum(int(float(transfer.amount) * WEI) for transfer in transfers)
+        after = None
+        faucet_paid = None
+        for attempt in range(max(1, ceil(self.VERIFY_TIMEOUT / 5))):
+            if attempt:
+                Utility.wait_time(5, True)
+            after = CHAIN.snapshot(self.wallet, refresh=True)
+            if after is None:
+                return None
+            landed = after['nonce'] - before['nonce']
+            if faucet:
+                # Cộng lại số ETH đã gửi và phí gas tối đa để tách phần faucet trả
+                spent = sent + landed * self.SEND_GAS * (CHAIN.gas_price or 0)
+                faucet_paid = after['balance'] - before['balance'] + spent >= int(self.FAUCET_ETH * WEI) // 2
+            if landed >= expected and faucet_paid is not False:
+                break
+
+        pending = after['pending'] - after['nonce']
+        delta = after['balance'] - before['balance']
+
+        self.onchain = {'expected': expected, 'landed': landed, 'pending': pending,
+                        'balance_delta': delta / WEI, 'faucet_paid': faucet_paid}
+        message = f'On-chain: {landed}/{expected} giao dịch đã xác nhận, {pending} đang chờ, số dư {delta / WEI:+.6f} ETH'
+        if faucet_paid is not None:
+            message += f", faucet {'đã trả' if faucet_paid else 'chưa trả'}"
+        if landed + pending < expected:
+            self.node.log(f'{message} - UI báo gửi {expected} giao dịch nhưng node chỉ thấy {landed + pending}', 'WARNING')
+        elif faucet_paid is False:
+            self.node.log(f'{message} sau {self.VERIFY_TIMEOUT}s', 'WARNING')
+        else:
+            self.node.log(message)
+        return self.onchain
+
+    def _stage(self, name: str):
+        return TRACER.span('stage', self.profile_name, name)
+
+    def _unit(self, task: str, iteration: int = 0):
+        return JOURNAL.unit(self.profile_name, task, iteration)
+
+    def _pending(self, task: str) -> bool:
+        if JOURNAL.done(self.profile_name, task):
+            self.node.log(f'Bỏ qua {task} - đã hoàn thành trong lần chạy này')
+            return False
+        if not SCHEDULE.is_due(self.profile_name, task):
+            self.node.log(f'Bỏ qua {task} - chưa đến hạn')
+            return False
         return True
 
     def _run_logic(self):
-        self.faucet_eth()
-        
+        # Trạng thái on-chain khi profile bắt đầu (đọc lại vì bản đọc trước của config_rpc có thể đã cũ), None nếu không bật RPC
+        before = CHAIN.snapshot(self.wallet, refresh=True)
+        faucet = False
+        if self._pending('faucet_eth'):
+            with self._stage('faucet_eth') as span, self._unit('faucet_eth') as unit:
+                unit.success = self.faucet_eth()
+                span.outcome = 'ok' if unit.success else 'fail'
+            if unit.success:
+                SCHEDULE.record(self.profile_name, 'faucet_eth')
+                faucet = True
+
+        times = self.SEND_TIMES
+        # Số lần send đã xong: theo lịch (trong ngày) nếu bật, nếu không thì theo nhật ký lần chạy
+        remaining = SCHEDULE.remaining(self.profile_name, 'send_eth')
+        i = times - remaining if remaining is not None else JOURNAL.completed(self.profile_name, 'send_eth')
+        if before and i < times and not self._affordable(before, times - i):
+            self.node.log(f"Bỏ qua send ETH - số dư {before['balance'] / WEI:.6f} ETH không đủ cho {times - i} lần gửi", 'WARNING')
+            # Ghi lần gửi kế tiếp là thất bại để profile chưa được coi là xong - chạy tiếp (resume) sau khi nạp thêm ETH
+            JOURNAL.finish(self.profile_name, 'send_eth', i, False, 'số dư không đủ')
+            times = i
+        check_in = self._pending('check_in')
+        if not check_in and i >= times:
+            self.node.log('Không còn tác vụ cần ví')
+            if before and faucet:
+                self.verify_onchain(before, faucet)
+            self.log_timing()
+            return
+
         Utility.wait_time(10)
-        if self.unlock():
-            self.check_in()
-            self.switch_chain()
-
-            i = 0
-            times = 10
-            for _ in range(times):
-                if self.send_eth():
-                    i += 1
-                    continue
-                else:
+        with self._stage('unlock') as span:
+            unlocked = self.unlock()
+            span.outcome = 'ok' if unlocked else 'fail'
+        if unlocked:
+            if check_in:
+                with self._stage('check_in') as span, self._unit('check_in') as unit:
+                    unit.success = self.check_in()
+                    span.outcome = 'ok' if unit.success else 'fail'
+                if unit.success:
+                    SCHEDULE.record(self.profile_name, 'check_in')
+
+            if i < times:
+                with self._stage('switch_chain') as span:
+                    span.outcome = 'ok' if self.switch_chain() else 'fail'
+                if i:
+                    self.node.log(f'Tiếp tục send ETH từ {i}/{times}')
+                # Gửi theo lô: ở lại luồng gửi giữa các giao dịch, chỉ mở lại ví khi lỗi
+                batch = self.send_batch([self._random_amount() for _ in range(i, times)], start=i)
+                i += batch.sent
+                if not batch:
                     self.node.stop(f'Send ETH thành công {i}/{times}')
+            if before:
+                self.verify_onchain(before, faucet)
             Utility.wait_time(5)
         else:
             self.node.stop('Unlock ví thất bại')
-        Utility.wait_time(5)    
+        Utility.wait_time(5)
+        self.log_timing()
+
+    def log_timing(self):
+        total = self.node.timing_report().get('_all')
+        if total:
+            self.node.log(f"{total['count']} hành động: trễ chủ đích {total['delay']:.1f}s, chờ thực tế {total['waited']:.1f}s")
         
 
 class Main:
@@ -104,7 +482,20 @@ class Main:
         self.driver = driver
 
     def _run(self):
-        HaHaWallet(self.driver, self.profile)._run_logic()
+        try:
+            HaHaWallet(self.driver, self.profile)._run_logic()
+        finally:
+            SELECTORS.save()
+            SCHEDULE.save()
+
+    @staticmethod
+    def configure(manager: BrowserManager):
+        '''
+        Cấu hình `BrowserManager` dùng cho HaHa Wallet. Dùng chung cho `__main__` và worker của `distributed.py`.
+        '''
+        manager.config_extension(
+            'HaHa-Wallet-Chrome-Web-Store.crx',
+            expected_ids={'HaHa-Wallet-Chrome-Web-Store.crx': HaHaWallet.EXTENSION_ID})
 
 
 if __name__ == '__main__':
@@ -114,30 +505,25 @@ if __name__ == '__main__':
         print(f"File {DATA_DIR} không tồn tại. Dừng mã.")
         exit()
 
-    PROFILES = []
-    num_parts = 3
-
-    with open(DATA_DIR, 'r') as file:
-        data = file.readlines()
-
-    for line in data:
-        parts = line.strip().split('|')
-
-        if len(parts) != num_parts:
-            print(f"Warning: Dữ liệu không hợp lệ - {line}")
-            continue
-
-        profile, wallet, pin, *_ = (parts + [None] * num_parts)[:num_parts]
-
-        PROFILES.append({
-            'profile': profile,
-            'wallet':wallet,
-            'pin': pin,
-        })
+    PROFILES = list(ProfileSource(DATA_DIR, WALLET_PIN))
 
     manager = BrowserManager(Main)
-    manager.config_extension('HaHa-Wallet-Chrome-Web-Store.crx')
+    Main.configure(manager)
+    # manager.config_pacing('ready', jitter=1, jitter_budget=20)
+    # manager.config_input_mode('typing')
+    # manager.config_tracing('traces.jsonl')
+    # manager.config_logging('INFO', log_dir='logs')
+    # from resource_policy import HEAVY_ASSETS
+    # manager.config_resource_policy(HEAVY_ASSETS, ['cloud.google.com'])
+    # manager.config_fleet('headless')
+    # manager.config_driver_pool(size=2)
+    # manager.config_maintenance(max_mb=500)
+    # manager.config_journal('run_journal.db', resume=True)
+    # manager.config_schedule(HaHaWallet.TASK_RULES)
+    # manager.config_rpc(HaHaWallet.RPC_URL, prefetch=[profile['wallet'] for profile in PROFILES])
+    # manager.config_prewarm(1, url=f'chrome-extension://{HaHaWallet.EXTENSION_ID}/home.html', min_free_mb=2048)
     # manager.run_browser(profile=PROFILES[0])
+    # manager.run_multi(ProfileSource(DATA_DIR, WALLET_PIN, ranges='1-100'), max_concurrent_profiles=4)
     manager.run_terminal(
         profiles=PROFILES,
         auto=False,
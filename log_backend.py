@@ -0,0 +1,124 @@
+import sys
+import queue
+import atexit
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from datetime import datetime
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40}
+
+
+class LogBackend:
+    # Số tệp log mở cùng lúc tối đa; tệp ít dùng nhất được đóng (mở lại ở chế độ append khi cần)
+    MAX_OPEN_FILES = 64
+
+    def __init__(self, level: str = 'INFO') -> None:
+        '''
+        Backend ghi log qua hàng đợi: luồng gọi chỉ đưa bản ghi vào queue, một luồng nền ghi ra
+        console (định dạng `[profile][func]: message`), tệp tổng hợp và tệp riêng cho từng profile.
+
+        Args:
+            level (str): Mức log tối thiểu: 'DEBUG' | 'INFO' | 'WARNING' | 'ERROR'.
+        '''
+        self.level = LEVELS[level]
+        self.log_dir = None
+        self._queue = queue.SimpleQueue()
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, level: str = None, log_dir: Path | str = None):
+        '''
+        Thay đổi mức log và/hoặc bật ghi tệp vào `log_dir` (`_all.log` và `<profile>.log`).
+        '''
+        if level:
+            self.level = LEVELS[level]
+        if log_dir:
+            self.flush()
+            with self._lock:
+                self._close_files()
+                self.log_dir = Path(log_dir)
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+
+    def enabled_for(self, level: str) -> bool:
+        return LEVELS.get(level, 20) >= self.level
+
+    def log(self, profile_name: str, func_name: str, message: str, level: str = 'INFO'):
+        '''
+        Đưa một bản ghi vào hàng đợi. Không làm gì nếu `level` thấp hơn mức log hiện tại.
+        '''
+        if LEVELS.get(level, 20) < self.level:
+            return
+        self._ensure_writer()
+        self._queue.put((datetime.now(), level, profile_name, func_name, message))
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, name='log-writer', daemon=True)
+                self._thread.start()
+
+    def _file(self, name: str):
+        file = self._files.get(name)
+        if file is None:
+            # Hàng nghìn profile: giữ tối đa MAX_OPEN_FILES tệp mở để không hết file descriptor
+            while len(self._files) >= self.MAX_OPEN_FILES:
+                self._files.popitem(last=False)[1].close()
+            file = open(self.log_dir / f'{name}.log', 'a', encoding='utf-8')
+            self._files[name] = file
+        else:
+            self._files.move_to_end(name)
+        return file
+
+    def _close_files(self):
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+    def _write(self, record):
+        if isinstance(record, threading.Event):
+            with self._lock:
+                sys.stdout.flush()
+                for file in self._files.values():
+                    file.flush()
+            record.set()
+            return
+
+        timestamp, level, profile_name, func_name, message = record
+        line = f'[{profile_name}][{func_name}]: {message}'
+        sys.stdout.write(line + '\n')
+
+        with self._lock:
+            if self.log_dir is None:
+                return
+            file_line = f'{timestamp:%Y-%m-%d %H:%M:%S.%f}'[:-3] + f' {level:<7} {line}\n'
+            self._file('_all').write(file_line)
+            self._file(profile_name).write(file_line)
+
+    def _writer(self):
+        while True:
+            record = self._queue.get()
+            try:
+                self._write(record)
+                # Flush khi hàng đợi rỗng thay vì sau mỗi dòng
+                if self._queue.empty():
+                    sys.stdout.flush()
+            except Exception as e:
+                sys.stderr.write(f'[log-writer] {e}\n')
+
+    def flush(self, timeout: float = 5):
+        '''
+        Chờ luồng nền ghi hết các bản ghi đang chờ.
+        '''
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+
+LOGGER = LogBackend()
+atexit.register(LOGGER.flush)
@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import errno
+import shutil
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from profile_maintenance import VOLATILE_PATHS, LOCK_FILES
+from utils import Utility
+
+try:
+    import fcntl
+except ImportError:  # Windows: không có reflink, dùng bản sao thưa
+    fcntl = None
+
+FICLONE = 0x40049409  # ioctl reflink của Linux (btrfs, xfs, bcachefs...)
+
+# Dữ liệu định danh: phiên đăng nhập, cookie, khóa ví/extension, mã hóa. Không được dùng chung giữa các bản sao
+IDENTITY_PATHS = [
+    'Default/Cookies',
+    'Default/Cookies-journal',
+    'Default/Login Data',
+    'Default/Login Data-journal',
+    'Default/Login Data For Account',
+    'Default/Login Data For Account-journal',
+    'Default/Web Data',
+    'Default/Web Data-journal',
+    'Default/Local Extension Settings',
+    'Default/Sync Extension Settings',
+    'Default/Sync Data',
+    'Default/IndexedDB',
+    'Default/Local Storage',
+    'Default/Session Storage',
+    'Default/Sessions',
+    'Default/Current Session',
+    'Default/Current Tabs',
+    'Default/Last Session',
+    'Default/Last Tabs',
+    'Default/Network Persistent State',
+    'Default/TransportSecurity',
+    'Default/Trust Tokens',
+    'Default/Trust Tokens-journal',
+    'Default/History',
+    'Default/History-journal',
+    'Default/GCM Store',
+    'Default/Accounts',
+]
+
+# Cây thư mục Chrome chỉ thay thế, không sửa tại chỗ: có thể dùng hardlink an toàn
+IMMUTABLE_PATHS = ['Default/Extensions']
+
+# Khóa JSON mang định danh trong `Local State` và `Default/Preferences`
+LOCAL_STATE_KEYS = ['os_crypt', 'user_experience_metrics', 'uninstall_metrics', 'variations_crash_streak']
+PREFERENCES_KEYS = ['account_info', 'account_tracker_service_last_update', 'gaia_cookie', 'google', 'signin', 'sync']
+
+
+class ProfileCloner:
+    def __init__(self, template_dir: Path | str, user_data_dir: Path | str = None) -> None:
+        '''
+        Tạo profile mới từ một user-data-dir mẫu (đã cài sẵn extension, cấu hình trình duyệt).
+
+        Args:
+            template_dir (Path | str): Thư mục profile mẫu, ví dụ `user_data/_template`.
+            user_data_dir (Path | str, option): Thư mục chứa các profile. Mặc định là `user_data` cạnh tệp mã nguồn.
+
+        Mô tả:
+            - Mỗi tệp được sao chép bằng reflink (copy-on-write) nếu hệ thống tệp hỗ trợ, nếu không thì sao chép thưa
+              (bỏ qua các khối toàn số 0). Thư mục extension đã cài (`IMMUTABLE_PATHS`) dùng hardlink.
+            - Không sao chép cache, khóa và dữ liệu định danh (`IDENTITY_PATHS`): bản sao không dùng chung cookie,
+              phiên đăng nhập hay dữ liệu ví.
+        '''
+        self.template_dir = Path(template_dir)
+        self.user_data_dir = Path(user_data_dir) if user_data_dir else Path(__file__).parent / 'user_data'
+        self.skip = {Path(relative) for relative in VOLATILE_PATHS + LOCK_FILES + IDENTITY_PATHS}
+        self.immutable = {Path(relative) for relative in IMMUTABLE_PATHS}
+        self._reflink = fcntl is not None
+        self._lock = threading.Lock()
+        self.stats = {'reflink': 0, 'hardlink': 0, 'copy': 0, 'bytes_copied': 0}
+
+        if not (self.template_dir / 'Default').is_dir() and not (self.template_dir / 'Local State').exists():
+            raise ValueError(f'{self.template_dir} không phải user-data-dir của Chrome')
+
+    def _count(self, mode: str, size: int = 0):
+        with self._lock:
+            self.stats[mode] += 1
+            self.stats['bytes_copied'] += size
+
+    def _try_reflink(self, src: Path, dst: Path) -> bool:
+        if not self._reflink:
+            return False
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            try:
+                fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+                return True
+            except OSError as e:
+                if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                    # Hệ thống tệp không hỗ trợ reflink - không thử lại cho các tệp sau
+                    self._reflink = False
+                    return False
+                raise
+
+    @staticmethod
+    def _sparse_copy(src: Path, dst: Path, block_size: int = 64 * 1024) -> int:
+        '''
+        Sao chép tệp, bỏ qua (không ghi) các khối toàn số 0. Trả về số byte thực sự ghi.
+        '''
+        zero = bytes(block_size)
+        written = 0
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            while True:
+                chunk = fin.read(block_size)
+                if not chunk:
+                    break
+                if chunk == zero[:len(chunk)]:
+                    fout.seek(len(chunk), os.SEEK_CUR)
+                else:
+                    fout.write(chunk)
+                    written += len(chunk)
+            fout.truncate()
+        return written
+
+    def _copy_file(self, src: Path, dst: Path, hardlink: bool):
+        if src.is_symlink():
+            os.symlink(os.readlink(src), dst)
+            return
+        if hardlink:
+            try:
+                os.link(src, dst)
+                self._count('hardlink')
+                return
+            except OSError:
+                pass
+        if self._try_reflink(src, dst):
+            self._count('reflink')
+        else:
+            self._count('copy', self._sparse_copy(src, dst))
+        shutil.copystat(src, dst)
+
+    def _copy_tree(self, target: Path):
+        for root, dirs, files in os.walk(self.template_dir):
+            root = Path(root)
+            relative_root = root.relative_to(self.template_dir)
+            hardlink = any(relative_root == path or path in relative_root.parents for path in self.immutable)
+
+            dirs[:] = [name for name in dirs if relative_root / name not in self.skip]
+            (target / relative_root).mkdir(parents=True, exist_ok=True)
+            for name in files:
+                if relative_root / name in self.skip:
+                    continue
+                self._copy_file(root / name, target / relative_root / name, hardlink)
+
+    @staticmethod
+    def _reset_json(path: Path, keys: list[str]):
+        if not path.exists():
+            return
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except ValueError:
+            path.unlink()
+            return
+        for key in keys:
+            data.pop(key, None)
+        # Ghi ra tệp mới để không sửa vào khối dùng chung của reflink/hardlink
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps(data), encoding='utf-8')
+        tmp_path.replace(path)
+
+    def clone(self, profile_name: str, overwrite: bool = False) -> Path:
+        '''
+        Tạo profile `profile_name` từ mẫu.
+
+        Args:
+            profile_name (str): Tên profile mới (thư mục con của `user_data_dir`).
+            overwrite (bool): Xóa profile cũ cùng tên nếu đã có. Mặc định là False (quăng `FileExistsError`).
+
+        Returns:
+            Path: Thư mục profile mới.
+        '''
+        target = self.user_data_dir / profile_name
+        if target.exists():
+            if not overwrite:
+                raise FileExistsError(f'{target} đã tồn tại')
+            shutil.rmtree(target)
+
+        tmp_target = self.user_data_dir / f'.tmp-{profile_name}'
+        shutil.rmtree(tmp_target, ignore_errors=True)
+        try:
+            self._copy_tree(tmp_target)
+            self._reset_json(tmp_target / 'Local State', LOCAL_STATE_KEYS)
+            self._reset_json(tmp_target / 'Default' / 'Preferences', PREFERENCES_KEYS)
+            self._reset_json(tmp_target / 'Default' / 'Secure Preferences', PREFERENCES_KEYS)
+            tmp_target.rename(target)
+        except Exception:
+            shutil.rmtree(tmp_target, ignore_errors=True)
+            raise
+        return target
+
+    def clone_many(self, profile_names: list[str], overwrite: bool = False, workers: int = 8) -> dict:
+        '''
+        Tạo nhiều profile song song. Profile đã tồn tại được bỏ qua khi `overwrite=False`.
+
+        Returns:
+            dict: {'created': [...], 'skipped': [...], 'failed': {name: lỗi}, 'duration', 'reflink', 'hardlink', 'copy', 'bytes_copied'}.
+        '''
+        self.user_data_dir.mkdir(parents=True, exist_ok=True)
+        result = {'created': [], 'skipped': [], 'failed': {}}
+        start = time.perf_counter()
+
+        def work(profile_name):
+            try:
+                self.clone(profile_name, overwrite)
+                return profile_name, None
+            except FileExistsError:
+                return profile_name, 'exists'
+            except Exception as e:
+                return profile_name, e
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for profile_name, error in executor.map(work, profile_names):
+                if error is None:
+                    result['created'].append(profile_name)
+                elif error == 'exists':
+                    result['skipped'].append(profile_name)
+                else:
+                    result['failed'][profile_name] = str(error)
+                    Utility.logger(profile_name, f'Lỗi khi tạo profile: {error}', 'ERROR')
+
+        result['duration'] = time.perf_counter() - start
+        result.update(self.stats)
+        return result
+
+
+if __name__ == '__main__':
+    # Tạo profile từ mẫu: python profile_clone.py user_data/_template --count 500 [--prefix profile_] [--start 1]
+    #                      python profile_clone.py user_data/_template --names profile_1 profile_2
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Tạo nhanh nhiều profile từ một user-data-dir mẫu (reflink/hardlink/sao chép thưa)')
+    parser.add_argument('template', help='Thư mục profile mẫu')
+    parser.add_argument('--user-data-dir', default=Path(__file__).parent / 'user_data')
+    parser.add_argument('--names', nargs='*', default=[], help='Tên các profile cần tạo')
+    parser.add_argument('--count', type=int, default=0, help='Số profile cần tạo theo mẫu tên <prefix><số>')
+    parser.add_argument('--prefix', default='profile_')
+    parser.add_argument('--start', type=int, default=1)
+    parser.add_argument('--overwrite', action='store_true', help='Ghi đè profile đã tồn tại')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    names = args.names + [f'{args.prefix}{index}' for index in range(args.start, args.start + args.count)]
+    if not names:
+        parser.error('Cần --names hoặc --count')
+
+    cloner = ProfileCloner(args.template, args.user_data_dir)
+    result = cloner.clone_many(names, args.overwrite, args.workers)
+    Utility.logger(message=f"Tạo {len(result['created'])} profile trong {result['duration']:.1f}s "
+                           f"(bỏ qua {len(result['skipped'])}, lỗi {len(result['failed'])}); "
+                           f"reflink {result['reflink']}, hardlink {result['hardlink']}, sao chép {result['copy']} tệp, "
+                           f"ghi {result['bytes_copied'] / 1048576:.1f} MB")
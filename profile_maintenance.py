@@ -0,0 +1,266 @@
+import os
+import socket
+import shutil
+from pathlib import Path, PurePosixPath
+
+from utils import Utility
+
+# Thư mục đệm Chrome tự tạo lại được - xóa không mất đăng nhập hay dữ liệu extension
+VOLATILE_PATHS = [
+    'Default/Cache',
+    'Default/Code Cache',
+    'Default/GPUCache',
+    'Default/DawnCache',
+    'Default/DawnGraphiteCache',
+    'Default/DawnWebGPUCache',
+    'Default/Service Worker/CacheStorage',
+    'Default/Service Worker/ScriptCache',
+    'Default/Shared Dictionary/cache',
+    'GrShaderCache',
+    'GraphiteDawnCache',
+    'ShaderCache',
+    'component_crx_cache',
+    'BrowserMetrics',
+    'Crashpad/completed',
+    'Crashpad/pending',
+    'Crashpad/reports',
+]
+
+# Chỉ xóa khi profile vẫn vượt giới hạn dung lượng sau khi đã dọn VOLATILE_PATHS
+SECONDARY_PATHS = [
+    'Default/History',
+    'Default/History-journal',
+    'Default/Favicons',
+    'Default/Favicons-journal',
+    'Default/Top Sites',
+    'Default/Top Sites-journal',
+    'Default/Visited Links',
+    'Default/Network Action Predictor',
+    'Default/Network Action Predictor-journal',
+    'OptGuideOnDeviceModel',
+    'optimization_guide_model_store',
+]
+
+# Không bao giờ xóa: đăng nhập, cookie, ví (Local Extension Settings / IndexedDB), extension đã cài
+PROTECTED_PATHS = [
+    'Default/Cookies',
+    'Default/Cookies-journal',
+    'Default/Login Data',
+    'Default/Local Extension Settings',
+    'Default/Extension State',
+    'Default/Extensions',
+    'Default/IndexedDB',
+    'Default/Local Storage',
+    'Default/Preferences',
+    'Local State',
+]
+
+LOCK_FILES = ['SingletonLock', 'SingletonCookie', 'SingletonSocket']
+
+
+def dir_size(path: Path) -> int:
+    '''
+    Tổng số byte thực chiếm trên đĩa của `path` (tệp hoặc thư mục), bỏ qua symlink.
+    '''
+    if path.is_symlink():
+        return 0
+    if path.is_file():
+        stat = path.stat()
+        return getattr(stat, 'st_blocks', 0) * 512 or stat.st_size
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file = Path(root) / name
+            try:
+                if not file.is_symlink():
+                    stat = file.stat()
+                    total += getattr(stat, 'st_blocks', 0) * 512 or stat.st_size
+            except OSError:
+                pass
+    return total
+
+
+def lock_owner(profile_dir: Path) -> tuple[str, int] | None:
+    '''
+    Đọc chủ sở hữu `SingletonLock` (symlink trỏ tới `<hostname>-<pid>`).
+
+    Returns:
+        tuple[str, int] | None: (hostname, pid) hoặc None nếu không có khóa/không đọc được.
+    '''
+    lock = profile_dir / 'SingletonLock'
+    if not lock.is_symlink():
+        return None
+    target = os.readlink(lock)
+    hostname, _, pid = target.rpartition('-')
+    return (hostname, int(pid)) if pid.isdigit() else None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_locked(profile_dir: Path) -> bool:
+    '''
+    True nếu profile đang được một Chrome còn sống trên máy này sử dụng.
+    Khóa của máy khác (thư mục dùng chung) được xem là đang dùng.
+    '''
+    owner = lock_owner(profile_dir)
+    if owner is None:
+        return False
+    hostname, pid = owner
+    if hostname != socket.gethostname():
+        return True
+    return _pid_alive(pid)
+
+
+def is_protected(relative: str) -> bool:
+    '''
+    True nếu đường dẫn `relative` (tính từ thư mục profile) trùng, nằm trong hoặc chứa một mục của `PROTECTED_PATHS`.
+    '''
+    parts = PurePosixPath(relative).parts
+    for protected in PROTECTED_PATHS:
+        protected = PurePosixPath(protected).parts
+        common = min(len(parts), len(protected))
+        if parts[:common] == protected[:common]:
+            return True
+    return False
+
+
+def _remove(profile_dir: Path, relative: str, dry_run: bool) -> int:
+    if is_protected(relative):
+        Utility.logger(profile_dir.name, f'Bỏ qua {relative} - thuộc PROTECTED_PATHS', 'WARNING')
+        return 0
+    path = profile_dir / relative
+    if not path.exists() and not path.is_symlink():
+        return 0
+    size = dir_size(path)
+    if not dry_run:
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+    return size
+
+
+def clear_stale_locks(profile_dir: Path, dry_run: bool = False) -> bool:
+    '''
+    Xóa `SingletonLock`/`SingletonCookie`/`SingletonSocket` do Chrome bị tắt đột ngột để lại.
+
+    Returns:
+        bool: True nếu có khóa cũ bị xóa.
+    '''
+    if is_locked(profile_dir):
+        return False
+    cleared = False
+    for name in LOCK_FILES:
+        path = profile_dir / name
+        if path.exists() or path.is_symlink():
+            if not dry_run:
+                path.unlink(missing_ok=True)
+            cleared = True
+    return cleared
+
+
+def maintain_profile(profile_dir: Path | str, max_mb: float = None, prune_cache: bool = True, dry_run: bool = False) -> dict:
+    '''
+    Bảo trì một thư mục user-data-dir.
+
+    Args:
+        profile_dir (Path | str): Thư mục profile, ví dụ `user_data/profile_1`.
+        max_mb (float, option): Giới hạn dung lượng (MB). Vượt giới hạn thì dọn thêm `SECONDARY_PATHS`.
+        prune_cache (bool): Dọn `VOLATILE_PATHS`. False thì chỉ dọn khi vượt `max_mb`.
+        dry_run (bool): Chỉ tính toán, không xóa.
+
+    Returns:
+        dict: {'profile', 'skipped', 'locks_cleared', 'before', 'after', 'reclaimed', 'over_budget'} - kích thước tính bằng byte.
+
+    Mô tả:
+        - Profile đang mở (khóa còn sống) được bỏ qua.
+        - Không bao giờ xóa `PROTECTED_PATHS` (đăng nhập, cookie, dữ liệu ví và extension): mọi đường dẫn trùng,
+          nằm trong hoặc chứa một mục được bảo vệ đều bị bỏ qua (`is_protected`).
+    '''
+    profile_dir = Path(profile_dir)
+    result = {'profile': profile_dir.name, 'skipped': False, 'locks_cleared': False,
+              'before': 0, 'after': 0, 'reclaimed': 0, 'over_budget': False}
+
+    if is_locked(profile_dir):
+        result['skipped'] = True
+        return result
+
+    result['locks_cleared'] = clear_stale_locks(profile_dir, dry_run)
+    before = dir_size(profile_dir)
+    result['before'] = before
+    budget = max_mb * 1024 * 1024 if max_mb else None
+
+    reclaimed = 0
+    if prune_cache or (budget and before > budget):
+        for relative in VOLATILE_PATHS:
+            reclaimed += _remove(profile_dir, relative, dry_run)
+
+    if budget and before - reclaimed > budget:
+        for relative in SECONDARY_PATHS:
+            if before - reclaimed <= budget:
+                break
+            reclaimed += _remove(profile_dir, relative, dry_run)
+
+    result['reclaimed'] = reclaimed
+    result['after'] = before - reclaimed
+    result['over_budget'] = bool(budget and result['after'] > budget)
+    return result
+
+
+def maintain_all(user_data_dir: Path | str, profiles: list[str] = None, max_mb: float = None,
+                 prune_cache: bool = True, dry_run: bool = False) -> list[dict]:
+    '''
+    Bảo trì mọi profile trong `user_data_dir` (hoặc chỉ các profile trong `profiles`) và ghi log từng profile.
+
+    Returns:
+        list[dict]: Kết quả `maintain_profile` của từng profile.
+    '''
+    user_data_dir = Path(user_data_dir)
+    if profiles:
+        profile_dirs = [user_data_dir / name for name in profiles]
+    else:
+        profile_dirs = sorted(path for path in user_data_dir.iterdir() if path.is_dir()) if user_data_dir.exists() else []
+
+    results = []
+    for profile_dir in profile_dirs:
+        if not profile_dir.is_dir():
+            Utility.logger(profile_dir.name, f'Không tìm thấy {profile_dir}')
+            continue
+        result = maintain_profile(profile_dir, max_mb, prune_cache, dry_run)
+        results.append(result)
+        if result['skipped']:
+            Utility.logger(result['profile'], 'Đang mở - bỏ qua')
+            continue
+        message = f"{result['before'] / 1048576:.0f} MB -> {result['after'] / 1048576:.0f} MB (giải phóng {result['reclaimed'] / 1048576:.1f} MB)"
+        if result['locks_cleared']:
+            message += ', đã xóa khóa cũ'
+        if result['over_budget']:
+            message += f', vẫn vượt giới hạn {max_mb} MB'
+        Utility.logger(result['profile'], message)
+
+    total = sum(result['reclaimed'] for result in results)
+    Utility.logger(message=f"{'[dry-run] ' if dry_run else ''}Tổng giải phóng {total / 1048576:.1f} MB trên {len(results)} profile")
+    return results
+
+
+if __name__ == '__main__':
+    # Dọn user_data: python profile_maintenance.py [--max-mb 500] [--keep-cache] [--dry-run] [profile ...]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Dọn cache, khóa cũ và giới hạn dung lượng các profile trong user_data')
+    parser.add_argument('profiles', nargs='*', help='Tên profile, bỏ trống là tất cả')
+    parser.add_argument('--user-data-dir', default=Path(__file__).parent / 'user_data')
+    parser.add_argument('--max-mb', type=float, default=None, help='Giới hạn dung lượng mỗi profile (MB)')
+    parser.add_argument('--keep-cache', action='store_true', help='Chỉ dọn cache khi vượt giới hạn')
+    parser.add_argument('--dry-run', action='store_true', help='Chỉ báo cáo, không xóa')
+    args = parser.parse_args()
+
+    maintain_all(args.user_data_dir, args.profiles, args.max_mb, not args.keep_cache, args.dry_run)
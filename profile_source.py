@@ -0,0 +1,252 @@
+import re
+import csv
+import sys
+import json
+from pathlib import Path
+from fnmatch import fnmatch
+
+from utils import Utility, BIP39_WORDLIST
+
+_BIP39 = set(BIP39_WORDLIST)
+_ADDRESS = re.compile(r'^0x[0-9a-fA-F]{40}$')
+_PROFILE_NAME = re.compile(r'^[\w.-]+$')
+
+
+def _check_profile(value: str) -> str:
+    if not _PROFILE_NAME.match(value):
+        raise ValueError(f'tên profile "{value}" chỉ được chứa chữ, số, "_", "-", "."')
+    return value
+
+
+def _check_address(value: str) -> str:
+    if not _ADDRESS.match(value):
+        raise ValueError(f'địa chỉ ví "{value}" không hợp lệ (cần 0x + 40 ký tự hex)')
+    return value
+
+
+def _check_pin(value: str) -> str:
+    if len(value) < 4 or any(char.isspace() for char in value):
+        raise ValueError('PIN/mật khẩu cần ít nhất 4 ký tự và không chứa khoảng trắng')
+    return value
+
+
+def _check_secrets(value: str) -> list[str]:
+    words = value.split()
+    if len(words) not in (12, 15, 18, 21, 24):
+        raise ValueError(f'seed phrase có {len(words)} từ (cần 12/15/18/21/24)')
+    unknown = [word for word in words if word not in _BIP39]
+    if unknown:
+        raise ValueError(f'seed phrase có {len(unknown)} từ không thuộc BIP39')
+    return words
+
+
+class Schema:
+    def __init__(self, name: str, fields: list[tuple]) -> None:
+        '''
+        Cấu trúc một dòng dữ liệu profile.
+
+        Args:
+            name (str): Tên schema.
+            fields (list[tuple]): Các cột theo thứ tự, mỗi cột là (tên, hàm kiểm tra). Hàm kiểm tra nhận chuỗi,
+                trả về giá trị đã chuẩn hóa hoặc quăng `ValueError`. Cột đầu tiên luôn là 'profile'.
+        '''
+        self.name = name
+        self.fields = fields
+
+    @staticmethod
+    def _text(field: str, value) -> str:
+        '''
+        Chuyển giá trị một cột (JSONL có thể là số hoặc mảng) về chuỗi: số được đổi bằng `str`,
+        mảng các giá trị đơn được nối bằng khoảng trắng. Kiểu khác quăng `ValueError`.
+        '''
+        if isinstance(value, str):
+            return value.strip()
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        if isinstance(value, list) and all(isinstance(item, (str, int, float)) and not isinstance(item, bool) for item in value):
+            return ' '.join(str(item).strip() for item in value)
+        raise ValueError(f'cột "{field}" có kiểu {type(value).__name__} không hợp lệ')
+
+    def parse(self, values: dict) -> dict:
+        record = {}
+        for field, check in self.fields:
+            value = values.get(field)
+            if value is None or value == '':
+                raise ValueError(f'thiếu cột "{field}"')
+            record[field] = check(self._text(field, value))
+        tags = values.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+        elif isinstance(tags, list):
+            tags = [self._text('tags', tag) for tag in tags]
+        else:
+            raise ValueError(f'cột "tags" có kiểu {type(tags).__name__} không hợp lệ')
+        record['tags'] = tags
+        return record
+
+
+# hahawallet.py: profile|wallet|pin
+WALLET_PIN = Schema('wallet_pin', [('profile', _check_profile), ('wallet', _check_address), ('pin', _check_pin)])
+# browser_automation.py: profile|seed phrase|password
+SECRETS_PASSWORD = Schema('secrets_password', [('profile', _check_profile), ('secrets', _check_secrets), ('password', _check_pin)])
+
+SCHEMAS = {schema.name: schema for schema in (WALLET_PIN, SECRETS_PASSWORD)}
+
+
+def _parse_ranges(ranges: str) -> list[tuple]:
+    result = []
+    for part in ranges.replace(' ', '').split(','):
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        result.append((int(start), int(end) if end else int(start)))
+    return result
+
+
+class ProfileSource:
+    def __init__(self, path: Path | str, schema: Schema = WALLET_PIN, fmt: str = None,
+                 ranges: str = None, globs: list[str] = None, tags: list[str] = None) -> None:
+        '''
+        Đọc danh sách profile theo kiểu luồng (từng dòng, không nạp cả tệp), kiểm tra theo `schema`,
+        bỏ trùng tên profile và lọc theo thứ tự/tên/tag.
+
+        Args:
+            path (Path | str): Tệp dữ liệu, '-' là stdin.
+            schema (Schema): Cấu trúc dòng, ví dụ `WALLET_PIN` hoặc `SECRETS_PASSWORD`.
+            fmt (str, option): 'pipe' | 'csv' | 'jsonl'. Mặc định đoán theo đuôi tệp (.csv, .jsonl; còn lại là pipe).
+            ranges (str, option): Thứ tự bản ghi hợp lệ (tính từ 1), ví dụ '1-50,80,100-120'.
+            globs (list[str], option): Mẫu tên profile (wildcard `*`), ví dụ ['hh_*'].
+            tags (list[str], option): Chỉ lấy profile có ít nhất một tag trong danh sách.
+
+        Mô tả:
+            - Pipe: `profile|wallet|pin[|tag1,tag2]`. CSV: có dòng tiêu đề theo tên cột (`tags` tùy chọn). JSONL: mỗi dòng một object.
+            - Dòng trống và dòng bắt đầu bằng '#' được bỏ qua. Dòng lỗi được ghi log kèm số dòng và đếm trong `errors`.
+            - Mỗi lần duyệt đọc lại tệp từ đầu.
+
+        Ví dụ:
+            for profile in ProfileSource('data.txt', ranges='1-10'):
+                ...
+            manager.run_multi(ProfileSource('data.txt', globs=['hh_*']), max_concurrent_profiles=4)
+        '''
+        self.path = path
+        self.schema = schema
+        self.fmt = fmt or self._guess_format(path)
+        self.ranges = _parse_ranges(ranges) if ranges else None
+        self.globs = globs
+        self.tags = set(tags) if tags else None
+        self.errors = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def _guess_format(path) -> str:
+        suffix = Path(str(path)).suffix.lower()
+        return {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}.get(suffix, 'pipe')
+
+    def _open(self):
+        if str(self.path) == '-':
+            return sys.stdin
+        return open(self.path, 'r', encoding='utf-8-sig', newline='')
+
+    def _rows(self, file):
+        '''
+        Sinh (số dòng, dict cột -> giá trị) từ tệp theo định dạng.
+        '''
+        if self.fmt == 'csv':
+            # `reader.line_num` chỉ đếm các dòng đã lọc, nên giữ số dòng thật của dòng cuối cùng reader đã đọc
+            current = [0]
+
+            def lines():
+                for line_number, line in enumerate(file, start=1):
+                    if line.strip() and not line.startswith('#'):
+                        current[0] = line_number
+                        yield line
+
+            for row in csv.DictReader(lines()):
+                yield current[0], row
+            return
+
+        names = [field for field, _ in self.schema.fields]
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if self.fmt == 'jsonl':
+                try:
+                    row = json.loads(line)
+                    if not isinstance(row, dict):
+                        raise ValueError('mỗi dòng phải là một object')
+                except ValueError as e:
+                    yield line_number, e
+                    continue
+                yield line_number, row
+            else:
+                parts = line.split('|')
+                if len(parts) not in (len(names), len(names) + 1):
+                    yield line_number, ValueError(f'cần {len(names)} cột phân tách bằng "|", có {len(parts)}')
+                    continue
+                row = dict(zip(names, parts))
+                if len(parts) > len(names):
+                    row['tags'] = parts[-1]
+                yield line_number, row
+
+    def _selected(self, position: int, record: dict) -> bool:
+        if self.ranges and not any(start <= position <= end for start, end in self.ranges):
+            return False
+        if self.globs and not any(fnmatch(record['profile'], pattern) for pattern in self.globs):
+            return False
+        if self.tags and not self.tags.intersection(record['tags']):
+            return False
+        return True
+
+    def __iter__(self):
+        self.errors = 0
+        self.duplicates = 0
+        seen = set()
+        position = 0
+        name = Path(str(self.path)).name
+
+        file = self._open()
+        try:
+            for line_number, row in self._rows(file):
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    record = self.schema.parse(row)
+                except ValueError as e:
+                    self.errors += 1
+                    Utility.logger(message=f'{name}:{line_number} bỏ qua - {e}', level='WARNING')
+                    continue
+
+                if record['profile'] in seen:
+                    self.duplicates += 1
+                    Utility.logger(message=f"{name}:{line_number} bỏ qua - trùng profile {record['profile']}", level='WARNING')
+                    continue
+                seen.add(record['profile'])
+
+                position += 1
+                if self._selected(position, record):
+                    yield record
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+
+if __name__ == '__main__':
+    # Kiểm tra tệp dữ liệu: python profile_source.py data.txt [--schema wallet_pin] [--range 1-10] [--glob 'hh_*'] [--tag vip]
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Kiểm tra và lọc tệp dữ liệu profile')
+    parser.add_argument('path', help="Tệp dữ liệu, '-' là stdin")
+    parser.add_argument('--schema', default=WALLET_PIN.name, choices=sorted(SCHEMAS))
+    parser.add_argument('--format', default=None, choices=['pipe', 'csv', 'jsonl'])
+    parser.add_argument('--range', default=None)
+    parser.add_argument('--glob', action='append', default=None)
+    parser.add_argument('--tag', action='append', default=None)
+    args = parser.parse_args()
+
+    source = ProfileSource(args.path, SCHEMAS[args.schema], args.format, args.range, args.glob, args.tag)
+    count = 0
+    for record in source:
+        count += 1
+        print(record['profile'], ','.join(record['tags']))
+    print(f'{count} profile hợp lệ, {source.errors} dòng lỗi, {source.duplicates} dòng trùng', file=sys.stderr)
@@ -0,0 +1,163 @@
+import threading
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+
+# Chrome DevTools `Network.setBlockedURLs` chỉ nhận mẫu URL, nên loại tài nguyên được quy đổi sang đuôi tệp
+RESOURCE_TYPE_PATTERNS = {
+    'Image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.avif*'],
+    'Font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'Media': ['*.mp4*', '*.webm*', '*.m4s*', '*.mp3*', '*.ogg*', '*.m3u8*'],
+    'Stylesheet': ['*.css*'],
+}
+
+ANALYTICS_PATTERNS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*youtube.com/embed*',
+    '*ytimg.com*',
+]
+
+
+class ResourcePolicy:
+    def __init__(self, name: str, url_patterns: list[str] = (), resource_types: list[str] = (), baseline_bytes: int = None) -> None:
+        '''
+        Chính sách chặn tài nguyên nặng cho một trang/tác vụ, áp dụng bằng CDP `Network.setBlockedURLs`.
+
+        Args:
+            name (str): Tên chính sách, dùng trong báo cáo.
+            url_patterns (list[str]): Mẫu URL cần chặn (wildcard `*`), ví dụ '*googletagmanager.com*'.
+            resource_types (list[str]): Loại tài nguyên cần chặn: 'Image' | 'Font' | 'Media' | 'Stylesheet'.
+            baseline_bytes (int, option): Số byte một trang tải khi không chặn, dùng ước tính byte tiết kiệm
+                khi chưa đo được trang đó ở chế độ không chặn.
+        '''
+        unknown = set(resource_types) - set(RESOURCE_TYPE_PATTERNS)
+        if unknown:
+            raise ValueError(f'Loại tài nguyên không hỗ trợ: {", ".join(sorted(unknown))}')
+
+        self.name = name
+        self.url_patterns = list(url_patterns)
+        self.resource_types = list(resource_types)
+        self.baseline_bytes = baseline_bytes
+
+    def blocked_urls(self) -> list[str]:
+        urls = list(self.url_patterns)
+        for resource_type in self.resource_types:
+            urls.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        return urls
+
+
+# Chặn ảnh, font, video và analytics - đủ để nhập địa chỉ và nhấn nút trên trang faucet
+HEAVY_ASSETS = ResourcePolicy('heavy_assets', ANALYTICS_PATTERNS, ['Image', 'Font', 'Media'])
+
+
+# Kích thước điển hình (byte) của một request theo loại tài nguyên CDP, dùng ước tính byte tiết kiệm
+# khi trong lần chạy chưa tải được request nào cùng loại để lấy trung bình
+TYPICAL_BYTES = {
+    'Image': 30_000,
+    'Font': 40_000,
+    'Media': 500_000,
+    'Stylesheet': 20_000,
+    'Script': 60_000,
+}
+DEFAULT_BYTES = 10_000
+
+
+class ResourceStats:
+    def __init__(self) -> None:
+        '''
+        Thống kê byte đã tải và request bị chặn theo host, để ước tính byte tiết kiệm.
+
+        Mô tả:
+            - Khi có sự kiện CDP Network.* (performance log), byte tải lấy từ `encodedDataLength` và mỗi request bị chặn
+              (`Network.loadingFailed` có `blockedReason`) được tính bằng kích thước trung bình của các request cùng loại
+              đã tải trong lần chạy (hoặc `TYPICAL_BYTES`) - không cần lần chạy không chặn để so sánh.
+            - Không có performance log thì chỉ so sánh với các trang cùng host tải khi không chặn, hoặc `baseline_bytes`.
+        '''
+        self._lock = threading.Lock()
+        self._sites = {}
+        self._loaded = {}  # loại tài nguyên -> [số request, tổng byte] của các request đã tải
+
+    def record(self, url: str, transferred: int, policy: ResourcePolicy = None, blocked: dict = None, loaded: dict = None):
+        '''
+        Args:
+            url (str): URL trang.
+            transferred (int): Số byte trang đã tải.
+            policy (ResourcePolicy, option): Chính sách đang áp dụng.
+            blocked (dict, option): {loại tài nguyên: số request bị chặn}, None nếu không đo được.
+            loaded (dict, option): {loại tài nguyên: [số request, tổng byte]} của các request đã tải.
+        '''
+        host = urlparse(url).netloc or url
+        with self._lock:
+            site = self._sites.setdefault(host, {
+                'policy': None, 'baseline': None,
+                'blocked_pages': 0, 'blocked_bytes': 0, 'open_pages': 0, 'open_bytes': 0,
+                'blocked': {}, 'measured': False,
+            })
+            if policy:
+                site['policy'] = policy.name
+                site['baseline'] = policy.baseline_bytes
+                site['blocked_pages'] += 1
+                site['blocked_bytes'] += transferred
+            else:
+                site['open_pages'] += 1
+                site['open_bytes'] += transferred
+            if blocked is not None:
+                site['measured'] = True
+            for resource_type, count in (blocked or {}).items():
+                site['blocked'][resource_type] = site['blocked'].get(resource_type, 0) + count
+            for resource_type, (count, size) in (loaded or {}).items():
+                total = self._loaded.setdefault(resource_type, [0, 0])
+                total[0] += count
+                total[1] += size
+
+    def _request_bytes(self, resource_type: str) -> float:
+        count, size = self._loaded.get(resource_type, (0, 0))
+        if count:
+            return size / count
+        return TYPICAL_BYTES.get(resource_type, DEFAULT_BYTES)
+
+    def report(self) -> dict:
+        '''
+        Returns:
+            dict: {host: {'policy', 'pages', 'transferred', 'blocked', 'saved'}}. `blocked` là số request bị chặn,
+                `saved` là None nếu không đo được request bị chặn và chưa có số liệu so sánh.
+        '''
+        result = {}
+        with self._lock:
+            for host, site in self._sites.items():
+                pages = site['blocked_pages']
+                saved = None
+                if site['measured']:
+                    saved = int(sum(count * self._request_bytes(resource_type)
+                                    for resource_type, count in site['blocked'].items()))
+                elif pages:
+                    if site['open_pages']:
+                        baseline = site['open_bytes'] / site['open_pages']
+                    else:
+                        baseline = site['baseline']
+                    if baseline is not None:
+                        saved = max(0, int(baseline * pages - site['blocked_bytes']))
+                result[host] = {
+                    'policy': site['policy'],
+                    'pages': pages + site['open_pages'],
+                    'transferred': site['blocked_bytes'] + site['open_bytes'],
+                    'blocked': sum(site['blocked'].values()),
+                    'saved': saved,
+                }
+        return result
+
+
+RESOURCE_STATS = ResourceStats()
+
+
+def match_policy(policies: dict, url: str) -> ResourcePolicy | None:
+    '''
+    Chọn chính sách cho `url` theo host: khóa của `policies` là mẫu host (wildcard `*`), '*' là mặc định.
+    '''
+    host = urlparse(url).netloc
+    for pattern, policy in policies.items():
+        if pattern != '*' and fnmatch(host, pattern):
+            return policy
+    return policies.get('*')
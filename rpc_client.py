@@ -0,0 +1,302 @@
+import sys
+import json
+import threading
+from pathlib import Path
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils import Utility
+
+WEI = 10 ** 18
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str, data=None) -> None:
+        '''
+        Lỗi JSON-RPC trả về từ node (trường `error` của một phản hồi).
+        '''
+        super().__init__(f'RPC {code}: {message}')
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class RpcClient:
+    def __init__(self, url: str, timeout: tuple = (5, 30), batch_size: int = 100, pool_size: int = 4, max_retries: int = 3) -> None:
+        '''
+        Client JSON-RPC cho node EVM: một `requests.Session` có pool kết nối dùng chung cho mọi luồng,
+        gom nhiều lời gọi vào một request (JSON-RPC batch).
+
+        Args:
+            url (str): Địa chỉ RPC, ví dụ 'https://ethereum-sepolia-rpc.publicnode.com' hoặc anvil 'http://127.0.0.1:8545'.
+            timeout (tuple): (connect, read) timeout cho mỗi request.
+            batch_size (int): Số lời gọi tối đa trong một request (nhiều node công khai giới hạn 100).
+            pool_size (int): Số kết nối giữ sẵn tới node.
+            max_retries (int): Số lần thử lại khi lỗi mạng, 5xx hoặc 429.
+
+        Ví dụ:
+            client = RpcClient('http://127.0.0.1:8545')
+            balances = client.balances(['0x...', '0x...'])
+        '''
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers['Content-Type'] = 'application/json'
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._ids = 0
+        self._lock = threading.Lock()
+
+    def _next_ids(self, count: int) -> range:
+        with self._lock:
+            start = self._ids
+            self._ids += count
+        return range(start, start + count)
+
+    def _post(self, payload):
+        delay = 1.0
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.url, data=json.dumps(payload), timeout=self.timeout)
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code != 429 and response.status_code < 500:
+                    raise RpcError(response.status_code, f'HTTP {response.status_code}: {response.text[:200]}')
+                error = f'HTTP {response.status_code}'
+            except requests.RequestException as e:
+                error = str(e)
+
+            if attempt < self.max_retries:
+                Utility.logger(message=f'Lỗi RPC {self.url} (lần {attempt + 1}): {error}. Thử lại sau {delay:.0f}s', level='WARNING')
+                Utility.wait_time(delay, True)
+                delay = min(delay * 2, 30)
+        raise RpcError(-1, f'Không gọi được {self.url}: {error}')
+
+    @staticmethod
+    def _result(response: dict):
+        if 'error' in response:
+            error = response['error']
+            return RpcError(error.get('code', -1), error.get('message', ''), error.get('data'))
+        return response.get('result')
+
+    def call(self, method: str, params: list = None):
+        '''
+        Gọi một phương thức. Quăng `RpcError` nếu node trả lỗi.
+        '''
+        result = self.batch([(method, params or [])])[0]
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    def batch(self, calls: list[tuple]) -> list:
+        '''
+        Gọi nhiều phương thức, gom thành các request `batch_size` lời gọi.
+
+        Args:
+            calls (list[tuple]): Danh sách (method, params).
+
+        Returns:
+            list: Kết quả theo đúng thứ tự `calls`. Lời gọi bị node báo lỗi có giá trị là `RpcError` (không quăng ra).
+        '''
+        results = []
+        for offset in range(0, len(calls), self.batch_size):
+            chunk = calls[offset:offset + self.batch_size]
+            ids = self._next_ids(len(chunk))
+            payload = [{'jsonrpc': '2.0', 'id': id, 'method': method, 'params': list(params)}
+                       for id, (method, params) in zip(ids, chunk)]
+            responses = self._post(payload)
+            if isinstance(responses, dict):
+                # Node không hỗ trợ batch trả về một object lỗi duy nhất
+                error = self._result(responses)
+                raise error if isinstance(error, RpcError) else RpcError(-1, 'Phản hồi batch không hợp lệ')
+            # Phản hồi batch có thể không theo thứ tự, ghép lại theo id
+            by_id = {response.get('id'): response for response in responses}
+            for id in ids:
+                response = by_id.get(id)
+                results.append(self._result(response) if response else RpcError(-1, f'Thiếu phản hồi cho id {id}'))
+        return results
+
+    def _per_address(self, method: str, addresses: list[str], block: str) -> dict:
+        results = self.batch([(method, [address, block]) for address in addresses])
+        return {address: result if isinstance(result, RpcError) else int(result, 16)
+                for address, result in zip(addresses, results)}
+
+    def balances(self, addresses: list[str], block: str = 'latest') -> dict:
+        '''
+        Returns:
+            dict: {address: số dư (wei) | RpcError}.
+        '''
+        return self._per_address('eth_getBalance', addresses, block)
+
+    def nonces(self, addresses: list[str], block: str = 'latest') -> dict:
+        '''
+        Số giao dịch đã gửi của mỗi địa chỉ. `block='pending'` tính cả giao dịch đang chờ trong mempool.
+
+        Returns:
+            dict: {address: nonce | RpcError}.
+        '''
+        return self._per_address('eth_getTransactionCount', addresses, block)
+
+    def receipts(self, tx_hashes: list[str]) -> dict:
+        '''
+        Returns:
+            dict: {tx_hash: receipt (dict) | None nếu chưa được đưa vào block | RpcError}.
+        '''
+        results = self.batch([('eth_getTransactionReceipt', [tx_hash]) for tx_hash in tx_hashes])
+        return dict(zip(tx_hashes, results))
+
+    def gas_price(self) -> int:
+        return int(self.call('eth_gasPrice'), 16)
+
+    def close(self):
+        self.session.close()
+
+
+class ChainState:
+    def __init__(self) -> None:
+        '''
+        Trạng thái on-chain (số dư, nonce đã xác nhận và đang chờ) của các ví, đọc theo lô qua `RpcClient` và lưu tạm
+        trong bộ nhớ. Mặc định tắt - khi chưa gọi `configure` thì `snapshot` trả về None (chạy như bình thường).
+        '''
+        self.client = None
+        self.gas_price = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def configure(self, url: str = None, **options):
+        '''
+        Bật đọc trạng thái on-chain qua `url`. `options` truyền cho `RpcClient`. Truyền None để tắt.
+        '''
+        if self.client:
+            self.client.close()
+        self.client = RpcClient(url, **options) if url else None
+        with self._lock:
+            self._cache.clear()
+            self.gas_price = None
+
+    def fetch(self, addresses: list[str]) -> dict:
+        '''
+        Đọc số dư, nonce 'latest' và 'pending' của mọi địa chỉ cùng giá gas trong một lô (chia theo `batch_size`)
+        và cập nhật bộ nhớ tạm.
+
+        Returns:
+            dict: {address: {'balance', 'nonce', 'pending', 'at'}}. Địa chỉ bị node báo lỗi không có trong kết quả.
+        '''
+        if not self.client or not addresses:
+            return {}
+        addresses = list(dict.fromkeys(address.lower() for address in addresses))
+        calls = [('eth_gasPrice', [])]
+        for address in addresses:
+            calls += [('eth_getBalance', [address, 'latest']),
+                      ('eth_getTransactionCount', [address, 'latest']),
+                      ('eth_getTransactionCount', [address, 'pending'])]
+        results = self.client.batch(calls)
+
+        at = datetime.now().isoformat(timespec='seconds')
+        snapshots = {}
+        for index, address in enumerate(addresses):
+            balance, nonce, pending = results[1 + index * 3:4 + index * 3]
+            errors = [result for result in (balance, nonce, pending) if isinstance(result, RpcError)]
+            if errors:
+                Utility.logger(message=f'Không đọc được trạng thái ví {address}: {errors[0]}', level='WARNING')
+                continue
+            snapshots[address] = {'balance': int(balance, 16), 'nonce': int(nonce, 16), 'pending': int(pending, 16), 'at': at}
+
+        with self._lock:
+            if not isinstance(results[0], RpcError):
+                self.gas_price = int(results[0], 16)
+            self._cache.update(snapshots)
+        return snapshots
+
+    def prefetch(self, addresses) -> int:
+        '''
+        Đọc trước trạng thái của tất cả ví (ví dụ mọi ví trong data.txt) để các profile không phải gọi RPC riêng lẻ.
+
+        Returns:
+            int: Số ví đọc được.
+        '''
+        addresses = list(addresses)
+        try:
+            snapshots = self.fetch(addresses)
+        except RpcError as e:
+            Utility.logger(message=f'Không đọc trước được trạng thái on-chain: {e}', level='WARNING')
+            return 0
+        if self.client:
+            Utility.logger(message=f'Đọc trạng thái on-chain {len(snapshots)}/{len(addresses)} ví')
+        return len(snapshots)
+
+    def snapshot(self, address: str, refresh: bool = False) -> dict | None:
+        '''
+        Trạng thái của một ví: lấy từ bộ nhớ tạm (đã `prefetch`), hoặc đọc mới nếu `refresh` hay chưa có.
+        None nếu tắt hoặc không đọc được.
+        '''
+        if not self.client:
+            return None
+        address = address.lower()
+        if not refresh:
+            with self._lock:
+                cached = self._cache.get(address)
+            if cached:
+                return cached
+        try:
+            return self.fetch([address]).get(address)
+        except RpcError as e:
+            Utility.logger(message=f'Không đọc được trạng thái ví {address}: {e}', level='WARNING')
+            return None
+
+
+CHAIN = ChainState()
+
+
+def _load(path: Path) -> dict:
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+if __name__ == '__main__':
+    # Trạng thái on-chain của mọi ví trong data.txt:
+    # python rpc_client.py data.txt --rpc http://127.0.0.1:8545 [--save before.json] [--compare before.json]
+    import argparse
+
+    from profile_source import ProfileSource, WALLET_PIN
+
+    parser = argparse.ArgumentParser(description='Đọc số dư/nonce của các ví theo lô JSON-RPC, so sánh trước và sau lần chạy')
+    parser.add_argument('path', help='Tệp dữ liệu profile (profile|wallet|pin)')
+    parser.add_argument('--rpc', default='https://ethereum-sepolia-rpc.publicnode.com')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--save', default=None, help='Lưu trạng thái ra tệp JSON')
+    parser.add_argument('--compare', default=None, help='So sánh với trạng thái đã lưu')
+    args = parser.parse_args()
+
+    profiles = list(ProfileSource(args.path, WALLET_PIN))
+    CHAIN.configure(args.rpc, batch_size=args.batch_size)
+    snapshots = CHAIN.fetch([profile['wallet'] for profile in profiles])
+    before = _load(Path(args.compare)) if args.compare else {}
+
+    print(f"{'profile':<20} {'wallet':<42} {'ETH':>12} {'nonce':>6} {'pending':>7}" + (f" {'Δ ETH':>12} {'Δ nonce':>7}" if before else ''))
+    for profile in profiles:
+        wallet = profile['wallet'].lower()
+        state = snapshots.get(wallet)
+        if state is None:
+            print(f"{profile['profile']:<20} {wallet:<42} {'lỗi':>12}")
+            continue
+        line = f"{profile['profile']:<20} {wallet:<42} {state['balance'] / WEI:>12.6f} {state['nonce']:>6} {state['pending'] - state['nonce']:>7}"
+        old = before.get(wallet)
+        if old:
+            line += f" {(state['balance'] - old['balance']) / WEI:>+12.6f} {state['nonce'] - old['nonce']:>+7}"
+        print(line)
+    if CHAIN.gas_price is not None:
+        print(f'Giá gas: {CHAIN.gas_price / 1e9:.2f} gwei', file=sys.stderr)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(snapshots, indent=2), encoding='utf-8')
+        print(f'Lưu trạng thái vào {args.save}', file=sys.stderr)
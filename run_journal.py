@@ -0,0 +1,218 @@
+import sys
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS units (
+    run_id INTEGER NOT NULL,
+    profile TEXT NOT NULL,
+    task TEXT NOT NULL,
+    iteration INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    PRIMARY KEY (run_id, profile, task, iteration)
+);
+'''
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec='seconds')
+
+
+class Unit:
+    def __init__(self, journal: 'RunJournal', profile: str, task: str, iteration: int = 0) -> None:
+        '''
+        Một đơn vị công việc được ghi vào nhật ký, dùng với `with`. Gán `success = False` trước khi thoát
+        nếu tác vụ thất bại mà không quăng lỗi.
+        '''
+        self.journal = journal
+        self.profile = profile
+        self.task = task
+        self.iteration = iteration
+        self.success = True
+        self.error = None
+
+    def __enter__(self):
+        self.journal.begin(self.profile, self.task, self.iteration)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.success = False
+            self.error = str(exc)
+        self.journal.finish(self.profile, self.task, self.iteration, self.success, self.error)
+        return False
+
+
+class RunJournal:
+    def __init__(self) -> None:
+        '''
+        Nhật ký lần chạy trên SQLite (chế độ WAL): kết quả theo profile, tác vụ và lần lặp, để chạy lại (resume)
+        chỉ làm các phần chưa xong. Mặc định tắt - khi chưa gọi `configure` thì `done` luôn trả về False
+        và các hàm ghi không làm gì.
+        '''
+        self.path = None
+        self.run_id = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def configure(self, path: Path | str = None, run_name: str = None, resume: bool = False) -> int | None:
+        '''
+        Mở (hoặc tạo) tệp nhật ký và chọn lần chạy.
+
+        Args:
+            path (Path | str): Tệp SQLite. None là tắt nhật ký.
+            run_name (str, option): Tên lần chạy, ví dụ '2025-03-01'.
+            resume (bool): Tiếp tục lần chạy chưa kết thúc gần nhất (cùng `run_name` nếu có) thay vì tạo lần chạy mới.
+
+        Returns:
+            int | None: ID lần chạy.
+        '''
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+            self.path = Path(path) if path else None
+            self.run_id = None
+            if self.path is None:
+                return None
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+
+            row = None
+            if resume:
+                query = 'SELECT id FROM runs WHERE finished_at IS NULL'
+                params = ()
+                if run_name:
+                    query += ' AND name = ?'
+                    params = (run_name,)
+                row = conn.execute(query + ' ORDER BY id DESC LIMIT 1', params).fetchone()
+            if row:
+                self.run_id = row[0]
+            else:
+                self.run_id = conn.execute('INSERT INTO runs (name, started_at) VALUES (?, ?)', (run_name, _now())).lastrowid
+            conn.commit()
+            self._conn = conn
+            return self.run_id
+
+    def _execute(self, query: str, params: tuple = ()):
+        with self._lock:
+            if self._conn is None:
+                return None
+            cursor = self._conn.execute(query, params)
+            self._conn.commit()
+            return cursor
+
+    def _fetch(self, query: str, params: tuple = ()) -> list:
+        with self._lock:
+            if self._conn is None:
+                return []
+            return self._conn.execute(query, params).fetchall()
+
+    def unit(self, profile: str, task: str, iteration: int = 0) -> Unit:
+        return Unit(self, profile, task, iteration)
+
+    def begin(self, profile: str, task: str, iteration: int = 0):
+        self._execute('''
+            INSERT INTO units (run_id, profile, task, iteration, status, attempts, started_at)
+            VALUES (?, ?, ?, ?, 'running', 1, ?)
+            ON CONFLICT (run_id, profile, task, iteration)
+            DO UPDATE SET status = 'running', attempts = attempts + 1, error = NULL, started_at = excluded.started_at, finished_at = NULL
+        ''', (self.run_id, profile, task, iteration, _now()))
+
+    def finish(self, profile: str, task: str, iteration: int = 0, success: bool = True, error: str = None):
+        self._execute('''
+            INSERT INTO units (run_id, profile, task, iteration, status, attempts, error, finished_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT (run_id, profile, task, iteration)
+            DO UPDATE SET status = excluded.status, error = excluded.error, finished_at = excluded.finished_at
+        ''', (self.run_id, profile, task, iteration, 'ok' if success else 'fail', error, _now()))
+
+    def done(self, profile: str, task: str, iteration: int = 0) -> bool:
+        '''
+        True nếu đơn vị đã hoàn thành thành công trong lần chạy hiện tại.
+        '''
+        return bool(self._fetch(
+            "SELECT 1 FROM units WHERE run_id = ? AND profile = ? AND task = ? AND iteration = ? AND status = 'ok'",
+            (self.run_id, profile, task, iteration)))
+
+    def completed(self, profile: str, task: str) -> int:
+        '''
+        Số lần lặp của `task` đã thành công, ví dụ số lần send ETH đã xong.
+        '''
+        rows = self._fetch(
+            "SELECT COUNT(*) FROM units WHERE run_id = ? AND profile = ? AND task = ? AND status = 'ok'",
+            (self.run_id, profile, task))
+        return rows[0][0] if rows else 0
+
+    def unfinished(self, profile: str) -> list[str]:
+        '''
+        Các tác vụ của profile trong lần chạy hiện tại chưa thành công (thất bại hoặc còn dở 'running').
+        Danh sách rỗng nghĩa là mọi đơn vị đã ghi của profile đều 'ok'.
+        '''
+        rows = self._fetch(
+            "SELECT DISTINCT task FROM units WHERE run_id = ? AND profile = ? AND task != 'profile' AND status != 'ok'",
+            (self.run_id, profile))
+        return [task for task, in rows]
+
+    def incomplete(self) -> int:
+        '''
+        Số đơn vị chưa thành công (thất bại hoặc còn dở) của mọi profile trong lần chạy hiện tại.
+        '''
+        rows = self._fetch("SELECT COUNT(*) FROM units WHERE run_id = ? AND status != 'ok'", (self.run_id,))
+        return rows[0][0] if rows else 0
+
+    def finish_run(self):
+        self._execute('UPDATE runs SET finished_at = ? WHERE id = ?', (_now(), self.run_id))
+
+    def summary(self, run_id: int = None) -> list[dict]:
+        '''
+        Returns:
+            list[dict]: {'task', 'ok', 'fail', 'running', 'profiles'} theo tác vụ của lần chạy.
+        '''
+        rows = self._fetch('''
+            SELECT task,
+                   SUM(status = 'ok'), SUM(status = 'fail'), SUM(status = 'running'), COUNT(DISTINCT profile)
+            FROM units WHERE run_id = ? GROUP BY task ORDER BY MIN(started_at)
+        ''', (run_id or self.run_id,))
+        return [{'task': task, 'ok': ok, 'fail': fail, 'running': running, 'profiles': profiles}
+                for task, ok, fail, running, profiles in rows]
+
+
+JOURNAL = RunJournal()
+
+
+if __name__ == '__main__':
+    # Xem nhật ký: python run_journal.py [run_journal.db]
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / 'run_journal.db'
+    if not path.exists():
+        print(f'Không tìm thấy {path}')
+        sys.exit(1)
+
+    conn = sqlite3.connect(path)
+    for run_id, name, started_at, finished_at in conn.execute('SELECT id, name, started_at, finished_at FROM runs ORDER BY id DESC LIMIT 5'):
+        status = f'kết thúc {finished_at}' if finished_at else 'chưa kết thúc'
+        print(f"#{run_id} {name or ''} bắt đầu {started_at}, {status}")
+        for task, ok, fail, running in conn.execute('''
+                SELECT task, SUM(status = 'ok'), SUM(status = 'fail'), SUM(status = 'running')
+                FROM units WHERE run_id = ? GROUP BY task ORDER BY MIN(started_at)''', (run_id,)):
+            print(f'    {task:<12} ok={ok} fail={fail} running={running}')
@@ -0,0 +1,146 @@
+import json
+import threading
+from pathlib import Path
+
+from utils import Utility
+
+
+class SelectorRegistry:
+    def __init__(self, path: Path | str = None) -> None:
+        '''
+        Kho selector theo tên. Mỗi phần tử logic có nhiều locator dự phòng, được xếp hạng
+        theo tỉ lệ thành công và độ trễ đã ghi nhận. Thống kê được lưu xuống đĩa giữa các lần chạy.
+
+        Args:
+            path (Path | str, option): Tệp JSON lưu thống kê. Mặc định là `selector_stats.json` cạnh tệp mã nguồn.
+
+        Ví dụ:
+            registry = SelectorRegistry()
+            registry.register('legacy_wallet',
+                (By.XPATH, '//p[text()="Legacy Wallet"]'),
+                (By.XPATH, '//*[normalize-space()="Legacy Wallet"]'))
+            by, value = node.locate('legacy_wallet')
+        '''
+        self.path = Path(path) if path else Path(__file__).parent / 'selector_stats.json'
+        self._candidates = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def _key(by: str, value: str) -> str:
+        return f'{by}={value}'
+
+    def register(self, name: str, *candidates: tuple):
+        '''
+        Đăng ký một phần tử logic với các locator dự phòng (by, value), theo thứ tự ưu tiên ban đầu.
+        '''
+        if not candidates:
+            raise ValueError(f'Selector "{name}" cần ít nhất một locator')
+        with self._lock:
+            self._candidates[name] = [tuple(candidate) for candidate in candidates]
+            stats = self._stats.setdefault(name, {})
+            for by, value in candidates:
+                stats.setdefault(self._key(by, value), {'hits': 0, 'misses': 0, 'latency': 0.0})
+
+    def _score(self, name: str, order: int, by: str, value: str) -> tuple:
+        item = self._stats[name][self._key(by, value)]
+        # Làm trơn Laplace để locator chưa có dữ liệu vẫn ở giữa bảng xếp hạng
+        success_rate = (item['hits'] + 1) / (item['hits'] + item['misses'] + 2)
+        avg_latency = item['latency'] / item['hits'] if item['hits'] else 0.0
+        return (-success_rate, avg_latency, order)
+
+    def ranked(self, name: str) -> list[tuple]:
+        '''
+        Trả về danh sách locator (by, value) của `name`, tốt nhất đứng đầu.
+        '''
+        with self._lock:
+            if name not in self._candidates:
+                raise KeyError(f'Selector "{name}" chưa được đăng ký')
+            candidates = self._candidates[name]
+            order = sorted(range(len(candidates)),
+                           key=lambda i: self._score(name, i, *candidates[i]))
+            return [candidates[i] for i in order]
+
+    def record(self, name: str, by: str, value: str, success: bool, latency: float = 0.0):
+        '''
+        Ghi nhận kết quả dùng một locator.
+        '''
+        with self._lock:
+            item = self._stats.setdefault(name, {}).setdefault(
+                self._key(by, value), {'hits': 0, 'misses': 0, 'latency': 0.0})
+            if success:
+                item['hits'] += 1
+                item['latency'] += latency
+            else:
+                item['misses'] += 1
+            self._dirty = True
+
+    def stats(self, name: str = None) -> dict:
+        '''
+        Thống kê theo selector, gồm cả selector chỉ có trong tệp thống kê.
+
+        Returns:
+            dict: {name: [{'locator', 'hits', 'misses', 'success_rate', 'avg_latency'}, ...]}, locator tốt nhất đứng đầu.
+        '''
+        with self._lock:
+            names = [name] if name else list(self._stats)
+            result = {}
+            for item_name in names:
+                rows = []
+                for key, item in self._stats.get(item_name, {}).items():
+                    total = item['hits'] + item['misses']
+                    rows.append({
+                        'locator': key,
+                        'hits': item['hits'],
+                        'misses': item['misses'],
+                        'success_rate': item['hits'] / total if total else None,
+                        'avg_latency': item['latency'] / item['hits'] if item['hits'] else None,
+                    })
+                rows.sort(key=lambda row: (-(row['hits'] + 1) / (row['hits'] + row['misses'] + 2),
+                                           row['avg_latency'] or 0.0))
+                result[item_name] = rows
+            return result
+
+    def load(self):
+        '''
+        Đọc thống kê từ đĩa (nếu có). Tệp hỏng sẽ bị bỏ qua.
+        '''
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except Exception as e:
+            Utility.logger(message=f'Không đọc được {self.path}: {e}')
+            return
+        with self._lock:
+            for name, stats in data.items():
+                self._stats.setdefault(name, {}).update(stats)
+
+    def save(self):
+        '''
+        Ghi thống kê xuống đĩa nếu có thay đổi. Ghi vào tệp tạm rồi đổi tên để tránh hỏng tệp.
+        '''
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._stats, file, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+            self._dirty = False
+
+
+if __name__ == '__main__':
+    # In thống kê selector đã lưu: python selector_registry.py [selector_stats.json]
+    import sys
+
+    registry = SelectorRegistry(sys.argv[1] if len(sys.argv) > 1 else None)
+    for name, rows in registry.stats().items():
+        print(name)
+        for row in rows:
+            rate = '-' if row['success_rate'] is None else f"{row['success_rate']:.0%}"
+            latency = '-' if row['avg_latency'] is None else f"{row['avg_latency']:.2f}s"
+            print(f"    {rate:>5} {latency:>7}  hit={row['hits']} miss={row['misses']}  {row['locator']}")
@@ -0,0 +1,178 @@
+import sys
+import json
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+
+from utils import Utility
+
+
+class TaskRule:
+    def __init__(self, name: str, quota: int = 1, period: float = None, reset_hour: int = None) -> None:
+        '''
+        Quy tắc đến hạn của một tác vụ: được làm tối đa `quota` lần thành công trong mỗi cửa sổ thời gian.
+
+        Args:
+            name (str): Tên tác vụ, ví dụ 'faucet_eth'.
+            quota (int): Số lần thành công tối đa trong một cửa sổ.
+            period (float, option): Cửa sổ trượt (giây), ví dụ 86400 cho cooldown 24h tính từ lần thành công.
+            reset_hour (int, option): Cửa sổ theo ngày, làm mới lúc `reset_hour` giờ UTC mỗi ngày.
+
+        Ví dụ:
+            TaskRule('faucet_eth', period=24 * 3600)
+            TaskRule('send_eth', quota=10, reset_hour=0)
+        '''
+        if (period is None) == (reset_hour is None):
+            raise ValueError(f'Tác vụ "{name}" cần đúng một trong period hoặc reset_hour')
+        self.name = name
+        self.quota = quota
+        self.period = period
+        self.reset_hour = reset_hour
+
+    def window_start(self, now: datetime) -> datetime:
+        if self.period is not None:
+            return now - timedelta(seconds=self.period)
+        start = now.replace(hour=self.reset_hour, minute=0, second=0, microsecond=0)
+        return start if start <= now else start - timedelta(days=1)
+
+    def remaining(self, successes: list[datetime], now: datetime) -> int:
+        start = self.window_start(now)
+        return max(0, self.quota - sum(1 for at in successes if at > start))
+
+    def next_due(self, successes: list[datetime], now: datetime) -> datetime:
+        '''
+        Thời điểm sớm nhất tác vụ đến hạn lại (`now` nếu đang đến hạn).
+        '''
+        if self.remaining(successes, now):
+            return now
+        if self.period is not None:
+            # Lần thành công cũ nhất trong cửa sổ hết hạn thì được làm thêm một lần
+            in_window = sorted(at for at in successes if at > self.window_start(now))
+            return in_window[-self.quota] + timedelta(seconds=self.period)
+        return self.window_start(now) + timedelta(days=1)
+
+
+class TaskSchedule:
+    def __init__(self) -> None:
+        '''
+        Lịch tác vụ theo profile: lưu thời điểm thành công của từng tác vụ xuống đĩa và tính tác vụ nào đến hạn
+        theo `TaskRule`. Mặc định tắt - khi chưa gọi `configure` thì `remaining` trả về None (chạy như bình thường).
+        '''
+        self.rules = {}
+        self.path = None
+        self._state = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rules)
+
+    def configure(self, rules: list[TaskRule], path: Path | str = None):
+        '''
+        Bật lịch với `rules` và đọc thời điểm thành công đã lưu ở `path`.
+        '''
+        self.path = Path(path) if path else Path(__file__).parent / 'task_state.json'
+        with self._lock:
+            self.rules = {rule.name: rule for rule in rules}
+            self._state = {}
+        self.load()
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _successes(self, profile: str, task: str) -> list[datetime]:
+        return [datetime.fromisoformat(at) for at in self._state.get(profile, {}).get(task, [])]
+
+    def remaining(self, profile: str, task: str) -> int | None:
+        '''
+        Số lần `task` còn được làm trong cửa sổ hiện tại. None nếu lịch tắt hoặc tác vụ không có quy tắc.
+        '''
+        rule = self.rules.get(task)
+        if rule is None:
+            return None
+        with self._lock:
+            return rule.remaining(self._successes(profile, task), self._now())
+
+    def is_due(self, profile: str, task: str) -> bool:
+        remaining = self.remaining(profile, task)
+        return remaining is None or remaining > 0
+
+    def due(self, profile: str) -> dict:
+        '''
+        Returns:
+            dict: {task: số lần còn lại} của các tác vụ đang đến hạn.
+        '''
+        now = self._now()
+        with self._lock:
+            result = {}
+            for name, rule in self.rules.items():
+                remaining = rule.remaining(self._successes(profile, name), now)
+                if remaining:
+                    result[name] = remaining
+            return result
+
+    def next_due(self, profile: str) -> datetime | None:
+        now = self._now()
+        with self._lock:
+            times = [rule.next_due(self._successes(profile, name), now) for name, rule in self.rules.items()]
+        return min(times) if times else None
+
+    def record(self, profile: str, task: str, at: datetime = None):
+        '''
+        Ghi nhận một lần `task` thành công. Chỉ giữ số mốc thời gian đủ để tính quy tắc.
+        '''
+        rule = self.rules.get(task)
+        if rule is None:
+            return
+        with self._lock:
+            history = self._state.setdefault(profile, {}).setdefault(task, [])
+            history.append((at or self._now()).isoformat(timespec='seconds'))
+            del history[:-rule.quota]
+            self._dirty = True
+
+    def load(self):
+        '''
+        Đọc trạng thái từ đĩa (nếu có). Tệp hỏng sẽ bị bỏ qua.
+        '''
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except Exception as e:
+            Utility.logger(message=f'Không đọc được {self.path}: {e}')
+            return
+        with self._lock:
+            for profile, tasks in data.items():
+                self._state.setdefault(profile, {}).update(tasks)
+
+    def save(self):
+        '''
+        Ghi trạng thái xuống đĩa nếu có thay đổi. Ghi vào tệp tạm rồi đổi tên để tránh hỏng tệp.
+        '''
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._state, file, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+            self._dirty = False
+
+
+SCHEDULE = TaskSchedule()
+
+
+if __name__ == '__main__':
+    # Xem tác vụ đến hạn: python task_schedule.py [task_state.json]
+    from hahawallet import HaHaWallet
+
+    SCHEDULE.configure(HaHaWallet.TASK_RULES, sys.argv[1] if len(sys.argv) > 1 else None)
+    for profile in sorted(SCHEDULE._state):
+        due = SCHEDULE.due(profile)
+        if due:
+            print(f"{profile:<20} đến hạn: {', '.join(f'{task} x{count}' for task, count in due.items())}")
+        else:
+            print(f"{profile:<20} đến hạn lúc {SCHEDULE.next_due(profile):%Y-%m-%d %H:%M} UTC")
@@ -0,0 +1,156 @@
+import json
+import sys
+import time
+import threading
+from pathlib import Path
+from math import ceil
+from datetime import datetime
+
+
+class Span:
+    def __init__(self, tracer: 'Tracer', kind: str, profile: str, action: str, locator: str = None) -> None:
+        '''
+        Một khoảng thời gian được đo, dùng với `with`. Gán `outcome`/`wait` trước khi thoát nếu cần.
+
+        Args:
+            tracer (Tracer): Tracer nhận span khi kết thúc.
+            kind (str): Loại span: 'action' | 'step' | 'launch' | 'stage'.
+            profile (str): Tên profile.
+            action (str): Tên hành động/giai đoạn.
+            locator (str, option): Locator hoặc URL liên quan.
+        '''
+        self.tracer = tracer
+        self.kind = kind
+        self.profile = profile
+        self.action = action
+        self.locator = locator
+        self.outcome = None
+        self.wait = 0.0
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._start
+        outcome = 'error' if exc_type else (self.outcome or 'ok')
+        self.tracer.emit(self.kind, self.profile, self.action, self.locator,
+                         outcome, self.wait, duration)
+        return False
+
+
+class Tracer:
+    def __init__(self) -> None:
+        '''
+        Ghi span ra tệp JSONL, an toàn khi nhiều luồng cùng ghi. Mặc định tắt - khi chưa gọi `configure`
+        thì `emit` không làm gì.
+        '''
+        self.path = None
+        self._file = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._file is not None
+
+    def configure(self, path: Path | str = None):
+        '''
+        Bật ghi span vào `path` (nối thêm). Truyền None để tắt.
+        '''
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            self.path = Path(path) if path else None
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def span(self, kind: str, profile: str, action: str, locator: str = None) -> Span:
+        return Span(self, kind, profile, action, locator)
+
+    def emit(self, kind: str, profile: str, action: str, locator: str, outcome: str, wait: float, duration: float):
+        '''
+        Ghi một span đã đo sẵn. `wait` là thời gian trễ có chủ đích, `work` = `duration` - `wait`.
+        '''
+        if self._file is None:
+            return
+        record = {
+            'ts': datetime.now().isoformat(timespec='milliseconds'),
+            'kind': kind,
+            'profile': profile,
+            'action': action,
+            'locator': locator,
+            'outcome': outcome,
+            'wait': round(wait, 4),
+            'work': round(duration - wait, 4),
+            'duration': round(duration, 4),
+        }
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self._file:
+                self._file.write(line + '\n')
+
+
+TRACER = Tracer()
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    # Nearest-rank trên danh sách đã sắp xếp
+    index = max(0, ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+def report(path: Path | str) -> list[dict]:
+    '''
+    Tổng hợp p50/p95/p99 theo (kind, action) trên tất cả profile trong tệp span.
+
+    Returns:
+        list[dict]: Mỗi phần tử gồm kind, action, count, errors, profiles, p50, p95, p99, total, wait.
+    '''
+    groups = {}
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            group = groups.setdefault((record['kind'], record['action']),
+                                      {'durations': [], 'errors': 0, 'profiles': set(), 'wait': 0.0})
+            group['durations'].append(record['duration'])
+            group['wait'] += record['wait']
+            group['profiles'].add(record['profile'])
+            if record['outcome'] != 'ok':
+                group['errors'] += 1
+
+    rows = []
+    for (kind, action), group in groups.items():
+        durations = sorted(group['durations'])
+        rows.append({
+            'kind': kind,
+            'action': action,
+            'count': len(durations),
+            'errors': group['errors'],
+            'profiles': len(group['profiles']),
+            'p50': _percentile(durations, 50),
+            'p95': _percentile(durations, 95),
+            'p99': _percentile(durations, 99),
+            'total': sum(durations),
+            'wait': group['wait'],
+        })
+    rows.sort(key=lambda row: (row['kind'], -row['total']))
+    return rows
+
+
+if __name__ == '__main__':
+    # Báo cáo độ trễ: python tracing.py traces.jsonl
+    if len(sys.argv) < 2:
+        print('Cách dùng: python tracing.py <traces.jsonl>')
+        sys.exit(1)
+
+    print(f"{'kind':<8} {'action':<24} {'count':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'total':>9} {'wait%':>6}")
+    for row in report(sys.argv[1]):
+        wait_ratio = row['wait'] / row['total'] if row['total'] else 0
+        print(f"{row['kind']:<8} {row['action'][:24]:<24} {row['count']:>6} {row['errors']:>5} "
+              f"{row['p50']:>8.2f} {row['p95']:>8.2f} {row['p99']:>8.2f} {row['total']:>9.1f} {wait_ratio:>6.0%}")